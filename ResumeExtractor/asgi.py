@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+The /api/async/ endpoints run natively here (e.g. `uvicorn ResumeExtractor.asgi:application`); one worker
+then keeps many LLM calls in flight, so raise LLM_MAX_CONCURRENCY to match.
 """
 
 import os
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -35,8 +35,89 @@ AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY')
 AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME')
 AWS_S3_REGION_NAME = config('AWS_S3_REGION_NAME')
+AWS_S3_ENDPOINT_URL = config('AWS_S3_ENDPOINT_URL', default=None)  # e.g. a local MinIO/moto server
+AWS_S3_MAX_POOL_CONNECTIONS = config('AWS_S3_MAX_POOL_CONNECTIONS', default=20, cast=int)
+AWS_S3_MULTIPART_THRESHOLD = config('AWS_S3_MULTIPART_THRESHOLD', default=8 * 1024 * 1024, cast=int)
+AWS_S3_MULTIPART_CHUNKSIZE = config('AWS_S3_MULTIPART_CHUNKSIZE', default=8 * 1024 * 1024, cast=int)
+S3_UPLOAD_WORKERS = config('S3_UPLOAD_WORKERS', default=8, cast=int)  # background uploads per process
 GEMINI_API_KEY = config('GEMINI_API_KEY')
 
+# LLM gateway (resume_app/llm.py). LLM_BACKEND=resume_app.llm.StubBackend runs without network access.
+LLM_BACKEND = config('LLM_BACKEND', default='resume_app.llm.GeminiBackend')
+LLM_MODEL = config('LLM_MODEL', default='models/gemini-2.5-flash')
+LLM_MAX_CONCURRENCY = config('LLM_MAX_CONCURRENCY', default=8, cast=int)  # in-flight calls per process
+LLM_QUEUE_TIMEOUT = config('LLM_QUEUE_TIMEOUT', default=30, cast=float)  # seconds to wait for a slot or token
+LLM_RATE_PER_MINUTE = config('LLM_RATE_PER_MINUTE', default=0, cast=int)  # 0 = no rate limit
+LLM_BURST = config('LLM_BURST', default=10, cast=int)
+LLM_REQUEST_TIMEOUT = config('LLM_REQUEST_TIMEOUT', default=60, cast=float)  # seconds
+LLM_MAX_RETRIES = config('LLM_MAX_RETRIES', default=3, cast=int)
+LLM_BACKOFF_BASE = config('LLM_BACKOFF_BASE', default=0.5, cast=float)  # seconds, doubled per retry
+LLM_BACKOFF_MAX = config('LLM_BACKOFF_MAX', default=8, cast=float)
+LLM_BREAKER_THRESHOLD = config('LLM_BREAKER_THRESHOLD', default=5, cast=int)  # consecutive failures; 0 = never open
+LLM_BREAKER_COOLDOWN = config('LLM_BREAKER_COOLDOWN', default=30, cast=float)  # seconds
+LLM_STUB_RESPONSE = config('LLM_STUB_RESPONSE', default='{}')
+LLM_STUB_LATENCY = config('LLM_STUB_LATENCY', default=0, cast=float)  # seconds
+LLM_CHARS_PER_TOKEN = config('LLM_CHARS_PER_TOKEN', default=4, cast=int)  # for prompt token estimates
+LLM_RESUME_TOKEN_BUDGET = config('LLM_RESUME_TOKEN_BUDGET', default=3000, cast=int)  # tokens per resume prompt
+LLM_JD_TOKEN_BUDGET = config('LLM_JD_TOKEN_BUDGET', default=2500, cast=int)  # tokens per JD skills prompt
+
+# Resume parsing: 'llm' asks the model for what the local rules can't find; 'rules' never calls it.
+RESUME_PARSER_MODE = config('RESUME_PARSER_MODE', default='llm')
+RESUME_RULES_FALLBACK = config('RESUME_RULES_FALLBACK', default=True, cast=bool)  # rules-only when the LLM is down
+
+# Bulk resume ingestion (POST /api/candidates/bulk/)
+BULK_MAX_FILES = config('BULK_MAX_FILES', default=500, cast=int)
+BULK_MAX_FILE_SIZE = config('BULK_MAX_FILE_SIZE', default=10 * 1024 * 1024, cast=int)
+BULK_LLM_CONCURRENCY = config('BULK_LLM_CONCURRENCY', default=8, cast=int)
+DATA_UPLOAD_MAX_NUMBER_FILES = BULK_MAX_FILES
+
+# Text extraction runs on a process pool so PDF parsing can't stall request threads
+EXTRACTION_WORKERS = config('EXTRACTION_WORKERS', default=0, cast=int)  # 0 = one per CPU
+EXTRACTION_START_METHOD = config('EXTRACTION_START_METHOD', default='spawn')
+EXTRACTION_MAX_PAGES = config('EXTRACTION_MAX_PAGES', default=30, cast=int)  # 0 = no limit
+EXTRACTION_MAX_BYTES = config('EXTRACTION_MAX_BYTES', default=20 * 1024 * 1024, cast=int)
+EXTRACTION_TIMEOUT = config('EXTRACTION_TIMEOUT', default=15, cast=float)  # seconds, 0 = no limit
+# Tried in order, falling back when the output is empty or garbled; missing libraries are skipped.
+# PyMuPDF is faster still but AGPL-licensed, so it is opt-in: install it and set
+# PDF_TEXT_ENGINES=pymupdf,pypdf,pdfminer.
+PDF_TEXT_ENGINES = config('PDF_TEXT_ENGINES', default='pypdf,pdfminer', cast=Csv())
+
+# In-process tier of the JD skill cache (the database tier has no expiry)
+JD_SKILL_CACHE_SIZE = config('JD_SKILL_CACHE_SIZE', default=1024, cast=int)
+JD_SKILL_CACHE_TTL = config('JD_SKILL_CACHE_TTL', default=3600, cast=int)  # seconds
+
+# Generated JD text (in-process tier in front of the GeneratedJD table) and rendered PDF/DOCX files
+GENERATED_JD_CACHE_SIZE = config('GENERATED_JD_CACHE_SIZE', default=512, cast=int)
+GENERATED_JD_CACHE_TTL = config('GENERATED_JD_CACHE_TTL', default=3600, cast=int)  # seconds
+JD_ARTIFACT_DIR = config('JD_ARTIFACT_DIR', default=str(BASE_DIR / 'jd_artifacts'))
+JD_ARTIFACT_KEEP = config('JD_ARTIFACT_KEEP', default=2000, cast=int)  # most recently used files kept; 0 = no limit
+JD_RENDER_WORKERS = config('JD_RENDER_WORKERS', default=2, cast=int)  # 0 = one per CPU
+JD_RENDER_TIMEOUT = config('JD_RENDER_TIMEOUT', default=30, cast=int)  # seconds
+JD_PDF_FONT = config('JD_PDF_FONT', default='')  # path to a TTF font for non-Latin text; Helvetica when empty
+
+# Candidate ranking: relative weight of mandatory skill coverage, optional skill coverage and experience fit
+MATCH_MANDATORY_WEIGHT = config('MATCH_MANDATORY_WEIGHT', default=0.6, cast=float)
+MATCH_OPTIONAL_WEIGHT = config('MATCH_OPTIONAL_WEIGHT', default=0.25, cast=float)
+MATCH_EXPERIENCE_WEIGHT = config('MATCH_EXPERIENCE_WEIGHT', default=0.15, cast=float)
+MATCH_MAX_TOP_K = config('MATCH_MAX_TOP_K', default=1000, cast=int)
+# Local candidate writes refresh the ranking index immediately; this bounds how long another process's writes go unseen
+MATCH_INDEX_RECHECK = config('MATCH_INDEX_RECHECK', default=30, cast=float)  # seconds, 0 = check every request
+
+# Interviewer auto-assignment: open interviews an interviewer may hold, and how strongly load outweighs fit
+INTERVIEWER_MAX_OPEN_INTERVIEWS = config('INTERVIEWER_MAX_OPEN_INTERVIEWS', default=10, cast=int)
+ASSIGNMENT_LOAD_WEIGHT = config('ASSIGNMENT_LOAD_WEIGHT', default=0.3, cast=float)
+
+# Instrumentation: per-stage timings in a Server-Timing response header, and the Prometheus endpoint at
+# /api/internal/metrics/ (bearer METRICS_TOKEN; unset, it is served to loopback clients only under DEBUG)
+SERVER_TIMING = config('SERVER_TIMING', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# On-demand profiling: admins send `X-Profile: 1`; PROFILE_SAMPLE_RATE also profiles that share of all requests
+PROFILE_SAMPLE_RATE = config('PROFILE_SAMPLE_RATE', default=0, cast=float)
+PROFILE_DIR = config('PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILE_KEEP = config('PROFILE_KEEP', default=200, cast=int)  # newest reports kept on disk
+PROFILE_SUMMARY_LINES = config('PROFILE_SUMMARY_LINES', default=60, cast=int)  # rows in each .txt summary
+
 
 # Application definition
 
@@ -77,6 +158,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'resume_app.middleware.ServerTimingMiddleware',
+    'resume_app.middleware.RequestProfilerMiddleware',
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -105,13 +188,66 @@ WSGI_APPLICATION = 'ResumeExtractor.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# DB_ENGINE selects sqlite3 (default), mysql or postgresql. DB_PROFILE=tuned applies the performance
+# settings below; DB_PROFILE=basic gives Django's stock connection behaviour. Development defaults to
+# basic because tuned switches the checked-in db.sqlite3 to WAL mode on the first connection.
+DB_ENGINE = config('DB_ENGINE', default='sqlite3')
+DB_PROFILE = config('DB_PROFILE', default='basic' if DEBUG else 'tuned')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)  # seconds a connection is reused; 0 = per request
+DB_POOL = config('DB_POOL', default=False, cast=bool)  # psycopg connection pool (PostgreSQL only)
+
+# SQLite: WAL lets readers run alongside the single writer; IMMEDIATE transactions take the write lock
+# up front so concurrent writers queue on the busy timeout instead of failing with "database is locked".
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=20, cast=int)  # seconds
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=268435456, cast=int)  # bytes
+SQLITE_CACHE_SIZE = config('SQLITE_CACHE_SIZE', default=-65536, cast=int)  # pages, or KiB when negative
+SQLITE_TUNED_OPTIONS = {
+    'timeout': SQLITE_BUSY_TIMEOUT,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        f'PRAGMA mmap_size={SQLITE_MMAP_SIZE};'
+        f'PRAGMA cache_size={SQLITE_CACHE_SIZE};'
+        'PRAGMA temp_store=MEMORY;'
+    ),
 }
 
+if DB_ENGINE == 'sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+    if DB_PROFILE == 'tuned':
+        DATABASES['default']['OPTIONS'] = SQLITE_TUNED_OPTIONS
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': f'django.db.backends.{DB_ENGINE}',
+            'NAME': config('DB_NAME'),
+            'USER': config('DB_USER', default=''),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default=''),
+            'OPTIONS': {},
+        }
+    }
+    if DB_ENGINE == 'mysql':
+        DATABASES['default']['OPTIONS']['charset'] = 'utf8mb4'
+
+if DB_PROFILE == 'tuned':
+    if DB_POOL and DB_ENGINE == 'postgresql':
+        # Django manages pooled connections itself, so persistent connections must stay off
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
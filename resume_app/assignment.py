@@ -0,0 +1,138 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .matching import normalize_skill, normalize_skills
+from .models import Interview, User
+
+# Interviews that still occupy the assigned interviewer
+OPEN_STATUSES = ('pending', 'approved', 'scheduled')
+
+# Relative weight of each part of the interviewer fit score, before the load penalty
+SKILL_WEIGHT = 0.6
+DOMAIN_WEIGHT = 0.25
+EXPERIENCE_WEIGHT = 0.15
+
+
+# ------------ Interviewer Index ------------
+class InterviewerIndex:
+    """Active interviewers with postings by keyword and domain, plus their current open-interview load."""
+
+    def __init__(self, interviewers, load):
+        self.ids = np.fromiter((i['id'] for i in interviewers), np.int64, len(interviewers))
+        self.experience = np.fromiter((i['experience'] or 0 for i in interviewers), np.float64, len(interviewers))
+        self.load = np.fromiter((load.get(i['id'], 0) for i in interviewers), np.float64, len(interviewers))
+        self.by_skill = {}
+        self.by_domain = {}
+        for row, interviewer in enumerate(interviewers):
+            for skill in normalize_skills(interviewer['keywords']):
+                self.by_skill.setdefault(skill, []).append(row)
+            domain = normalize_skill(interviewer['domain'] or "")
+            if domain:
+                self.by_domain.setdefault(domain, []).append(row)
+        self._fit = {}
+
+    @classmethod
+    def build(cls):
+        interviewers = list(
+            User.objects.filter(role='interviewer', is_active=True)
+            .order_by('id')
+            .values('id', 'keywords', 'domain', 'experience')
+        )
+        load = dict(
+            Interview.objects.filter(interviewer__isnull=False, status__in=OPEN_STATUSES)
+            .values_list('interviewer')
+            .annotate(open=Count('id'))
+            .order_by()
+        )
+        return cls(interviewers, load)
+
+    def fit(self, position):
+        """Load-independent fit of every interviewer for `position`; 0 for interviewers with no skill or domain overlap."""
+        cached = self._fit.get(position.id)
+        if cached is not None:
+            return cached
+
+        size = len(self.ids)
+        mandatory = normalize_skills(position.mandatory_skills)
+        optional = [s for s in normalize_skills(position.optional_skills) if s not in mandatory]
+        skill_score = np.zeros(size)
+        # Optional skills count half as much as mandatory ones
+        for skills, weight in ((mandatory, 1.0), (optional, 0.5)):
+            for skill in skills:
+                rows = self.by_skill.get(skill)
+                if rows:
+                    skill_score[rows] += weight
+        skill_total = len(mandatory) + 0.5 * len(optional)
+        if skill_total:
+            skill_score /= skill_total
+
+        domain_score = np.zeros(size)
+        domain_rows = self.by_domain.get(normalize_skill(position.domain or ""))
+        if domain_rows:
+            domain_score[domain_rows] = 1.0
+
+        # Interviewers should be at least as experienced as the top of the position's range
+        required = max(position.exp_to or 0, position.exp_from or 0)
+        experience_score = np.clip(self.experience / required, 0, 1) if required else np.ones(size)
+
+        fit = SKILL_WEIGHT * skill_score + DOMAIN_WEIGHT * domain_score + EXPERIENCE_WEIGHT * experience_score
+        fit[(skill_score == 0) & (domain_score == 0)] = 0
+        self._fit[position.id] = fit
+        return fit
+
+    def best(self, position):
+        """Row of the best interviewer for `position` given current load, or None if nobody fits."""
+        fit = self.fit(position)
+        max_load = settings.INTERVIEWER_MAX_OPEN_INTERVIEWS
+        scores = fit - settings.ASSIGNMENT_LOAD_WEIGHT * self.load / max(max_load, 1)
+        scores[(fit == 0) | (self.load >= max_load)] = -np.inf
+        if not len(scores):
+            return None
+        row = int(np.argmax(scores))
+        return None if scores[row] == -np.inf else row
+
+
+# ------------ Batch Assignment ------------
+def assign_pending_interviews(batch_size=500, limit=0, dry_run=False, index=None):
+    """Assign an interviewer to every pending interview that has none, best fit and lightest load first.
+
+    Work proceeds in batches of `batch_size` interviews, each saved with one bulk update. Returns
+    (assigned, unassigned) counts.
+    """
+    index = index or InterviewerIndex.build()
+    assigned = unassigned = 0
+    last_id = 0
+    while True:
+        size = min(batch_size, limit - assigned - unassigned) if limit else batch_size
+        with transaction.atomic():
+            # Rows locked here can't be assigned by hand while this batch is being decided
+            batch = list(
+                Interview.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(status='pending', interviewer__isnull=True, id__gt=last_id)
+                .select_related('position')
+                .only('id', 'interviewer', 'position__id', 'position__domain', 'position__exp_from',
+                      'position__exp_to', 'position__mandatory_skills', 'position__optional_skills')
+                .order_by('id')[:size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            updated = []
+            for interview in batch:
+                row = index.best(interview.position)
+                if row is None:
+                    unassigned += 1
+                    continue
+                index.load[row] += 1
+                interview.interviewer_id = int(index.ids[row])
+                updated.append(interview)
+            if not dry_run:
+                Interview.objects.bulk_update(updated, ['interviewer'])
+            assigned += len(updated)
+
+        if limit and assigned + unassigned >= limit:
+            break
+    return assigned, unassigned
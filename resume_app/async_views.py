@@ -0,0 +1,251 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import parse_etags, quote_etag
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from .extraction import aextract_document, extractor_version
+from .jd_files import JD_FILE_TYPES, aget_jd_artifact, artifact_digest
+from .llm import LLMError, LLMUnavailable, get_llm, parse_json_reply
+from .metrics import record_cache
+from .models import Position
+from .resume_rules import parse_resume_rules
+from .services import (
+    EMPTY_JD_SKILLS,
+    build_candidate,
+    build_position,
+    candidate_data,
+    degraded_resume_data,
+    file_sha256,
+    generated_jd_hash,
+    get_cached_generated_jd,
+    get_cached_jd_skills,
+    get_cached_resume_extraction,
+    jd_prompt,
+    jd_skills_prompt,
+    jd_text_hash,
+    position_data,
+    positions_with_jd_text,
+    resume_prompt,
+    resume_reply_data,
+    store_generated_jd,
+    store_jd_skills,
+    store_resume_extraction,
+    upload_to_s3_in_background,
+)
+from .views import candidate_job_data, jd_inputs, new_candidate_job, wants_async
+
+# Async versions of the upload and JD generation endpoints, for the ASGI entry point (ResumeExtractor/asgi.py).
+# While a request waits on S3, the LLM, text extraction or rendering it holds no thread: blocking boto3 calls
+# run on the upload pool, extraction and rendering on their process pools, and the ORM through sync_to_async.
+
+
+# ------------ Async Helpers ------------
+async def aparse_resume(resume_file, file_name):
+    """parse_resume for async views."""
+    content_hash = await asyncio.to_thread(file_sha256, resume_file)
+    entry = await sync_to_async(get_cached_resume_extraction)(content_hash)
+    record_cache('resume_extraction', entry is not None)
+    if entry:
+        return entry
+    extraction = await aextract_document(resume_file, file_name)
+    extracted_data = await aextract_resume_data_with_llm(extraction.text)
+    return await sync_to_async(store_resume_extraction)(content_hash, extraction, extracted_data)
+
+
+async def aextract_resume_data_with_llm(resume_text):
+    # The rules and prompt trimming are regex work over the whole resume, so they run off the event loop
+    if settings.RESUME_PARSER_MODE == 'rules':
+        return await asyncio.to_thread(parse_resume_rules, resume_text)
+    prompt, contact = await asyncio.to_thread(resume_prompt, resume_text)
+    try:
+        reply = await get_llm().agenerate(prompt)
+    except LLMError:
+        if not settings.RESUME_RULES_FALLBACK:
+            raise
+        return await asyncio.to_thread(degraded_resume_data, resume_text)
+    return resume_reply_data(reply, contact)
+
+
+async def aget_jd_skills(jd_text):
+    text_hash = jd_text_hash(jd_text)
+    skills = await sync_to_async(get_cached_jd_skills)(text_hash)
+    if skills is None:
+        prompt = await asyncio.to_thread(jd_skills_prompt, jd_text)
+        data = parse_json_reply(await get_llm().agenerate(prompt), EMPTY_JD_SKILLS)
+        skills = await sync_to_async(store_jd_skills)(text_hash, data)
+    return skills
+
+
+async def aget_generated_jd(job_title, domain, experience):
+    input_hash = generated_jd_hash(job_title, domain, experience)
+    jd_text = await sync_to_async(get_cached_generated_jd)(input_hash)
+    if jd_text is None:
+        jd_text = await get_llm().agenerate(jd_prompt(job_title, domain, experience))
+        await sync_to_async(store_generated_jd)(input_hash, job_title, domain, experience, jd_text)
+    return jd_text
+
+
+def request_data(request):
+    # JSON bodies for the JD endpoints; form and multipart data otherwise
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b"{}")
+    return request.POST
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+# ------------ Base View ------------
+class AsyncAPIView(View):
+    """Plain Django async view with the behaviour of the DRF views it mirrors: JWT authentication,
+    JSON errors, 503 when the LLM gateway turns a call away and no CSRF check."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            authenticated = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            detail = e.detail.get('detail', e.detail) if isinstance(e.detail, dict) else e.detail
+            return JsonResponse({"detail": str(detail)}, status=401)
+        if not authenticated:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        request.user = authenticated[0]
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except LLMUnavailable as e:
+            return error(str(e), 503)
+        except Exception as e:
+            return error(str(e), 500)
+
+
+# ------------ API: Create Position (async) ------------
+class AsyncPositionCreateView(AsyncAPIView):
+    async def post(self, request):
+        file = request.FILES.get('job_description_file')
+        if not file:
+            return error("JD file is required.", 400)
+
+        # The S3 upload runs alongside text extraction and the LLM call
+        upload = asyncio.wrap_future(upload_to_s3_in_background(file))
+        try:
+            content_hash = await asyncio.to_thread(file_sha256, file)
+            previous = await positions_with_jd_text(content_hash).afirst()
+            record_cache('jd_text', previous is not None)
+            if previous:
+                jd_text = previous.extracted_text
+                jd_extractor_version = previous.extractor_version
+            else:
+                extraction = await aextract_document(file, file.name)
+                jd_text = extraction.text
+                jd_extractor_version = extractor_version(extraction)
+
+            skills = await aget_jd_skills(jd_text)
+            s3_url = await upload
+        finally:
+            # No-op once awaited; after a failure it drops an upload nobody will use (if it hasn't started)
+            upload.cancel()
+
+        position = build_position(
+            request.user, request.POST, file, skills.get('mandatory_skills', []), skills.get('optional_skills', [])
+        )
+        position.set_extracted_text(jd_text, content_hash, jd_extractor_version)
+        await position.asave()
+        return JsonResponse(position_data(position, s3_url), status=201)
+
+
+# ------------ API: Add Candidate (async) ------------
+class AsyncCandidateCreateView(AsyncAPIView):
+    async def post(self, request):
+        position_id = request.POST.get('position_id')
+        if not position_id:
+            return error("Position ID is required.", 400)
+        position = await Position.objects.filter(id=position_id).afirst()
+        if position is None:
+            return error("Position not found.", 404)
+
+        resume_file = request.FILES.get('resume_file')
+        if not resume_file:
+            return error("Resume file is required.", 400)
+
+        # Background mode: queue the upload for `manage.py process_candidate_jobs` and return at once
+        if wants_async(request.GET, request.POST, request.headers):
+            job = new_candidate_job(position, resume_file, request.POST, request.FILES)
+            await job.asave()
+            return JsonResponse(candidate_job_data(job), status=202)
+
+        upload = asyncio.wrap_future(upload_to_s3_in_background(resume_file))
+        try:
+            parsed = await aparse_resume(resume_file, resume_file.name)
+            s3_url = await upload
+        finally:
+            upload.cancel()
+
+        candidate = build_candidate(position, request.POST, resume_file, parsed.extracted_data)
+        candidate.set_extracted_text(parsed.resume_text, parsed.content_hash, parsed.extractor_version)
+        await candidate.asave()
+        return JsonResponse(candidate_data(candidate, s3_url), status=201)
+
+
+# ------------ API: JD Generation (async) ------------
+class AsyncGenerateJDPreviewView(AsyncAPIView):
+    """JD preview as {"jd_lines": [...]}. The streamed (SSE) preview stays on the sync endpoint."""
+
+    async def post(self, request):
+        try:
+            job_title, domain, experience = jd_inputs(request_data(request))
+        except ValueError as e:
+            return error(str(e), 400)
+
+        jd_text = await aget_generated_jd(job_title, domain, experience)
+        if not jd_text:
+            return error("Failed to generate JD from model.", 500)
+        return JsonResponse({"jd_lines": jd_text.strip().split('\n')})
+
+
+class AsyncGenerateJDFileView(AsyncAPIView):
+    """JD as a PDF or DOCX download, from POST data or GET query parameters; GETs honour If-None-Match."""
+
+    async def get(self, request):
+        return await self.download(request, request.GET)
+
+    async def post(self, request):
+        return await self.download(request, request_data(request))
+
+    async def download(self, request, data):
+        try:
+            job_title, domain, experience = jd_inputs(data)
+        except ValueError as e:
+            return error(str(e), 400)
+        output_format = 'pdf' if str(data.get('format', 'pdf')).lower() == 'pdf' else 'docx'
+
+        jd_text = await aget_generated_jd(job_title, domain, experience)
+        if not jd_text:
+            return error("Failed to generate JD from model.", 500)
+
+        etag = quote_etag(artifact_digest(output_format, job_title, jd_text))
+        if request.method == 'GET' and etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponse(status=304)
+        else:
+            path, _ = await aget_jd_artifact(output_format, job_title, jd_text)
+            # JD files are small; reading them whole avoids streaming a sync file iterator through ASGI
+            response = HttpResponse(await asyncio.to_thread(read_file, path), content_type=JD_FILE_TYPES[output_format])
+            response['Content-Disposition'] = f'attachment; filename="{job_title}_JD.{output_format}"'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
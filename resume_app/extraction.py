@@ -0,0 +1,249 @@
+import asyncio
+import io
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+
+from .metrics import timed
+from .pools import SharedProcessPool
+
+logger = logging.getLogger(__name__)
+
+ExtractionResult = namedtuple('ExtractionResult', ['text', 'truncated', 'pages', 'engine'], defaults=(None,))
+
+# Bump when the extraction pipeline changes in a way that should trigger `manage.py backfill_extracted_text`
+EXTRACTOR_VERSION = "1"
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+# ------------ Worker Side ------------
+# Everything down to the Process Pool section runs inside the pool processes: keep it free of Django and the ORM.
+def raw_file(file_obj):
+    # pdfminer only accepts real io streams, so unwrap Django File / tempfile wrappers around one
+    while not isinstance(file_obj, io.IOBase) and hasattr(file_obj, 'file'):
+        file_obj = file_obj.file
+    return file_obj
+
+
+# ------------ PDF Engines ------------
+# Each engine takes (file_obj, max_pages, deadline) and returns an ExtractionResult. They are tried
+# in PDF_TEXT_ENGINES order; an engine whose library isn't installed is skipped.
+PDF_ENGINES = {}
+
+
+def register_pdf_engine(name):
+    def decorator(func):
+        PDF_ENGINES[name] = func
+        return func
+    return decorator
+
+
+@register_pdf_engine('pymupdf')
+def _extract_pdf_pymupdf(file_obj, max_pages, deadline):
+    import pymupdf
+
+    pages = []
+    truncated = False
+    with pymupdf.open(stream=file_obj.read(), filetype='pdf') as doc:
+        for page in doc:
+            if (max_pages and len(pages) >= max_pages) or time.monotonic() > deadline:
+                truncated = True
+                break
+            pages.append(page.get_text() + "\f")
+    return ExtractionResult("".join(pages), truncated, len(pages), 'pymupdf')
+
+
+@register_pdf_engine('pypdf')
+def _extract_pdf_pypdf(file_obj, max_pages, deadline):
+    from pypdf import PdfReader
+
+    pages = []
+    truncated = False
+    for page in PdfReader(file_obj).pages:
+        if (max_pages and len(pages) >= max_pages) or time.monotonic() > deadline:
+            truncated = True
+            break
+        pages.append(page.extract_text() + "\f")
+    return ExtractionResult("".join(pages), truncated, len(pages), 'pypdf')
+
+
+@register_pdf_engine('pdfminer')
+def _extract_pdf_pdfminer(file_obj, max_pages, deadline):
+    # Same pipeline as pdfminer.high_level.extract_text, driven one page at a time so limits can apply
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    output = io.StringIO()
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = TextConverter(rsrcmgr, output, laparams=LAParams())
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+
+    pages = 0
+    truncated = False
+    for page in PDFPage.get_pages(file_obj, caching=True):
+        if (max_pages and pages >= max_pages) or time.monotonic() > deadline:
+            truncated = True
+            break
+        interpreter.process_page(page)
+        pages += 1
+    device.close()
+    return ExtractionResult(output.getvalue(), truncated, pages, 'pdfminer')
+
+
+def looks_broken(text, pages=1):
+    """Heuristic for extractor output that shouldn't be trusted: empty, unmapped glyphs or mostly symbols."""
+    stripped = "".join(text.split())
+    if len(stripped) < 20 * max(pages, 1) // 2:
+        return True
+    if text.count("(cid:") > 5 or text.count("\ufffd") > len(stripped) * 0.01:
+        return True
+    readable = sum(ch.isalnum() for ch in stripped)
+    return readable < len(stripped) * 0.6
+
+
+def _extract_pdf(file_obj, max_pages, deadline, engines):
+    result = None
+    for name in engines:
+        file_obj.seek(0)
+        try:
+            result = PDF_ENGINES[name](file_obj, max_pages, deadline)
+        except ImportError:
+            continue
+        except Exception:
+            # A fast engine choking on an odd file shouldn't fail the upload if pdfminer can read it
+            if name == engines[-1]:
+                raise
+            continue
+        if not looks_broken(result.text, result.pages):
+            return result
+    if result is None:
+        raise ValueError("No PDF text engine is available.")
+    return result
+
+
+def _extract_docx(file_obj):
+    from docx import Document
+
+    doc = Document(file_obj)
+    return ExtractionResult("\n".join([p.text for p in doc.paragraphs]), False, 0, 'python-docx')
+
+
+def extract_document_in_process(source, file_name, max_pages=0, timeout=0, engines=('pdfminer',)):
+    """Extract text from `source` (raw bytes, a path or a binary stream) in the current process.
+
+    Stops after `max_pages` PDF pages or once `timeout` seconds have passed, returning the text read
+    so far with `truncated=True`. PDFs go through `engines` in order until one gives usable text.
+    """
+    deadline = time.monotonic() + timeout if timeout else float('inf')
+    if isinstance(source, (bytes, bytearray)):
+        file_obj = io.BytesIO(source)
+    elif isinstance(source, str):
+        file_obj = open(source, 'rb')
+    else:
+        file_obj = raw_file(source)
+
+    try:
+        if file_name.endswith('.pdf'):
+            return _extract_pdf(file_obj, max_pages, deadline, tuple(engines))
+        elif file_name.endswith('.docx'):
+            return _extract_docx(file_obj)
+        raise ValueError("Unsupported file format. Please upload PDF or DOCX.")
+    finally:
+        if isinstance(source, str):
+            file_obj.close()
+
+
+# ------------ Process Pool ------------
+# Worker processes are expensive to start, so one pool is shared by every request in this process
+_pool = SharedProcessPool('EXTRACTION_WORKERS')
+
+# A submitted extraction and the executor running it, which is the one to discard if it hangs
+PendingExtraction = namedtuple('PendingExtraction', ['future', 'executor'])
+
+
+def submit_extraction(source, file_name):
+    """Queue extraction of `source` (bytes or a file path) on the pool; returns a PendingExtraction."""
+    if isinstance(source, (bytes, bytearray)) and len(source) > settings.EXTRACTION_MAX_BYTES:
+        raise ValueError(f"{file_name} exceeds the maximum document size of {settings.EXTRACTION_MAX_BYTES} bytes.")
+    return PendingExtraction(*_pool.submit(
+        extract_document_in_process, source, file_name,
+        settings.EXTRACTION_MAX_PAGES, settings.EXTRACTION_TIMEOUT, tuple(settings.PDF_TEXT_ENGINES)
+    ))
+
+
+def _hard_timeout():
+    # The worker stops itself at EXTRACTION_TIMEOUT; the extra grace covers queueing and a slow final page
+    return settings.EXTRACTION_TIMEOUT * 2 + 5 if settings.EXTRACTION_TIMEOUT else None
+
+
+def _timed_out(pending, file_name):
+    # A task still queued behind other work is dropped; only a running one means a stuck worker to kill
+    if not pending.future.cancel() and not pending.future.done():
+        _pool.discard(pending.executor)
+    return ExtractionTimeout(f"Text extraction from {file_name} timed out.")
+
+
+def _finished(result, file_name):
+    if result.truncated:
+        logger.warning("Extraction of %s truncated after %s page(s)", file_name, result.pages)
+    return result
+
+
+def wait_for_extraction(pending, file_name):
+    """Return the ExtractionResult of a submitted extraction, enforcing the hard timeout."""
+    try:
+        result = pending.future.result(timeout=_hard_timeout())
+    except FutureTimeoutError:
+        raise _timed_out(pending, file_name)
+    return _finished(result, file_name)
+
+
+async def await_extraction(pending, file_name):
+    """wait_for_extraction for async views: the event loop stays free while the worker runs."""
+    try:
+        result = await asyncio.wait_for(asyncio.wrap_future(pending.future), _hard_timeout())
+    except asyncio.TimeoutError:
+        raise _timed_out(pending, file_name)
+    return _finished(result, file_name)
+
+
+# ------------ Public API ------------
+def extraction_source(file_obj, file_name):
+    """What the worker reads: the path of a spooled upload, otherwise the file's bytes."""
+    if hasattr(file_obj, 'temporary_file_path'):
+        # Spooled uploads are read by the worker straight from disk
+        if file_obj.size > settings.EXTRACTION_MAX_BYTES:
+            raise ValueError(f"{file_name} exceeds the maximum document size of {settings.EXTRACTION_MAX_BYTES} bytes.")
+        return file_obj.temporary_file_path()
+    file_obj.seek(0)
+    return file_obj.read()
+
+
+def extract_document(file_obj, file_name):
+    """Extract text from an uploaded or stored file on the extraction pool and return an ExtractionResult."""
+    source = extraction_source(file_obj, file_name)
+    with timed('extract'):
+        return wait_for_extraction(submit_extraction(source, file_name), file_name)
+
+
+async def aextract_document(file_obj, file_name):
+    source = extraction_source(file_obj, file_name)
+    with timed('extract'):
+        return await await_extraction(submit_extraction(source, file_name), file_name)
+
+
+def extract_text_from_file(file_obj, file_name):
+    return extract_document(file_obj, file_name).text
+
+
+def extractor_version(result):
+    """Version string stored next to persisted text, e.g. "1:pymupdf"."""
+    return f"{EXTRACTOR_VERSION}:{result.engine}"
@@ -0,0 +1,268 @@
+import asyncio
+import functools
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+from .metrics import record_cache, timed
+from .pools import SharedProcessPool
+
+# Bump when the rendered output changes so new downloads don't reuse old files
+JD_RENDER_VERSION = "2"
+
+JD_FILE_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+# ------------ Worker Side ------------
+# The renderers run inside the pool processes: keep them free of Django settings and the ORM.
+@functools.lru_cache(maxsize=None)
+def _pdf_styles(font_path):
+    # Built once per worker process; registering a TTF font is the expensive part
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font, bold = 'Helvetica', 'Helvetica-Bold'
+    if font_path:
+        # The standard PDF fonts only cover Latin-1; a TTF font is needed for other scripts
+        pdfmetrics.registerFont(TTFont('JDFont', font_path))
+        pdfmetrics.registerFontFamily('JDFont', normal='JDFont', bold='JDFont', italic='JDFont', boldItalic='JDFont')
+        font = bold = 'JDFont'
+
+    sample = getSampleStyleSheet()
+    body = ParagraphStyle('JDBody', parent=sample['BodyText'], fontName=font, fontSize=10.5, leading=14, spaceAfter=6)
+    return {
+        'title': ParagraphStyle('JDTitle', parent=sample['Title'], fontName=bold, fontSize=18, leading=22),
+        'heading': ParagraphStyle('JDHeading', parent=sample['Heading2'], fontName=bold, fontSize=13, leading=16,
+                                  spaceBefore=10, spaceAfter=4),
+        'body': body,
+        'bullet': ParagraphStyle('JDBullet', parent=body, leftIndent=14, bulletIndent=4, spaceAfter=2),
+    }
+
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC = re.compile(r"(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?!\w)")
+_HEADING = re.compile(r"^#{1,6}\s+")
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def _inline_markup(text):
+    # Models answer in Markdown; turn the inline parts into the tags Paragraph understands
+    text = escape(text)
+    text = _BOLD.sub(r"<b>\1</b>", text)
+    return _ITALIC.sub(r"<i>\1</i>", text)
+
+
+def jd_blocks(jd_text):
+    """Split JD text into ('heading' | 'bullet' | 'body', text) blocks, joining wrapped body lines."""
+    blocks = []
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            blocks.append(('body', " ".join(paragraph)))
+            paragraph.clear()
+
+    for line in jd_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            flush()
+        elif _HEADING.match(stripped):
+            flush()
+            blocks.append(('heading', _HEADING.sub("", stripped).strip('*').strip()))
+        elif _BULLET.match(stripped):
+            flush()
+            blocks.append(('bullet', _BULLET.sub("", stripped)))
+        elif stripped.startswith('**') and stripped.endswith('**') and len(stripped) < 80:
+            # A line that is bold on its own is a section title
+            flush()
+            blocks.append(('heading', stripped.strip('*').strip().rstrip(':')))
+        else:
+            paragraph.append(stripped)
+    flush()
+    return blocks
+
+
+def render_jd_pdf(job_title, jd_text, font_path=""):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+    styles = _pdf_styles(font_path)
+    story = [Paragraph(escape(f"{job_title} - Job Description"), styles['title'])]
+    for kind, text in jd_blocks(jd_text):
+        if kind == 'bullet':
+            story.append(Paragraph(_inline_markup(text), styles['bullet'], bulletText='•'))
+        else:
+            story.append(Paragraph(_inline_markup(text), styles[kind]))
+
+    def page_number(canvas, doc):
+        canvas.setFont(styles['body'].fontName, 8)
+        canvas.drawRightString(A4[0] - 18 * mm, 10 * mm, f"Page {doc.page}")
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4, title=f"{job_title} - Job Description",
+        leftMargin=18 * mm, rightMargin=18 * mm, topMargin=18 * mm, bottomMargin=18 * mm
+    )
+    doc.build(story, onFirstPage=page_number, onLaterPages=page_number)
+    return buffer.getvalue()
+
+
+def render_jd_docx(job_title, jd_text, font_path=""):
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading(f"{job_title} - Job Description", 0)
+    for kind, text in jd_blocks(jd_text):
+        text = text.replace('**', '')
+        if kind == 'heading':
+            doc.add_heading(text, 2)
+        elif kind == 'bullet':
+            doc.add_paragraph(text, style='List Bullet')
+        else:
+            doc.add_paragraph(text)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+RENDERERS = {'pdf': render_jd_pdf, 'docx': render_jd_docx}
+
+
+def render_jd(output_format, job_title, jd_text, font_path=""):
+    return RENDERERS[output_format](job_title, jd_text, font_path)
+
+
+# ------------ Process Pool ------------
+# Layout is CPU-bound pure Python, so it runs in worker processes shared by every request
+_pool = SharedProcessPool('JD_RENDER_WORKERS')
+
+
+def get_render_pool():
+    return _pool.executor()
+
+
+def _timed_out(executor, job_title):
+    _pool.discard(executor)
+    return RenderTimeout(f"Rendering the JD file for {job_title} timed out.")
+
+
+def render_jd_in_pool(output_format, job_title, jd_text):
+    future, executor = _pool.submit(render_jd, output_format, job_title, jd_text, settings.JD_PDF_FONT)
+    try:
+        return future.result(timeout=settings.JD_RENDER_TIMEOUT or None)
+    except FutureTimeoutError:
+        raise _timed_out(executor, job_title)
+
+
+async def arender_jd_in_pool(output_format, job_title, jd_text):
+    future, executor = _pool.submit(render_jd, output_format, job_title, jd_text, settings.JD_PDF_FONT)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), settings.JD_RENDER_TIMEOUT or None)
+    except asyncio.TimeoutError:
+        raise _timed_out(executor, job_title)
+
+
+# ------------ Artifact Cache ------------
+def artifact_digest(output_format, job_title, jd_text):
+    key = "\0".join([JD_RENDER_VERSION, output_format, job_title, jd_text])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def artifact_path(output_format, job_title, jd_text):
+    """(path, digest) where the rendered JD file is stored; the file may not exist yet."""
+    digest = artifact_digest(output_format, job_title, jd_text)
+    return os.path.join(settings.JD_ARTIFACT_DIR, digest[:2], f"{digest}.{output_format}"), digest
+
+
+def write_artifact(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Write to a temp file and rename so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def touch_artifact(path):
+    """Mark a stored artifact as just used so pruning keeps it; False if it doesn't exist."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def prune_artifacts():
+    # Least recently used first: a hit refreshes the file's mtime
+    if not settings.JD_ARTIFACT_KEEP:
+        return
+    files = []
+    for directory, _, file_names in os.walk(settings.JD_ARTIFACT_DIR):
+        for file_name in file_names:
+            if not file_name.endswith('.tmp'):
+                path = os.path.join(directory, file_name)
+                try:
+                    files.append((os.stat(path).st_mtime, path))
+                except FileNotFoundError:
+                    pass
+    files.sort()
+    for _, path in files[:max(len(files) - settings.JD_ARTIFACT_KEEP, 0)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def store_artifact(path, data):
+    write_artifact(path, data)
+    prune_artifacts()
+
+
+def get_jd_artifact(output_format, job_title, jd_text):
+    """Return (path, digest) of the rendered JD file, rendering it only if no identical file exists yet.
+
+    Files are named by the hash of everything that affects their bytes, so a name is never reused for
+    different content and concurrent renders of the same JD simply produce the same file. Only the
+    JD_ARTIFACT_KEEP most recently used files are kept.
+    """
+    path, digest = artifact_path(output_format, job_title, jd_text)
+    exists = touch_artifact(path)
+    record_cache('jd_artifact', exists)
+    if not exists:
+        with timed('render'):
+            data = render_jd_in_pool(output_format, job_title, jd_text)
+        store_artifact(path, data)
+    return path, digest
+
+
+async def aget_jd_artifact(output_format, job_title, jd_text):
+    """get_jd_artifact for async views: the render is awaited instead of blocking a thread."""
+    path, digest = artifact_path(output_format, job_title, jd_text)
+    exists = await asyncio.to_thread(touch_artifact, path)
+    record_cache('jd_artifact', exists)
+    if not exists:
+        with timed('render'):
+            data = await arender_jd_in_pool(output_format, job_title, jd_text)
+        await asyncio.to_thread(store_artifact, path, data)
+    return path, digest
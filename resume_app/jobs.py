@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import CandidateJob
+from .services import build_candidate, candidate_data, parse_resume, upload_to_s3
+
+
+# ------------ Queue ------------
+def claim_next_job():
+    """Atomically move the oldest queued job to `running` and return it, or None if the queue is empty.
+
+    The claim is a conditional UPDATE, so any number of workers can poll the same table.
+    """
+    while True:
+        job_id = CandidateJob.objects.filter(status='queued').order_by('id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = CandidateJob.objects.filter(id=job_id, status='queued').update(
+            status='running', started_at=timezone.now(), updated_at=timezone.now()
+        )
+        if claimed:
+            return CandidateJob.objects.select_related('position').get(id=job_id)
+
+
+def requeue_stale_jobs(older_than):
+    """Put `running` jobs whose worker stopped reporting progress back on the queue."""
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return CandidateJob.objects.filter(status='running', updated_at__lt=cutoff).update(
+        status='queued', stage='queued', updated_at=timezone.now()
+    )
+
+
+# ------------ Processing ------------
+def run_candidate_job(job):
+    """Run the upload -> extract -> parse -> save pipeline for a claimed job, recording each stage."""
+    position = job.position
+    data = job.request_data
+    file_name = job.file_name
+
+    try:
+        with job.resume_file.open('rb') as resume_file:
+            job.set_stage('uploading')
+            s3_url = upload_to_s3(resume_file, file_name)
+
+            parsed = parse_resume(resume_file, file_name, on_stage=job.set_stage)
+
+        job.set_stage('saving')
+        candidate = build_candidate(position, data, job.resume_file, parsed.extracted_data)
+        candidate.set_extracted_text(parsed.resume_text, parsed.content_hash, parsed.extractor_version)
+        candidate.save()
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+        return job
+
+    job.candidate = candidate
+    job.result = candidate_data(candidate, s3_url)
+    job.status = 'completed'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['candidate', 'result', 'status', 'finished_at', 'updated_at'])
+    job.set_stage('done')
+    return job
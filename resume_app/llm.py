@@ -0,0 +1,432 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .metrics import LLM_TOKENS, record_stage, timed
+from .prompts import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMUnavailable(LLMError):
+    """The gateway refused the call without trying: circuit open or every slot busy."""
+
+
+# ------------ Backends ------------
+# A backend turns a prompt into reply text. LLM_BACKEND names the class to use; it is built once per process.
+class GeminiBackend:
+    def __init__(self):
+        import google.generativeai as genai
+        from google.api_core import exceptions
+
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(settings.LLM_MODEL)
+        self.retryable = (
+            exceptions.TooManyRequests, exceptions.ResourceExhausted, exceptions.ServiceUnavailable,
+            exceptions.InternalServerError, exceptions.DeadlineExceeded, ConnectionError, TimeoutError,
+        )
+
+    def generate(self, prompt, max_output_tokens=None):
+        generation_config = {'max_output_tokens': max_output_tokens} if max_output_tokens else None
+        response = self.model.generate_content(
+            prompt, generation_config=generation_config, request_options={'timeout': settings.LLM_REQUEST_TIMEOUT}
+        )
+        return response.text
+
+    async def agenerate(self, prompt, max_output_tokens=None):
+        generation_config = {'max_output_tokens': max_output_tokens} if max_output_tokens else None
+        response = await self.model.generate_content_async(
+            prompt, generation_config=generation_config, request_options={'timeout': settings.LLM_REQUEST_TIMEOUT}
+        )
+        return response.text
+
+    def stream(self, prompt, max_output_tokens=None):
+        generation_config = {'max_output_tokens': max_output_tokens} if max_output_tokens else None
+        response = self.model.generate_content(
+            prompt, generation_config=generation_config, stream=True,
+            request_options={'timeout': settings.LLM_REQUEST_TIMEOUT}
+        )
+        for chunk in response:
+            if chunk.parts:  # safety-blocked or empty chunks carry no text
+                yield chunk.text
+
+    def is_retryable(self, exc):
+        return isinstance(exc, self.retryable)
+
+
+class StubBackend:
+    """Offline backend: replies with LLM_STUB_RESPONSE after LLM_STUB_LATENCY seconds and records prompts."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def reply(self, prompt):
+        return settings.LLM_STUB_RESPONSE
+
+    def generate(self, prompt, max_output_tokens=None):
+        self.prompts.append(prompt)
+        if settings.LLM_STUB_LATENCY:
+            time.sleep(settings.LLM_STUB_LATENCY)
+        return self.reply(prompt)
+
+    async def agenerate(self, prompt, max_output_tokens=None):
+        self.prompts.append(prompt)
+        if settings.LLM_STUB_LATENCY:
+            await asyncio.sleep(settings.LLM_STUB_LATENCY)
+        return self.reply(prompt)
+
+    def stream(self, prompt, max_output_tokens=None):
+        # The stub's latency is spread over word-sized chunks
+        self.prompts.append(prompt)
+        words = self.reply(prompt).split(" ")
+        for i, word in enumerate(words):
+            if settings.LLM_STUB_LATENCY:
+                time.sleep(settings.LLM_STUB_LATENCY / len(words))
+            yield word if i == len(words) - 1 else word + " "
+
+    def is_retryable(self, exc):
+        return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+# ------------ Flow Control ------------
+class TokenBucket:
+    """Allows `rate` calls per second on average with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        # Takes a token if one is available (returns 0), otherwise returns the seconds until the next one
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def aacquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; after `cooldown` seconds one trial call is let through."""
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = None  # ticket of the trial call in flight while half-open
+        self._lock = threading.Lock()
+
+    @property
+    def trial_running(self):
+        return self._trial is not None
+
+    def _refusing(self):
+        return self.opened_at is not None and (
+            time.monotonic() - self.opened_at < self.cooldown or self._trial is not None
+        )
+
+    def blocked(self):
+        """Whether allow() would refuse a call right now; unlike allow(), never claims the trial."""
+        with self._lock:
+            return self._refusing()
+
+    def allow(self):
+        """Return a falsy value to refuse the call, otherwise a ticket for it.
+
+        The ticket must go to release_trial() once the call is over, whether or not an outcome was recorded,
+        so a half-open trial that is refused a slot, times out or is cancelled doesn't block every later call.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._refusing():
+                return False
+            self._trial = object()
+            return self._trial
+
+    def release_trial(self, ticket):
+        with self._lock:
+            if self._trial is ticket:
+                self._trial = None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = None
+            if self.threshold and (self.opened_at is not None or self.failures >= self.threshold):
+                if self.opened_at is None:
+                    logger.warning("LLM circuit opened after %s consecutive failures", self.failures)
+                self.opened_at = time.monotonic()
+
+
+# ------------ Gateway ------------
+class LLMGateway:
+    """Every LLM call in the process goes through here: bounded concurrency, rate limiting, retries with
+    jittered exponential backoff and a circuit breaker, so a slow or failing provider can't tie up every worker.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.max_concurrency = settings.LLM_MAX_CONCURRENCY
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self.bucket = TokenBucket(settings.LLM_RATE_PER_MINUTE / 60, settings.LLM_BURST) if settings.LLM_RATE_PER_MINUTE else None
+        self.breaker = CircuitBreaker(settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_COOLDOWN)
+
+    # The breaker is only peeked at here so an open circuit fails fast; the half-open trial is claimed per
+    # attempt in _call_with_retries, once the slot and rate token are held.
+    def _acquire(self):
+        if self.breaker.blocked():
+            raise LLMUnavailable("The language model is temporarily unavailable; try again shortly.")
+        if not self.slots.acquire(timeout=settings.LLM_QUEUE_TIMEOUT):
+            raise LLMUnavailable("Too many language model requests in progress; try again shortly.")
+        self._count_in_flight(1)
+
+    async def _aacquire(self):
+        if self.breaker.blocked():
+            raise LLMUnavailable("The language model is temporarily unavailable; try again shortly.")
+        # The slots are shared with sync callers on other threads, so poll rather than block the event loop
+        deadline = time.monotonic() + settings.LLM_QUEUE_TIMEOUT
+        while not self.slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                raise LLMUnavailable("Too many language model requests in progress; try again shortly.")
+            await asyncio.sleep(0.01)
+        self._count_in_flight(1)
+
+    def _release(self):
+        self._count_in_flight(-1)
+        self.slots.release()
+
+    def _count_in_flight(self, delta):
+        with self._in_flight_lock:
+            self.in_flight += delta
+
+    def _admit(self):
+        ticket = self.breaker.allow()
+        if not ticket:
+            raise LLMUnavailable("The language model is temporarily unavailable; try again shortly.")
+        return ticket
+
+    def _retry_delay(self, error, attempt):
+        """Record a failed call and return how long to wait before retrying; raises when it shouldn't be retried."""
+        if not self.backend.is_retryable(error):
+            self.breaker.record_success()  # the provider answered; the request itself was bad
+            raise error
+        self.breaker.record_failure()
+        if attempt == settings.LLM_MAX_RETRIES or self.breaker.blocked():
+            raise LLMError(f"Language model request failed: {error}") from error
+        # Full jitter keeps workers that failed together from retrying together
+        delay = random.uniform(0, min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * 2 ** attempt))
+        logger.info("LLM call failed (%s); retry %s in %.2fs", error, attempt + 1, delay)
+        return delay
+
+    def _call_with_retries(self, call):
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if self.bucket and not self.bucket.acquire(timeout=settings.LLM_QUEUE_TIMEOUT):
+                raise LLMUnavailable("Language model rate limit reached; try again shortly.")
+            ticket = self._admit()
+            try:
+                result = call()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                self.breaker.release_trial(ticket)
+            time.sleep(delay)
+
+    async def _acall_with_retries(self, call):
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            if self.bucket and not await self.bucket.aacquire(timeout=settings.LLM_QUEUE_TIMEOUT):
+                raise LLMUnavailable("Language model rate limit reached; try again shortly.")
+            ticket = self._admit()
+            try:
+                result = await call()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+            else:
+                self.breaker.record_success()
+                return result
+            finally:
+                # Also reached on cancellation, which no `except Exception` sees
+                self.breaker.release_trial(ticket)
+            await asyncio.sleep(delay)
+
+    def generate(self, prompt, max_output_tokens=None):
+        self._acquire()
+        try:
+            with timed('llm'):
+                reply = self._call_with_retries(lambda: self.backend.generate(prompt, max_output_tokens=max_output_tokens))
+        finally:
+            self._release()
+        count_tokens(prompt, reply)
+        return reply
+
+    async def agenerate(self, prompt, max_output_tokens=None):
+        """generate() for async views: waiting for a slot, a rate token, a backoff or the reply holds no thread."""
+        await self._aacquire()
+        try:
+            with timed('llm'):
+                reply = await self._acall_with_retries(
+                    lambda: self.backend.agenerate(prompt, max_output_tokens=max_output_tokens)
+                )
+        finally:
+            self._release()
+        count_tokens(prompt, reply)
+        return reply
+
+    def stream(self, prompt, max_output_tokens=None):
+        """Return an LLMStream of reply text chunks.
+
+        The first chunk is awaited here, so refusals and failures before any output raise immediately
+        (and are retried); an error after that is raised from the iterator as LLMError. The concurrency
+        slot is held until the stream is exhausted or closed, so callers must close streams they abandon.
+        """
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            def start():
+                chunks = iter(self.backend.stream(prompt, max_output_tokens=max_output_tokens))
+                return chunks, next(chunks, None)
+
+            chunks, first = self._call_with_retries(start)
+        except BaseException:
+            self._release()
+            raise
+        return LLMStream(self, prompt, chunks, first, started)
+
+    def state(self):
+        """Snapshot for the metrics endpoint."""
+        return {
+            'in_flight': self.in_flight,
+            'breaker_open': self.breaker.opened_at is not None,
+            'consecutive_failures': self.breaker.failures,
+        }
+
+
+class LLMStream:
+    """Iterator over a streamed reply that holds the gateway's concurrency slot until it is exhausted or
+    closed. Unlike a generator's `finally`, close() releases the slot even if iteration never started,
+    e.g. when a client disconnects before the response body is read.
+    """
+
+    def __init__(self, gateway, prompt, chunks, first, started):
+        self.gateway = gateway
+        self.prompt = prompt
+        self.chunks = chunks
+        self.first = first
+        self.started = started
+        self.received = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration
+        try:
+            if self.first is not None:
+                chunk, self.first = self.first, None
+            elif not self.received:
+                raise StopIteration  # the backend sent nothing at all
+            else:
+                chunk = next(self.chunks)
+        except StopIteration:
+            self.close()
+            raise
+        except Exception as e:
+            if self.gateway.backend.is_retryable(e):
+                self.gateway.breaker.record_failure()
+            self.close()
+            raise LLMError(f"Language model stream failed: {e}") from e
+        self.received.append(chunk)
+        return chunk
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        try:
+            if hasattr(self.chunks, 'close'):
+                self.chunks.close()
+        finally:
+            self.gateway._release()
+            record_stage('llm', time.perf_counter() - self.started)
+            count_tokens(self.prompt, "".join(self.received))
+
+
+def count_tokens(prompt, reply):
+    LLM_TOKENS.inc('prompt', amount=estimate_tokens(prompt))
+    LLM_TOKENS.inc('output', amount=estimate_tokens(reply or ""))
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm():
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(import_string(settings.LLM_BACKEND)())
+    return _gateway
+
+
+def parse_json_reply(text, default):
+    """Parse a JSON object from model output, tolerating Markdown fences or prose around it."""
+    text = (text or "").strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            return json.loads(text[text.find('{'):text.rfind('}') + 1])
+        except Exception:
+            return dict(default)
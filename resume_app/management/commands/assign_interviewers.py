@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_app.assignment import InterviewerIndex, assign_pending_interviews
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign interviewers to pending interviews that have none, matching interviewer keywords, domain and "
+        "experience against the position and spreading load across interviewers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--limit', type=int, default=0, help="Stop after this many interviews (0 = no limit).")
+        parser.add_argument('--dry-run', action='store_true', help="Decide assignments without saving them.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = InterviewerIndex.build()
+        self.stdout.write(f"Indexed {len(index.ids)} interviewer(s)")
+        assigned, unassigned = assign_pending_interviews(
+            batch_size=options['batch_size'], limit=options['limit'], dry_run=options['dry_run'], index=index
+        )
+        elapsed = time.perf_counter() - started
+        prefix = "[dry run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{assigned} interview(s) assigned, {unassigned} without a suitable interviewer ({elapsed:.2f}s)"
+        ))
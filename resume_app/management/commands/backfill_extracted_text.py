@@ -0,0 +1,141 @@
+import hashlib
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from resume_app.extraction import EXTRACTOR_VERSION, extractor_version, submit_extraction, wait_for_extraction
+from resume_app.matching import candidates_changed
+from resume_app.models import Candidate, Position, ResumeExtractionCache
+from resume_app.search import index_candidates
+
+# model -> (model class, FileField holding its source document, extra fields the backfill may update)
+SOURCES = {
+    'candidate': (Candidate, 'resume_file', ['skills', 'updated_at']),
+    'position': (Position, 'job_description_file', []),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Store extracted text, content hash and extractor version on existing candidates and positions. "
+        "Only rows not yet processed by the current extractor version are touched, so the command can be "
+        "stopped and re-run at any time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=['candidate', 'position', 'all'], default='all')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--limit', type=int, default=0, help="Stop after this many rows (0 = no limit).")
+        parser.add_argument('--sleep', type=float, default=0, help="Seconds to pause between batches.")
+
+    def handle(self, *args, **options):
+        models = SOURCES if options['model'] == 'all' else {options['model']: SOURCES[options['model']]}
+        for label, (model, file_field, extra_fields) in models.items():
+            done, failed = self.backfill(model, file_field, extra_fields, options)
+            self.stdout.write(self.style.SUCCESS(f"{label}: {done} row(s) updated, {failed} failed"))
+
+    def backfill(self, model, file_field, extra_fields, options):
+        pending = (
+            model.objects
+            .filter(~Q(extractor_version__startswith=f"{EXTRACTOR_VERSION}:"))
+            .exclude(**{f"{file_field}__isnull": True})
+            .exclude(**{file_field: ""})
+            .order_by('pk')
+            .only('pk', file_field, *extra_fields)
+        )
+        done = failed = 0
+        last_pk = 0
+        while True:
+            # Every row in a batch ends up updated or failed, so capping the batch stops exactly at --limit
+            size = options['batch_size']
+            if options['limit']:
+                size = min(size, options['limit'] - done - failed)
+            # Walk forward by primary key so rows that keep failing aren't picked up again in this run
+            batch = list(pending.filter(pk__gt=last_pk)[:size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            files = []
+            for row in batch:
+                field_file = getattr(row, file_field)
+                try:
+                    with field_file.open('rb') as f:
+                        data = f.read()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} #{row.pk}: {e}")
+                    continue
+                files.append((row, field_file.name, data, hashlib.sha256(data).hexdigest()))
+
+            # Resumes already extracted by the current pipeline for the upload cache don't need parsing again
+            known_texts = {
+                content_hash: (text, version)
+                for content_hash, text, version in ResumeExtractionCache.objects.filter(
+                    content_hash__in={f[3] for f in files},
+                    extractor_version__startswith=f"{EXTRACTOR_VERSION}:"
+                ).values_list('content_hash', 'resume_text', 'extractor_version')
+            }
+
+            # Candidates created before skills were stored get them from the cached LLM output
+            if model is Candidate:
+                cached_skills = {
+                    content_hash: extracted_data.get('skills')
+                    for content_hash, extracted_data in ResumeExtractionCache.objects.filter(
+                        content_hash__in={f[3] for f in files}
+                    ).values_list('content_hash', 'extracted_data')
+                    if isinstance(extracted_data.get('skills'), list)
+                }
+                for row, file_name, data, content_hash in files:
+                    if not row.skills and content_hash in cached_skills:
+                        row.skills = cached_skills[content_hash]
+
+            updated = []
+            futures = {}
+            for row, file_name, data, content_hash in files:
+                if content_hash in known_texts:
+                    text, version = known_texts[content_hash]
+                    row.set_extracted_text(text, content_hash, version)
+                    updated.append(row)
+                    continue
+                try:
+                    futures[row.pk] = submit_extraction(data, file_name)
+                except ValueError as e:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} #{row.pk}: {e}")
+
+            for row, file_name, data, content_hash in files:
+                if row.pk not in futures:
+                    continue
+                try:
+                    result = wait_for_extraction(futures[row.pk], file_name)
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} #{row.pk}: {e}")
+                    continue
+                row.set_extracted_text(result.text, content_hash, extractor_version(result))
+                updated.append(row)
+
+            if 'updated_at' in extra_fields:
+                # bulk_update skips auto_now; the ranking index relies on it to pick up changed skills
+                now = timezone.now()
+                for row in updated:
+                    row.updated_at = now
+            model.objects.bulk_update(
+                updated,
+                ['extracted_text_data', 'extracted_text_compressed', 'content_hash', 'extractor_version', *extra_fields]
+            )
+            if model is Candidate:
+                # bulk_update sends no post_save, so refresh the search rows here
+                index_candidates(Candidate.objects.filter(pk__in=[row.pk for row in updated]))
+                candidates_changed()
+            done += len(updated)
+            self.stdout.write(f"{model.__name__}: {done} updated (through pk {last_pk})")
+
+            if options['limit'] and done + failed >= options['limit']:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        return done, failed
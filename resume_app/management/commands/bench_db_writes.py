@@ -0,0 +1,83 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from resume_app.models import ResumeExtractionCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent write throughput on a scratch SQLite file with Django's default connection "
+        "settings ('basic') and the tuned profile from settings.SQLITE_TUNED_OPTIONS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200, help="Writes per thread.")
+
+    def handle(self, *args, **options):
+        profiles = {
+            'basic': {},
+            'tuned': settings.SQLITE_TUNED_OPTIONS,
+        }
+        self.stdout.write(f"{options['threads']} threads x {options['writes']} writes, each a read-then-insert transaction")
+        self.stdout.write(f"{'profile':8} {'seconds':>8} {'writes/s':>9} {'ok':>6} {'locked':>7}")
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, sqlite_options in profiles.items():
+                alias = f'bench_{name}'
+                connections.settings[alias] = {
+                    **connections.settings['default'],
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': os.path.join(tmp, f'{name}.sqlite3'),
+                    'OPTIONS': dict(sqlite_options),
+                    'CONN_MAX_AGE': 0,
+                }
+                try:
+                    with connections[alias].schema_editor() as editor:
+                        editor.create_model(ResumeExtractionCache)
+                    elapsed, ok, locked = self.run_writers(alias, options['threads'], options['writes'])
+                finally:
+                    connections[alias].close()
+                    del connections[alias]
+                    del connections.settings[alias]
+                self.stdout.write(f"{name:8} {elapsed:8.2f} {ok / elapsed:9.1f} {ok:6} {locked:7}")
+
+    def run_writers(self, alias, threads, writes):
+        ok = locked = 0
+        counter_lock = threading.Lock()
+        start = threading.Barrier(threads)
+
+        def writer(worker):
+            nonlocal ok, locked
+            start.wait()
+            try:
+                for i in range(writes):
+                    content_hash = f"{worker}-{i}"
+                    try:
+                        # The shape of parse_resume: look the hash up, then insert inside the same transaction
+                        with transaction.atomic(using=alias):
+                            ResumeExtractionCache.objects.using(alias).filter(content_hash=content_hash).exists()
+                            ResumeExtractionCache.objects.using(alias).create(
+                                content_hash=content_hash, prompt_version="bench", resume_text="x" * 2000,
+                                extracted_data={"name": content_hash}
+                            )
+                        with counter_lock:
+                            ok += 1
+                    except OperationalError:
+                        with counter_lock:
+                            locked += 1
+            finally:
+                connections[alias].close()
+
+        workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return time.perf_counter() - started, ok, locked
@@ -0,0 +1,302 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import boto3
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+
+from resume_app import llm, services
+from resume_app.llm import StubBackend
+from resume_app.matching import candidates_changed
+from resume_app.models import Candidate, Interview, Position, User
+
+# What the stub model answers: one JSON object serves both the resume and the JD skills prompts
+STUB_JSON = json.dumps({
+    "name": "Bench Candidate",
+    "email": "bench.candidate@example.com",
+    "phone": "+91 98765 43210",
+    "skills": ["Python", "AWS", "Docker", "Linux"],
+    "experience": 2,
+    "mandatory_skills": ["AWS", "Linux"],
+    "optional_skills": ["Docker", "Terraform"],
+})
+STUB_JD = """## About the Role
+We are looking for a {title} to build and operate cloud services used by thousands of customers.
+
+## Responsibilities
+* Design, deploy and monitor **reliable** infrastructure on AWS
+* Automate provisioning with Terraform and CI/CD pipelines
+* Work with developers to improve performance and cost
+
+## Requirements
+* Hands-on experience with Linux, networking and scripting
+* Familiarity with Docker and Kubernetes
+"""
+
+
+class BenchBackend(StubBackend):
+    """Deterministic offline model: JSON for extraction prompts, a fixed Markdown JD for everything else."""
+
+    def reply(self, prompt):
+        return STUB_JSON if "Return JSON" in prompt else STUB_JD.format(title="Cloud Engineer")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def pdf_variant(data, i):
+    # A comment after %%EOF changes the file hash (so caches miss) without changing the text
+    return data + f"\n% bench {i}\n".encode()
+
+
+def docx_variant(data, i):
+    # The JD skills cache is keyed by text, so DOCX variants need different text, not just different bytes
+    from docx import Document
+
+    doc = Document(BytesIO(data))
+    doc.add_paragraph(f"Requisition BENCH-{i}")
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main API endpoints offline: moto S3, a stub Gemini backend with fixed latency and the "
+        "sample files in resumes/ and job_descriptions/, on a scratch database. Reports p50/p95/p99 latency, "
+        "queries per request and throughput under concurrency. Fails if any request errors, and with --baseline "
+        "on regressions."
+    )
+
+    ENDPOINTS = ('positions', 'candidates', 'jd-preview', 'jd-file', 'interviews')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=30, help="Requests per endpoint and phase.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Client threads in the concurrent phase.")
+        parser.add_argument('--llm-latency', type=float, default=0.2, help="Seconds per stub model call.")
+        parser.add_argument('--endpoints', nargs='*', choices=self.ENDPOINTS, default=list(self.ENDPOINTS))
+        parser.add_argument('--warm', action='store_true',
+                            help="Repeat identical inputs so requests hit the extraction, LLM and file caches.")
+        parser.add_argument('--interviews', type=int, default=500, help="Interviews seeded for the list endpoint.")
+        parser.add_argument('--json', dest='json_path', help="Write the results to this file.")
+        parser.add_argument('--baseline', help="Results file from an earlier run to compare against.")
+        parser.add_argument('--max-regression', type=float, default=25.0,
+                            help="Percent p95 latency may rise (or throughput fall) against --baseline before failing.")
+
+    def handle(self, *args, **options):
+        try:
+            from moto import mock_aws
+        except ImportError:
+            raise CommandError("This benchmark needs moto>=5 (pip install moto).")
+
+        baseline = None
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+
+        with tempfile.TemporaryDirectory() as tmp, mock_aws(), override_settings(
+            LLM_BACKEND='resume_app.management.commands.bench_endpoints.BenchBackend',
+            LLM_STUB_LATENCY=options['llm_latency'],
+            LLM_RATE_PER_MINUTE=0,
+            LLM_MAX_CONCURRENCY=max(settings.LLM_MAX_CONCURRENCY, options['concurrency']),
+            MEDIA_ROOT=os.path.join(tmp, 'media'),
+            JD_ARTIFACT_DIR=os.path.join(tmp, 'jd_artifacts'),
+        ):
+            boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME).create_bucket(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME
+            )
+            services._s3_client = None
+            llm._gateway = None
+            results = self.run_on_scratch_database(tmp, options)
+            services._s3_client = None
+            llm._gateway = None
+
+        if options['json_path']:
+            Path(options['json_path']).write_text(json.dumps(results, indent=2))
+        if baseline is not None:
+            self.compare(results, baseline, options['max_regression'])
+        # Timings of failing requests mean nothing, so errors fail the run with or without a baseline
+        failed = [f"{name}: {row['errors']} error(s)" for name, row in results.items() if row['errors']]
+        if failed:
+            raise CommandError("Requests failed during the benchmark:\n  " + "\n  ".join(failed))
+
+    def run_on_scratch_database(self, tmp, options):
+        # A file database, not the in-memory test default, so the concurrent phase's threads share it
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tmp, 'bench.sqlite3')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(options)
+            self.stdout.write(
+                f"{options['requests']} requests per phase, {options['concurrency']} threads, "
+                f"stub LLM {options['llm_latency'] * 1000:.0f} ms, {'warm' if options['warm'] else 'cold'} caches"
+            )
+            self.stdout.write(
+                f"{'endpoint':11} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>7} "
+                f"{'req/s':>7} {'conc p95':>9} {'errors':>6}"
+            )
+            results = {}
+            for name in options['endpoints']:
+                results[name] = self.bench(name, options)
+                row = results[name]
+                self.stdout.write(
+                    f"{name:11} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f} {row['queries']:7} "
+                    f"{row['throughput_rps']:7.1f} {row['concurrent_p95_ms']:9.1f} {row['errors']:6}"
+                )
+            return results
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def seed(self, options):
+        samples = Path(settings.BASE_DIR)
+        self.resume_pdf = sorted((samples / 'resumes').glob('*.pdf'))[0].read_bytes()
+        self.jd_docx = sorted((samples / 'job_descriptions').glob('*.docx'))[0].read_bytes()
+
+        self.employer = User.objects.create_user('bench-employer', password='bench', role='employer')
+        interviewer = User.objects.create_user('bench-interviewer', password='bench', role='interviewer')
+        self.position = Position.objects.create(
+            employer=self.employer, job_title="Junior Cloud Engineer", domain="Cloud", exp_from=0, exp_to=2,
+            mandatory_skills=["AWS", "Linux"], optional_skills=["Docker"]
+        )
+        candidates = Candidate.objects.bulk_create(
+            Candidate(position=self.position, name=f"Seed Candidate {i}", experience=i % 5)
+            for i in range(min(options['interviews'], 200))
+        )
+        candidates_changed()
+        if candidates:
+            Interview.objects.bulk_create(
+                Interview(
+                    employer=self.employer, interviewer=interviewer, position=self.position,
+                    candidate=candidates[i % len(candidates)], status='scheduled'
+                )
+                for i in range(options['interviews'])
+            )
+        self.counter = 0
+        self.counter_lock = threading.Lock()
+
+    def next_index(self):
+        with self.counter_lock:
+            self.counter += 1
+            return self.counter
+
+    def make_request(self, name, warm):
+        """Build one request for `name`: returns (method, path, data, format). Inputs are prepared here,
+        outside the timed section."""
+        # File names are always distinct: moto's S3 can't take concurrent PUTs to one key
+        i = self.next_index()
+        if name == 'positions':
+            data = self.jd_docx if warm else docx_variant(self.jd_docx, i)
+            return 'post', '/api/positions/', {
+                'job_description_file': SimpleUploadedFile(f'jd_{i}.docx', data),
+                'job_title': "Junior Cloud Engineer", 'domain': "Cloud", 'exp_from': 0, 'exp_to': 2,
+            }, 'multipart'
+        if name == 'candidates':
+            data = self.resume_pdf if warm else pdf_variant(self.resume_pdf, i)
+            return 'post', '/api/candidates/', {
+                'position_id': self.position.id,
+                'resume_file': SimpleUploadedFile(f'resume_{i}.pdf', data, content_type='application/pdf'),
+            }, 'multipart'
+        jd_data = {'job_title': "Cloud Engineer" if warm else f"Cloud Engineer {i}", 'domain': "Cloud", 'experience': 2}
+        if name == 'jd-preview':
+            return 'post', '/api/generate-jd-preview/', jd_data, 'json'
+        if name == 'jd-file':
+            return 'post', '/api/generate-jd-file/', {**jd_data, 'format': 'pdf'}, 'json'
+        return 'get', '/api/interviews/', None, None
+
+    def send(self, client, name, warm):
+        method, path, data, fmt = self.make_request(name, warm)
+        started = time.perf_counter()
+        if method == 'get':
+            response = client.get(path)
+        else:
+            response = client.post(path, data, format=fmt)
+        # File downloads are streamed; reading the body is part of the cost
+        if getattr(response, 'streaming', False):
+            b"".join(response.streaming_content)
+        elapsed = time.perf_counter() - started
+        return elapsed, response.status_code
+
+    def client(self):
+        client = APIClient()
+        client.force_authenticate(self.employer)
+        return client
+
+    def bench(self, name, options):
+        warm = options['warm']
+        client = self.client()
+        self.send(client, name, warm)  # warm-up: imports, worker pools, first S3 and LLM clients
+
+        # Sequential phase: latency distribution and queries per request
+        timings = []
+        queries = 0
+        errors = 0
+        for _ in range(options['requests']):
+            with CaptureQueriesContext(connection) as captured:
+                elapsed, status_code = self.send(client, name, warm)
+            timings.append(elapsed)
+            queries = max(queries, len(captured))
+            errors += status_code >= 400
+        timings.sort()
+
+        # Concurrent phase: throughput with several clients in flight
+        def worker(count):
+            client = self.client()
+            try:
+                return [self.send(client, name, warm) for _ in range(count)]
+            finally:
+                connection.close()
+
+        threads = max(options['concurrency'], 1)
+        shares = [options['requests'] // threads + (t < options['requests'] % threads) for t in range(threads)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            outcomes = [row for rows in pool.map(worker, [s for s in shares if s]) for row in rows]
+        wall = time.perf_counter() - started
+        concurrent_timings = sorted(elapsed for elapsed, _ in outcomes)
+        errors += sum(status_code >= 400 for _, status_code in outcomes)
+
+        return {
+            'p50_ms': round(percentile(timings, 50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 95) * 1000, 2),
+            'p99_ms': round(percentile(timings, 99) * 1000, 2),
+            'queries': queries,
+            'throughput_rps': round(len(outcomes) / wall, 2) if wall else 0.0,
+            'concurrent_p95_ms': round(percentile(concurrent_timings, 95) * 1000, 2),
+            'errors': errors,
+        }
+
+    def compare(self, results, baseline, max_regression):
+        allowed = 1 + max_regression / 100
+        failures = []
+        for name, row in results.items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            if row['p95_ms'] > before['p95_ms'] * allowed:
+                failures.append(f"{name}: p95 {before['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+            if row['throughput_rps'] < before['throughput_rps'] / allowed:
+                failures.append(f"{name}: throughput {before['throughput_rps']:.1f} -> {row['throughput_rps']:.1f} req/s")
+            if row['queries'] > before['queries']:
+                failures.append(f"{name}: queries per request {before['queries']} -> {row['queries']}")
+            if row['errors'] > before.get('errors', 0):
+                failures.append(f"{name}: errors {before.get('errors', 0)} -> {row['errors']}")
+        if failures:
+            raise CommandError(
+                f"Regressions against the baseline (threshold {max_regression:g}%):\n  " + "\n  ".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS(f"No regressions against the baseline (threshold {max_regression:g}%)."))
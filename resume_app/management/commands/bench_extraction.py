@@ -0,0 +1,65 @@
+import difflib
+import io
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from resume_app.extraction import PDF_ENGINES, extract_document_in_process, looks_broken
+
+
+def similarity(text, reference):
+    # Word-level similarity to the reference engine's output, insensitive to line wrapping
+    return difflib.SequenceMatcher(None, text.split(), reference.split(), autojunk=False).ratio()
+
+
+class Command(BaseCommand):
+    help = "Benchmark every registered PDF text engine over the sample files in resumes/ and job_descriptions/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--reference', default='pdfminer', help="Engine whose output is treated as ground truth.")
+        parser.add_argument('paths', nargs='*', help="Files or directories to use instead of the samples.")
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [Path(settings.BASE_DIR, 'resumes'), Path(settings.BASE_DIR, 'job_descriptions')]
+        files = []
+        for path in map(Path, paths):
+            files.extend(sorted(path.glob('*')) if path.is_dir() else [path])
+        files = [f for f in files if f.suffix in ('.pdf', '.docx')]
+
+        self.stdout.write(f"{'file':48} {'engine':12} {'ms/doc':>8} {'pages/s':>8} {'chars':>7} {'similar':>8}  broken")
+        totals = {}
+        for path in files:
+            data = path.read_bytes()
+            engines = list(PDF_ENGINES) if path.suffix == '.pdf' else ['python-docx']
+            reference = None
+            if path.suffix == '.pdf':
+                reference = extract_document_in_process(data, path.name, engines=[options['reference']]).text
+
+            for engine in engines:
+                try:
+                    result = extract_document_in_process(data, path.name, engines=[engine])
+                except ImportError:
+                    self.stdout.write(f"{path.name[-48:]:48} {engine:12} {'not installed':>8}")
+                    continue
+
+                started = time.perf_counter()
+                for _ in range(options['iterations']):
+                    extract_document_in_process(io.BytesIO(data), path.name, engines=[engine])
+                per_doc = (time.perf_counter() - started) / options['iterations']
+
+                score = similarity(result.text, reference) if reference is not None else 1.0
+                pages = max(result.pages, 1)
+                totals.setdefault(engine, []).append((per_doc, score))
+                self.stdout.write(
+                    f"{path.name[-48:]:48} {engine:12} {per_doc * 1000:8.2f} {pages / per_doc:8.1f} "
+                    f"{len(result.text):7} {score:8.3f}  {looks_broken(result.text, result.pages)}"
+                )
+
+        self.stdout.write("")
+        for engine, rows in totals.items():
+            mean_ms = sum(r[0] for r in rows) / len(rows) * 1000
+            mean_score = sum(r[1] for r in rows) / len(rows)
+            self.stdout.write(f"{engine:12} mean {mean_ms:8.2f} ms/doc  similarity {mean_score:.3f} over {len(rows)} file(s)")
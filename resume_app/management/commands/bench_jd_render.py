@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from resume_app.jd_files import get_render_pool, render_jd
+
+SECTION = """## {title}
+
+We are looking for an engineer to design, build and operate services used by thousands of customers. You will
+work closely with product and design, own features from proposal to production and help shape our practices.
+
+* Design and maintain **reliable** backend services and APIs
+* Review code and mentor other engineers on the team
+* Improve observability, performance and cost of existing systems
+* Collaborate with stakeholders to turn requirements into *well-scoped* plans
+"""
+
+
+def sample_jd(pages):
+    # About four and a half sections fill an A4 page with the default styles
+    return "\n".join(SECTION.format(title=f"Section {i + 1}") for i in range(max(round(pages * 4.5), 1)))
+
+
+def page_count(pdf):
+    return pdf.count(b"/Type /Page") - pdf.count(b"/Type /Pages")
+
+
+class Command(BaseCommand):
+    help = "Benchmark the JD PDF renderer on 1, 5 and 20 page documents, inline and on the render pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=20, help="Documents rendered per size and mode.")
+        parser.add_argument('--pages', type=int, nargs='*', default=[1, 5, 20])
+
+    def handle(self, *args, **options):
+        pool = get_render_pool()
+        # Start every worker and build its styles before timing
+        wait([pool.submit(render_jd, 'pdf', "Warm up", sample_jd(1), settings.JD_PDF_FONT)
+              for _ in range(max(settings.JD_RENDER_WORKERS, 1) * 2)])
+
+        self.stdout.write(f"{'pages':>5} {'actual':>6} {'mode':8} {'ms/doc':>8} {'docs/s':>8} {'pages/s':>8}")
+        for pages in options['pages']:
+            jd_text = sample_jd(pages)
+            actual = page_count(render_jd('pdf', "Backend Engineer", jd_text, settings.JD_PDF_FONT))
+
+            started = time.perf_counter()
+            for _ in range(options['documents']):
+                render_jd('pdf', "Backend Engineer", jd_text, settings.JD_PDF_FONT)
+            self.report(pages, actual, 'inline', time.perf_counter() - started, options['documents'])
+
+            started = time.perf_counter()
+            futures = [
+                pool.submit(render_jd, 'pdf', "Backend Engineer", jd_text, settings.JD_PDF_FONT)
+                for _ in range(options['documents'])
+            ]
+            for future in futures:
+                future.result()
+            self.report(pages, actual, 'pool', time.perf_counter() - started, options['documents'])
+
+    def report(self, pages, actual, mode, elapsed, documents):
+        self.stdout.write(
+            f"{pages:5} {actual:6} {mode:8} {elapsed / documents * 1000:8.1f} "
+            f"{documents / elapsed:8.1f} {documents * actual / elapsed:8.1f}"
+        )
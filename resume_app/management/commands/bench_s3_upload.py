@@ -0,0 +1,96 @@
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+import boto3
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_app import services
+
+
+def legacy_upload(uploaded_file):
+    """The per-request S3 path before the pooled client: new client, two full in-memory copies."""
+    s3 = boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION_NAME
+    )
+    s3.upload_fileobj(BytesIO(uploaded_file.read()), settings.AWS_STORAGE_BUCKET_NAME, uploaded_file.name)
+    uploaded_file.seek(0)
+    return BytesIO(uploaded_file.read())  # the second copy handed to text extraction
+
+
+def pooled_upload(uploaded_file):
+    services.upload_to_s3(uploaded_file, uploaded_file.name)
+    uploaded_file.seek(0)
+    return uploaded_file
+
+
+class Command(BaseCommand):
+    help = "Compare per-request S3 upload cost before/after the pooled client, against moto's in-process S3."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--file', default=None, help="File to upload (defaults to the first sample in resumes/).")
+        parser.add_argument('--size-mb', type=float, default=0,
+                            help="Upload a synthetic file of this size instead, to exercise multipart uploads.")
+
+    def handle(self, *args, **options):
+        try:
+            from moto import mock_aws
+        except ImportError:
+            raise CommandError("This benchmark needs moto>=5 (pip install moto).")
+
+        if options['size_mb']:
+            payload = b'%PDF-1.4\n' + b'0' * int(options['size_mb'] * 1024 * 1024)
+            file_name = 'synthetic.pdf'
+        else:
+            path = Path(options['file']) if options['file'] else sorted(Path(settings.BASE_DIR, 'resumes').glob('*.pdf'))[0]
+            payload = path.read_bytes()
+            file_name = path.name
+
+        self.stdout.write(f"Uploading {file_name} ({len(payload) / 1024:.1f} KiB) x {options['requests']}")
+        with mock_aws():
+            services._s3_client = None
+            boto3.client('s3', region_name='us-east-1').create_bucket(Bucket=settings.AWS_STORAGE_BUCKET_NAME)
+            try:
+                for label, upload in (("before (client per call)", legacy_upload), ("after (pooled, streaming)", pooled_upload)):
+                    self.report(label, upload, payload, file_name, options['requests'])
+            finally:
+                services._s3_client = None
+
+    def report(self, label, upload, payload, file_name, requests):
+        upload(self.make_upload(payload, file_name))  # warm-up: imports, endpoint data, first pooled client
+
+        timings = []
+        peaks = []
+        for _ in range(requests):
+            uploaded_file = self.make_upload(payload, file_name)
+            tracemalloc.start()
+            started = time.perf_counter()
+            upload(uploaded_file)
+            timings.append(time.perf_counter() - started)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            uploaded_file.close()
+
+        timings.sort()
+        self.stdout.write(
+            f"{label:28} mean {statistics.mean(timings) * 1000:7.2f} ms  "
+            f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms  "
+            f"peak alloc {max(peaks) / 1024:9.1f} KiB"
+        )
+
+    def make_upload(self, payload, file_name):
+        # Mirror Django's upload handlers: small files stay in memory, large ones are spooled to disk
+        if len(payload) <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            return SimpleUploadedFile(file_name, payload)
+        uploaded_file = TemporaryUploadedFile(file_name, 'application/pdf', len(payload), None)
+        uploaded_file.write(payload)
+        uploaded_file.seek(0)
+        return uploaded_file
@@ -0,0 +1,54 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from resume_app.jobs import claim_next_job, requeue_stale_jobs, run_candidate_job
+
+
+class Command(BaseCommand):
+    help = "Process queued candidate uploads (POST /api/candidates/?async=true). Run as many workers as needed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue and exit instead of polling.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--max-jobs', type=int, default=0, help="Exit after processing this many jobs (0 = no limit).")
+        parser.add_argument('--stale-after', type=int, default=900,
+                            help="Requeue running jobs with no progress for this many seconds (0 = never).")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        processed = 0
+        while not self.stopping:
+            close_old_connections()
+            if options['stale_after']:
+                requeued = requeue_stale_jobs(options['stale_after'])
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            job = run_candidate_job(job)
+            processed += 1
+            if job.status == 'completed':
+                self.stdout.write(self.style.SUCCESS(f"Job #{job.id} completed (candidate #{job.candidate_id})"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Job #{job.id} failed: {job.error}"))
+
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(f"Processed {processed} job(s)")
+
+    def stop(self, signum, frame):
+        # Finish the job in hand, then exit
+        self.stopping = True
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_app.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the candidate full-text search index from the Candidate table (run once after migrating)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write("This database has no FTS5 index; search uses the ORM fallback.")
+            return
+        started = time.perf_counter()
+        indexed = rebuild_index(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} candidate(s) in {time.perf_counter() - started:.1f}s"
+        ))
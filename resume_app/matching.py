@@ -0,0 +1,217 @@
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .models import Candidate
+
+_SKILL_PUNCTUATION = re.compile(r"^[\s\-•*.,;:]+|[\s.,;:]+$")
+
+
+def normalize_skill(skill):
+    """Canonical form used to compare skills: "  Python 3. " -> "python 3"."""
+    skill = unicodedata.normalize('NFKC', str(skill)).lower()
+    return " ".join(_SKILL_PUNCTUATION.sub("", skill).split())
+
+
+def normalize_skills(skills):
+    if not isinstance(skills, (list, tuple)):
+        return []
+    return list(dict.fromkeys(s for s in map(normalize_skill, skills) if s))
+
+
+# ------------ Skill Index ------------
+class SkillIndex:
+    """Inverted index from normalized skill to candidate rows, with per-row arrays for vectorized scoring.
+
+    Rows are append-only: when a candidate changes, its old row is marked dead and a new one appended.
+    """
+
+    def __init__(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.position_ids = np.zeros(0, dtype=np.int64)
+        self.experience = np.zeros(0, dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.skills = []  # normalized skill list per row, for reporting matches
+        self.postings = {}  # skill -> np.ndarray of row numbers
+        self.row_of = {}  # candidate id -> current row
+        self.watermark = None  # latest updated_at among the rows read so far
+        self.version = None  # _version when the index last matched the database
+        self.checked_at = 0.0
+        self.size = 0
+        self.dead = 0
+
+    def copy(self):
+        """Return an index that can take add() calls without changing this one.
+
+        add() replaces the row arrays and postings rather than writing into them, apart from alive,
+        so only alive and the containers need copying.
+        """
+        clone = SkillIndex.__new__(SkillIndex)
+        clone.__dict__.update(self.__dict__)
+        clone.alive = self.alive.copy()
+        clone.skills = list(self.skills)
+        clone.postings = dict(self.postings)
+        clone.row_of = dict(self.row_of)
+        return clone
+
+    def add(self, rows):
+        """Append (id, skills, experience, position_id) rows, replacing earlier rows for the same ids."""
+        if not rows:
+            return
+        start = self.size
+        new_postings = {}
+        for offset, (candidate_id, skills, experience, position_id) in enumerate(rows):
+            row = start + offset
+            previous = self.row_of.get(candidate_id)
+            if previous is not None:
+                self.alive[previous] = False
+                self.dead += 1
+            self.row_of[candidate_id] = row
+            normalized = normalize_skills(skills)
+            self.skills.append(normalized)
+            for skill in normalized:
+                new_postings.setdefault(skill, []).append(row)
+
+        count = len(rows)
+        self.ids = np.concatenate([self.ids, np.fromiter((r[0] for r in rows), np.int64, count)])
+        self.experience = np.concatenate([self.experience, np.fromiter((r[2] or 0 for r in rows), np.float64, count)])
+        self.position_ids = np.concatenate(
+            [self.position_ids, np.fromiter((r[3] or 0 for r in rows), np.int64, count)]
+        )
+        self.alive = np.concatenate([self.alive, np.ones(count, dtype=bool)])
+        for skill, new_rows in new_postings.items():
+            new_rows = np.asarray(new_rows, dtype=np.int64)
+            existing = self.postings.get(skill)
+            self.postings[skill] = new_rows if existing is None else np.concatenate([existing, new_rows])
+        self.size += count
+
+    def coverage(self, skills):
+        """Fraction of `skills` each row has, and the number of distinct skills asked for."""
+        skills = normalize_skills(skills)
+        if not skills:
+            return np.zeros(self.size), 0
+        hits = [self.postings[s] for s in skills if s in self.postings]
+        if not hits:
+            return np.zeros(self.size), len(skills)
+        return np.bincount(np.concatenate(hits), minlength=self.size) / len(skills), len(skills)
+
+    def experience_fit(self, exp_from, exp_to):
+        """1.0 inside [exp_from, exp_to]; falls off linearly below, and gently above, the range."""
+        exp = self.experience
+        fit = np.ones(self.size)
+        if exp_from:
+            below = exp < exp_from
+            fit[below] = np.clip(1 - (exp_from - exp[below]) / exp_from, 0, 1)
+        if exp_to and exp_to >= exp_from:
+            above = exp > exp_to
+            fit[above] = np.clip(1 - 0.5 * (exp[above] - exp_to) / max(exp_to, 1), 0.5, 1)
+        return fit
+
+    def rank(self, position, limit, offset=0, applied_only=False):
+        """Return (total, [(row, score, mandatory, optional, experience_fit), ...]) for one page of the ranking."""
+        mandatory, n_mandatory = self.coverage(position.mandatory_skills)
+        optional, n_optional = self.coverage(position.optional_skills)
+        experience = self.experience_fit(position.exp_from or 0, position.exp_to or 0)
+
+        w_mandatory = settings.MATCH_MANDATORY_WEIGHT
+        w_optional = settings.MATCH_OPTIONAL_WEIGHT if n_optional else 0.0
+        w_experience = settings.MATCH_EXPERIENCE_WEIGHT
+        if not n_mandatory:
+            w_mandatory = 0.0
+        total_weight = (w_mandatory + w_optional + w_experience) or 1.0
+        scores = (w_mandatory * mandatory + w_optional * optional + w_experience * experience) / total_weight
+
+        # Only candidates matching at least one requested skill are ranked
+        eligible = self.alive & ((mandatory > 0) | (optional > 0)) if (n_mandatory or n_optional) else self.alive.copy()
+        if applied_only:
+            eligible &= self.position_ids == position.id
+        candidates = np.flatnonzero(eligible)
+        total = len(candidates)
+        end = min(offset + limit, total)
+        if offset >= end:
+            return total, []
+
+        # Partial selection keeps this O(n) in the number of candidates; only the page needs a full sort
+        candidate_scores = scores[candidates]
+        if end < total:
+            top = np.argpartition(-candidate_scores, end - 1)[:end]
+        else:
+            top = np.arange(total)
+        top = top[np.lexsort((self.ids[candidates[top]], -candidate_scores[top]))][offset:end]
+        rows = candidates[top]
+        return total, [(row, scores[row], mandatory[row], optional[row], experience[row]) for row in rows]
+
+
+# ------------ Shared Index ------------
+_index = None
+_index_lock = threading.Lock()
+# Bumped by candidates_changed(); while it is unchanged the index is served without touching the database
+_version = 0
+
+
+def _bump_version():
+    global _version
+    with _index_lock:
+        _version += 1
+
+
+def candidates_changed():
+    """Mark the shared index stale once the current transaction commits.
+
+    Called from the Candidate save/delete signals and by bulk writers, which send no signals.
+    """
+    transaction.on_commit(_bump_version)
+
+
+def _candidate_rows(queryset):
+    return list(queryset.values_list('id', 'skills', 'experience', 'position_id', 'updated_at'))
+
+
+def _add_rows(index, rows):
+    index.add([row[:4] for row in rows])
+    stamps = [row[4] for row in rows if row[4] is not None]
+    if stamps:
+        index.watermark = max(stamps) if index.watermark is None else max(index.watermark, *stamps)
+
+
+def get_skill_index():
+    """Return the process-wide index, applying candidate inserts and updates since the last refresh.
+
+    Local writes are seen through candidates_changed(); writes made by other processes are picked up on
+    the first call after MATCH_INDEX_RECHECK seconds. Deletions and a high share of superseded rows
+    trigger a full rebuild. Changes are applied to a copy, so callers ranking against an index they
+    already hold are never affected by a refresh.
+    """
+    global _index
+    with _index_lock:
+        index = _index
+        version = _version
+        if (index is not None and index.version == version
+                and time.monotonic() - index.checked_at < settings.MATCH_INDEX_RECHECK):
+            return index
+
+        stats = Candidate.objects.aggregate(count=Count('id'), last_update=Max('updated_at'))
+        if index is not None:
+            last_update = stats['last_update']
+            if last_update is not None and index.watermark is not None and last_update > index.watermark:
+                # >= re-reads rows sharing the watermark timestamp in case some committed after the last refresh
+                changed = Candidate.objects.filter(updated_at__gte=index.watermark).order_by('id')
+                index = index.copy()
+                _add_rows(index, _candidate_rows(changed))
+            fresh = last_update is None or (index.watermark is not None and last_update <= index.watermark)
+            if fresh and index.size - index.dead == stats['count'] and index.dead <= index.size * 0.2:
+                index.version, index.checked_at = version, time.monotonic()
+                _index = index
+                return index
+
+        index = SkillIndex()
+        _add_rows(index, _candidate_rows(Candidate.objects.order_by('id')))
+        index.version, index.checked_at = version, time.monotonic()
+        _index = index
+        return index
@@ -0,0 +1,178 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds; covers a cached lookup through a slow LLM call
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# ------------ Metric Types ------------
+# Every process keeps its own registry; with several workers each one serves its own numbers.
+class Counter:
+    metric_type = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, label_values, value) for label_values, value in self.values.items()]
+
+
+class Histogram:
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total = self.series.get(label_values) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[label_values] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            series = {label_values: (list(counts), total) for label_values, (counts, total) in self.series.items()}
+        samples = []
+        for label_values, (counts, total) in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                samples.append((f"{self.name}_bucket", label_values + (le,), cumulative))
+            samples.append((f"{self.name}_sum", label_values, total))
+            samples.append((f"{self.name}_count", label_values, cumulative))
+        return samples
+
+
+STAGE_SECONDS = Histogram(
+    'resume_app_stage_duration_seconds', "Time spent in one stage of a request (s3, extract, llm, render, db).",
+    ('stage',)
+)
+REQUEST_SECONDS = Histogram(
+    'resume_app_request_duration_seconds', "Time to produce a response, by URL name.", ('view', 'method')
+)
+LLM_TOKENS = Counter(
+    'resume_app_llm_tokens_total', "Estimated LLM tokens sent (prompt) and received (output).", ('direction',)
+)
+CACHE_LOOKUPS = Counter(
+    'resume_app_cache_lookups_total', "Cache lookups by cache and result (hit or miss).", ('cache', 'result')
+)
+METRICS = [STAGE_SECONDS, REQUEST_SECONDS, LLM_TOKENS, CACHE_LOOKUPS]
+
+
+# ------------ Per-Request Timings ------------
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def start_request():
+    return _request_timings.set([])
+
+
+def finish_request(token):
+    """Stop collecting for the current request and return its [(stage, seconds), ...]."""
+    timings = _request_timings.get()
+    _request_timings.reset(token)
+    return timings or []
+
+
+def record_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+def time_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record_stage('db', time.perf_counter() - started)
+
+
+@contextmanager
+def timed(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def submit_with_timings(executor, fn, *args):
+    # Pool threads don't inherit context variables; carry the request's along so their stages are reported
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def record_cache(cache, hit):
+    CACHE_LOOKUPS.inc(cache, 'hit' if hit else 'miss')
+
+
+def cache_hit_ratios():
+    lookups = {}
+    for _, (cache, result), count in CACHE_LOOKUPS.samples():
+        hits, total = lookups.get(cache, (0, 0))
+        lookups[cache] = (hits + count * (result == 'hit'), total + count)
+    return [((cache,), hits / total) for cache, (hits, total) in lookups.items() if total]
+
+
+def server_timing(timings, total):
+    """Server-Timing header value: one entry per stage with its summed duration and call count.
+
+    Stages running in background threads overlap the others, so they can add up to more than `total`.
+    """
+    stages = {}
+    for stage, seconds in timings:
+        spent, calls = stages.get(stage, (0.0, 0))
+        stages[stage] = (spent + seconds, calls + 1)
+    entries = [f'{stage};dur={spent * 1000:.1f};desc="{calls}x"' for stage, (spent, calls) in stages.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+# ------------ Prometheus Exposition ------------
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_samples(lines, name, documentation, metric_type, label_names, samples):
+    lines.append(f"# HELP {name} {documentation}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for sample_name, label_values, value in samples:
+        names = label_names + ('le',) if sample_name.endswith('_bucket') else label_names
+        labels = ",".join(f'{key}="{_escape(val)}"' for key, val in zip(names, label_values))
+        lines.append(f"{sample_name}{{{labels}}} {value}" if labels else f"{sample_name} {value}")
+
+
+def render_prometheus(extra=()):
+    """All metrics in the Prometheus text format (version 0.0.4).
+
+    `extra` adds metrics computed at scrape time, as (name, documentation, type, label_names, samples)
+    tuples whose samples are (label_values, value) pairs.
+    """
+    lines = []
+    for metric in METRICS:
+        _format_samples(lines, metric.name, metric.documentation, metric.metric_type, metric.labels, metric.samples())
+    for name, documentation, metric_type, label_names, samples in extra:
+        _format_samples(
+            lines, name, documentation, metric_type, label_names,
+            [(name, label_values, value) for label_values, value in samples]
+        )
+    return "\n".join(lines) + "\n"
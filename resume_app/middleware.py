@@ -0,0 +1,107 @@
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .metrics import REQUEST_SECONDS, finish_request, server_timing, start_request
+from .profiling import aprofile_request, profile_request
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """Times each request's stages (database, S3, extraction, LLM, rendering) into the metrics histograms
+    and, when SERVER_TIMING is on, reports them to the client in a Server-Timing header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = finish_request(token)
+        return self.add_timings(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        token = start_request()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings = finish_request(token)
+        return self.add_timings(request, response, timings, time.perf_counter() - started)
+
+    def add_timings(self, request, response, timings, total):
+        match = getattr(request, 'resolver_match', None)
+        REQUEST_SECONDS.observe(total, match.view_name if match else 'unmatched', request.method)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = server_timing(timings, total)
+        return response
+
+
+def is_admin(request):
+    """Whether the request comes from an admin-role user, by session or by JWT (DRF only resolves
+    the token later, inside the view)."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return getattr(user, 'role', None) == 'admin'
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except Exception:
+        return False
+    return bool(authenticated) and getattr(authenticated[0], 'role', None) == 'admin'
+
+
+class RequestProfilerMiddleware:
+    """Profiles a request with cProfile when an admin sends `X-Profile: 1`, or for a PROFILE_SAMPLE_RATE
+    share of all requests. Reports go to PROFILE_DIR and are listed at /api/admin/profiles/; the response
+    names its report in an X-Profile-Id header.
+
+    Requests that aren't profiled pay for one header lookup (and one random() call while sampling is on).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled() and not (self.requested(request) and is_admin(request)):
+            return self.get_response(request)
+        response, report = profile_request(self.get_response, request)
+        return self.add_report(request, response, report)
+
+    async def __acall__(self, request):
+        if not self.sampled() and not (self.requested(request) and await sync_to_async(is_admin)(request)):
+            return await self.get_response(request)
+        response, report = await aprofile_request(self.get_response, request)
+        return self.add_report(request, response, report)
+
+    def requested(self, request):
+        return request.META.get('HTTP_X_PROFILE') in ('1', 'true')
+
+    def sampled(self):
+        return settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    def add_report(self, request, response, report):
+        if report:
+            logger.info("Profiled %s %s: %s", request.method, request.path, report)
+            response['X-Profile-Id'] = report
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_app', '0003_resumeextractioncache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume_file', models.FileField(upload_to='candidate_jobs/')),
+                ('file_name', models.CharField(max_length=255)),
+                ('request_data', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('stage', models.CharField(choices=[('queued', 'Queued'), ('uploading', 'Uploading to S3'), ('extracting', 'Extracting text'), ('parsing', 'Parsing with LLM'), ('saving', 'Saving candidate'), ('done', 'Done')], default='queued', max_length=20)),
+                ('stages', models.JSONField(default=list)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('candidate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='resume_app.candidate')),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidate_jobs', to='resume_app.position')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='resume_app__status_50d441_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_app', '0005_extracted_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JDSkillCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_hash', models.CharField(max_length=64)),
+                ('prompt_version', models.CharField(max_length=32)),
+                ('mandatory_skills', models.JSONField(default=list)),
+                ('optional_skills', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('text_hash', 'prompt_version'), name='unique_jd_skill_cache_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_app', '0009_position_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneratedJD',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_hash', models.CharField(max_length=64)),
+                ('prompt_version', models.CharField(max_length=32)),
+                ('job_title', models.CharField(max_length=255)),
+                ('domain', models.CharField(max_length=255)),
+                ('experience', models.IntegerField()),
+                ('jd_text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('input_hash', 'prompt_version'), name='unique_generated_jd_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    # FTS5 is SQLite-only; other databases use the ORM fallback in resume_app.search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS resume_app_candidate_fts "
+        "USING fts5(name, skills, resume_text, tokenize='porter unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS resume_app_candidate_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_app', '0010_generatedjd'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Positions created before 0009 have no updated_at; the list ETag aggregates it directly
+    Position = apps.get_model('resume_app', 'Position')
+    Position.objects.filter(updated_at__isnull=True).update(updated_at=F('created_at'))
+    Position.objects.filter(updated_at__isnull=True).update(updated_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_app', '0011_candidate_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import zlib
+
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
@@ -25,8 +27,41 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.role})"
 
+# ---------------- Extracted Text Mixin ----------------
+class ExtractedTextMixin(models.Model):
+    """Text pulled from the model's uploaded document, stored so it can be reprocessed without the file.
+
+    Text larger than COMPRESS_OVER bytes is stored zlib-compressed.
+    """
+    COMPRESS_OVER = 2048
+
+    extracted_text_data = models.BinaryField(blank=True, null=True, editable=False)
+    extracted_text_compressed = models.BooleanField(default=False, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)  # sha256 of the file
+    extractor_version = models.CharField(max_length=64, blank=True, default="")  # "<pipeline version>:<engine>"
+
+    class Meta:
+        abstract = True
+
+    @property
+    def extracted_text(self):
+        if self.extracted_text_data is None:
+            return ""
+        data = bytes(self.extracted_text_data)
+        if self.extracted_text_compressed:
+            data = zlib.decompress(data)
+        return data.decode('utf-8')
+
+    def set_extracted_text(self, text, content_hash, extractor_version):
+        data = text.encode('utf-8')
+        self.extracted_text_compressed = len(data) > self.COMPRESS_OVER
+        self.extracted_text_data = zlib.compress(data) if self.extracted_text_compressed else data
+        self.content_hash = content_hash
+        self.extractor_version = extractor_version
+
+
 # ---------------- Position Model ----------------
-class Position(models.Model):
+class Position(ExtractedTextMixin, models.Model):
     employer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -44,13 +79,14 @@ class Position(models.Model):
     optional_skills = models.JSONField(default=list)   # list of optional skills
     interview_instructions = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True,null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return self.job_title
 
 
 # ---------------- Candidate Model ----------------
-class Candidate(models.Model):
+class Candidate(ExtractedTextMixin, models.Model):
     employer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -65,6 +101,7 @@ class Candidate(models.Model):
     optional_skills = models.JSONField(default=list)
     jd_file = models.FileField(upload_to='candidate_jd/', blank=True, null=True)
     resume_file = models.FileField(upload_to='resumes/', blank=True, null=True)
+    skills = models.JSONField(default=list, blank=True)  # skills the LLM extracted from the resume
     name = models.CharField(max_length=255, default="Unknown")
     email = models.EmailField(default="example@example.com")
     contact = models.CharField(max_length=20, default="")
@@ -72,6 +109,7 @@ class Candidate(models.Model):
     preferred_timings = models.CharField(max_length=255, blank=True, null=True)
     interview_instructions = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True,null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -106,5 +144,118 @@ class Interview(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Match the newest-first (created_at, id) keyset pages of the interview list for each role
+        indexes = [
+            models.Index(fields=['employer', 'created_at']),
+            models.Index(fields=['interviewer', 'created_at']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['status']),
+        ]
+
     def __str__(self):
         return f"Interview #{self.id} - {self.candidate.name} ({self.status})"
+
+
+# ---------------- Resume Extraction Cache ----------------
+class ResumeExtractionCache(models.Model):
+    """Text and LLM-parsed fields of a resume, keyed by file content hash and prompt version."""
+    content_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=32)
+    resume_text = models.TextField(blank=True, default="")
+    extractor_version = models.CharField(max_length=64, blank=True, default="")
+    extracted_data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_hash', 'prompt_version'], name='unique_resume_cache_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.prompt_version})"
+
+
+# ---------------- Candidate Processing Job ----------------
+class CandidateJob(models.Model):
+    """A queued resume upload processed in the background by `manage.py process_candidate_jobs`."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    STAGE_CHOICES = [
+        ('queued', 'Queued'),
+        ('uploading', 'Uploading to S3'),
+        ('extracting', 'Extracting text'),
+        ('parsing', 'Parsing with LLM'),
+        ('saving', 'Saving candidate'),
+        ('done', 'Done'),
+    ]
+
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, related_name='candidate_jobs')
+    resume_file = models.FileField(upload_to='candidate_jobs/')
+    file_name = models.CharField(max_length=255)  # original upload name, used as the S3 key
+    request_data = models.JSONField(default=dict)  # form fields sent with the upload
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='queued')
+    stages = models.JSONField(default=list)  # [{"stage": ..., "at": ...}] in the order they ran
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, default="")
+    candidate = models.ForeignKey(Candidate, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def set_stage(self, stage):
+        self.stage = stage
+        self.stages.append({"stage": stage, "at": timezone.now().isoformat()})
+        self.save(update_fields=['stage', 'stages', 'updated_at'])
+
+    def __str__(self):
+        return f"CandidateJob #{self.id} ({self.status}/{self.stage})"
+
+
+# ---------------- JD Skill Cache ----------------
+class JDSkillCache(models.Model):
+    """Skills the LLM extracted from a job description, keyed by normalized JD text hash and prompt version."""
+    text_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=32)
+    mandatory_skills = models.JSONField(default=list)
+    optional_skills = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['text_hash', 'prompt_version'], name='unique_jd_skill_cache_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.text_hash[:12]} ({self.prompt_version})"
+
+
+# ---------------- Generated JD Cache ----------------
+class GeneratedJD(models.Model):
+    """Job description text the LLM wrote for normalized (job_title, domain, experience) inputs."""
+    input_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=32)
+    job_title = models.CharField(max_length=255)
+    domain = models.CharField(max_length=255)
+    experience = models.IntegerField()
+    jd_text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['input_hash', 'prompt_version'], name='unique_generated_jd_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_title} ({self.prompt_version})"
@@ -0,0 +1,71 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, pk):
+    raw = json.dumps([created_at.isoformat(), pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, pk = json.loads(raw)
+        created_at = parse_datetime(created_at)
+        if created_at is None or not isinstance(pk, int):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor.")
+    return created_at, pk
+
+
+def page_size_param(request, default=50, maximum=200):
+    try:
+        size = int(request.query_params.get('page_size', default))
+    except (TypeError, ValueError):
+        size = default
+    return min(max(size, 1), maximum)
+
+
+def keyset_page(queryset, request, default_size=50, max_size=200):
+    """Newest-first page of `queryset` after the `?cursor=` position, keyed on (created_at, id).
+
+    Unlike OFFSET paging, each page costs the same however deep it is and rows created between requests
+    never shift later pages. Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    size = page_size_param(request, default_size, max_size)
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    # One extra row tells us whether another page exists without a COUNT query
+    rows = list(queryset.order_by('-created_at', '-id')[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def id_keyset_page(queryset, request, default_size=100, max_size=500):
+    """Page of `queryset` in id order starting after `?after=<id>`. Returns (rows, next_after or None)."""
+    size = page_size_param(request, default_size, max_size)
+    after = request.query_params.get('after')
+    if after:
+        try:
+            queryset = queryset.filter(id__gt=int(after))
+        except ValueError:
+            raise InvalidCursor("Invalid 'after' value.")
+
+    rows = list(queryset.order_by('id')[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, rows[-1].id
@@ -0,0 +1,54 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+
+class SharedProcessPool:
+    """A ProcessPoolExecutor started on first use and shared by every request in this process.
+
+    `workers_setting` names the setting holding the worker count (0 = one per CPU). A task stuck past its
+    hard timeout can't be interrupted, so `discard()` kills the executor's workers and the next `submit()`
+    starts a fresh one.
+    """
+
+    def __init__(self, workers_setting):
+        self.workers_setting = workers_setting
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=getattr(settings, self.workers_setting) or None,
+                        mp_context=multiprocessing.get_context(settings.EXTRACTION_START_METHOD)
+                    )
+        return self._executor
+
+    def submit(self, fn, *args):
+        """Return (future, executor); pass the executor to discard() if the future never finishes."""
+        while True:
+            executor = self.executor()
+            try:
+                return executor.submit(fn, *args), executor
+            except RuntimeError:
+                if executor is self._executor:
+                    raise
+                # Discarded by another thread between the lookup and the submit; use its replacement
+
+    def discard(self, executor):
+        """Stop routing work to `executor` and kill its workers.
+
+        shutdown() alone would leave a stuck worker running next to the replacement pool. Other tasks still
+        running on `executor` fail with BrokenProcessPool.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
@@ -0,0 +1,134 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+# Reports are named <UTC timestamp>-<method>-<path slug>-<duration>ms.{prof,txt}
+REPORT_NAME = re.compile(r"^(\d{8}T\d{6}\.\d{6}Z)-([A-Z]+)-([\w.-]*)-(\d+)ms$")
+
+# cProfile hooks the interpreter of the thread it runs in; one profiled request per process at a time keeps
+# concurrent requests from each paying for a profiler
+_busy = threading.Lock()
+
+
+def profile_request(get_response, request):
+    """Run the request under cProfile and store the report; returns (response, report name).
+
+    Returns (response, None) without profiling when another request in this process is being profiled.
+    """
+    if not _busy.acquire(blocking=False):
+        return get_response(request), None
+    try:
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+    finally:
+        _busy.release()
+    return response, save_report(profiler, request.method, request.path, elapsed)
+
+
+async def aprofile_request(get_response, request):
+    """profile_request for the async middleware path. cProfile follows the event loop thread, so the
+    report also counts other requests' coroutines that ran while this one was awaiting."""
+    if not _busy.acquire(blocking=False):
+        return await get_response(request), None
+    try:
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+    finally:
+        _busy.release()
+    return response, save_report(profiler, request.method, request.path, elapsed)
+
+
+def save_report(profiler, method, path, elapsed):
+    """Write the raw stats (.prof, for snakeviz or pstats) and a text summary (.txt); returns the report name."""
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^\w.-]+", "_", path.strip("/"))[:80]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+    name = f"{stamp}-{method}-{slug}-{round(elapsed * 1000)}ms"
+    base = os.path.join(settings.PROFILE_DIR, name)
+
+    profiler.dump_stats(f"{base}.prof")
+    summary = io.StringIO()
+    summary.write(f"{method} {path} took {elapsed * 1000:.1f} ms\n\n")
+    stats = pstats.Stats(profiler, stream=summary).strip_dirs().sort_stats('cumulative')
+    stats.print_stats(settings.PROFILE_SUMMARY_LINES)
+    with open(f"{base}.txt", 'w') as f:
+        f.write(summary.getvalue())
+
+    prune_reports()
+    return name
+
+
+def prune_reports():
+    # Oldest first, thanks to the timestamp prefix
+    names = sorted({
+        os.path.splitext(file_name)[0] for file_name in os.listdir(settings.PROFILE_DIR)
+        if REPORT_NAME.match(os.path.splitext(file_name)[0])
+    })
+    for name in names[:max(len(names) - settings.PROFILE_KEEP, 0)]:
+        for extension in ('.prof', '.txt'):
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, name + extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_reports():
+    """Stored reports, newest first, as dicts of name, method, path, duration_ms, created_at and size (of the .prof)."""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    reports = []
+    for file_name in os.listdir(settings.PROFILE_DIR):
+        name, extension = os.path.splitext(file_name)
+        match = REPORT_NAME.match(name)
+        if extension != '.prof' or not match:
+            continue
+        stamp, method, _, duration = match.groups()
+        try:
+            size = os.path.getsize(os.path.join(settings.PROFILE_DIR, file_name))
+        except FileNotFoundError:
+            continue  # pruned while we were listing
+        reports.append({
+            "name": name,
+            "method": method,
+            "path": report_request_path(name),
+            "duration_ms": int(duration),
+            "created_at": datetime.strptime(stamp, "%Y%m%dT%H%M%S.%fZ").replace(tzinfo=timezone.utc).isoformat(),
+            "size": size,
+        })
+    return sorted(reports, key=lambda report: report["name"], reverse=True)
+
+
+def report_request_path(name):
+    # The summary starts with "<METHOD> <path> took ..."; the file name only holds a lossy slug
+    try:
+        with open(os.path.join(settings.PROFILE_DIR, f"{name}.txt")) as f:
+            return f.readline().split(" ")[1]
+    except (OSError, IndexError):
+        return ""
+
+
+def report_path(name, extension):
+    """Path of a stored report file, or None if `name` isn't one (which also rules out path traversal)."""
+    if not REPORT_NAME.match(name):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{name}.{extension}")
+    return path if os.path.exists(path) else None
@@ -0,0 +1,170 @@
+import logging
+import re
+import threading
+import unicodedata
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# ------------ Prompt Versions ------------
+# LLM results are cached under the version of the prompt that produced them and only entries of the current
+# version are read, so bump a version whenever its prompt or output keys change.
+RESUME_PROMPT_VERSION = "v4"
+RESUME_RULES_VERSION = "rules-v1"  # results of RESUME_PARSER_MODE=rules; bump when resume_rules changes
+JD_PROMPT_VERSION = "v3"  # JD skill extraction
+JD_TEXT_PROMPT_VERSION = "v1"  # JD generation
+
+# Section headings, in the order sections are kept when a prompt has to be trimmed
+RESUME_SECTIONS = (
+    ('skills', r"(?:technical\s+|key\s+|core\s+)?skills|technologies|tech\s+stack|competencies|tools"),
+    ('experience', r"(?:work\s+|professional\s+)?experience|employment(?:\s+history)?|work\s+history|internships?"),
+    ('projects', r"(?:academic\s+|personal\s+|key\s+)?projects"),
+    ('summary', r"(?:professional\s+)?summary|profile|objective|about\s+me"),
+    ('certifications', r"certifications?|licen[cs]es|courses|training"),
+    ('education', r"education|academic\s+background|qualifications"),
+)
+JD_SECTIONS = (
+    ('skills', r"(?:required\s+|preferred\s+|key\s+)?(?:skills|qualifications|requirements)|must\s+have|nice\s+to\s+have"),
+    ('experience', r"experience|what\s+you.ll\s+need|who\s+you\s+are"),
+    ('responsibilities', r"(?:key\s+)?responsibilities|what\s+you.ll\s+do|role|duties"),
+    ('summary', r"about(?:\s+the)?\s+(?:role|job|position|company|us)|overview|summary"),
+)
+
+_PAGE_NOISE = re.compile(r"^(?:page\s+\d{1,3}(?:\s+of\s+\d{1,3})?|\d{1,3}\s*/\s*\d{1,3}|\d{1,3})$", re.IGNORECASE)
+_BULLET_ONLY = re.compile(r"^[\W_]+$")
+# How many lines at the top and bottom of a page can hold a page number
+_PAGE_MARGIN_LINES = 2
+
+
+def estimate_tokens(text):
+    # Gemini averages about four characters per token on English prose; close enough for budgeting
+    return -(-len(text) // settings.LLM_CHARS_PER_TOKEN)
+
+
+def _margin(page):
+    # Indexes of the lines at the top and bottom of a page, where page numbers go
+    return {i for i in range(len(page)) if i < _PAGE_MARGIN_LINES or i >= len(page) - _PAGE_MARGIN_LINES}
+
+
+def _page_number_shape(line):
+    # "Page 2 of 3" -> "page # of #"; None for lines that can't be a page number
+    return re.sub(r"\d+", "#", line.lower()) if _PAGE_NOISE.match(line) else None
+
+
+def clean_text(text):
+    """Normalize extracted document text: one space between words, no page breaks, page numbers,
+    stray bullet glyphs or repeated lines (running headers and footers).
+
+    A line only counts as a page number when the same pattern sits in the margin of more than one page,
+    so years, dates and phone numbers on their own line are kept.
+    """
+    pages = [
+        [" ".join(line.split()) for line in page.splitlines() if line.strip()]
+        for page in unicodedata.normalize('NFKC', text).split('\f')
+    ]
+    shapes = [{_page_number_shape(page[i]) for i in _margin(page)} - {None} for page in pages]
+    page_numbers = {shape for shape in set().union(*shapes) if sum(shape in found for found in shapes) > 1}
+
+    seen = set()
+    lines = []
+    for page in pages:
+        margin = _margin(page)
+        for i, line in enumerate(page):
+            if _BULLET_ONLY.match(line) or (i in margin and _page_number_shape(line) in page_numbers):
+                continue
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def split_sections(lines, sections):
+    """Group lines under the section whose heading precedes them; lines before any heading are 'header'."""
+    patterns = [(name, re.compile(rf"^(?:{pattern})\s*:?$", re.IGNORECASE)) for name, pattern in sections]
+    grouped = {'header': []}
+    current = 'header'
+    for line in lines:
+        heading = line.strip(" :-*#").strip()
+        for name, pattern in patterns:
+            if len(heading) <= 40 and pattern.match(heading):
+                current = name
+                break
+        else:
+            grouped.setdefault(current, []).append(line)
+            continue
+        grouped.setdefault(current, [])
+    return grouped
+
+
+def fit_to_budget(text, sections, budget, header_lines=5):
+    """Clean `text` and trim it to about `budget` tokens, keeping sections in `sections` order.
+
+    The first `header_lines` lines (name and contact details on a CV) always come first; sections
+    that don't fit are cut line by line and the rest dropped. Returns the text with each kept section
+    under its heading, or the cleaned text as it is when it already fits.
+    """
+    cleaned = clean_text(text)
+    if estimate_tokens(cleaned) <= budget:
+        return cleaned
+    lines = cleaned.split("\n")
+    grouped = split_sections(lines, sections)
+    header = grouped.pop('header')
+    order = [name for name, _ in sections if name in grouped] + ['header']
+    grouped['header'] = header[header_lines:]
+
+    kept = ["\n".join(header[:header_lines])]
+    remaining = budget - estimate_tokens(kept[0])
+    for name in order:
+        body = []
+        for line in grouped[name]:
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                break
+            body.append(line)
+            remaining -= cost
+        if body:
+            title = "Other" if name == 'header' else name.title()
+            kept.append(f"{title}:\n" + "\n".join(body))
+        if remaining <= 0:
+            break
+    return "\n\n".join(part for part in kept if part)
+
+
+# ------------ Prompt Stats ------------
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record_prompt(kind, tokens_before, tokens_after):
+    """Count prompt tokens before and after budgeting per prompt kind, and log each request."""
+    with _stats_lock:
+        totals = _stats.setdefault(kind, {'requests': 0, 'tokens_before': 0, 'tokens_after': 0, 'trimmed': 0})
+        totals['requests'] += 1
+        totals['tokens_before'] += tokens_before
+        totals['tokens_after'] += tokens_after
+        totals['trimmed'] += tokens_after < tokens_before
+    logger.info("%s prompt: %s -> %s estimated tokens", kind, tokens_before, tokens_after)
+
+
+def prompt_stats():
+    with _stats_lock:
+        return {kind: dict(totals) for kind, totals in _stats.items()}
+
+
+def build_prompt(kind, instructions, text, sections, budget):
+    """Prompt of `instructions` followed by `text` cleaned and cut to `budget` tokens."""
+    body = fit_to_budget(text, sections, max(budget - estimate_tokens(instructions), 0))
+    prompt = f"{instructions}\n{body}\n"
+    record_prompt(kind, estimate_tokens(instructions) + estimate_tokens(text), estimate_tokens(prompt))
+    return prompt
+
+
+def build_resume_prompt(instructions, resume_text):
+    return build_prompt('resume', instructions, resume_text, RESUME_SECTIONS, settings.LLM_RESUME_TOKEN_BUDGET)
+
+
+def build_jd_prompt(instructions, jd_text):
+    return build_prompt('jd', instructions, jd_text, JD_SECTIONS, settings.LLM_JD_TOKEN_BUDGET)
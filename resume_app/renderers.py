@@ -0,0 +1,39 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def sse_event(event, data):
+    """One Server-Sent Events frame; data is JSON-encoded so newlines in text can't break the framing."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+
+
+class EventStream:
+    """StreamingHttpResponse body that, when the response is closed, also closes the `source` its events
+    are made from, even if no event was sent yet (a generator's own `finally` only runs once started)."""
+
+    def __init__(self, events, source):
+        self.events = events
+        self.source = source
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        try:
+            self.events.close()
+        finally:
+            if hasattr(self.source, 'close'):
+                self.source.close()
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets views accept `Accept: text/event-stream`; ordinary (error) responses are sent as one `error` event."""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return sse_event('error', data)
@@ -0,0 +1,186 @@
+import re
+from datetime import date
+
+# Fields the rules below can find reliably without the LLM
+CONTACT_FIELDS = ('name', 'email', 'phone')
+
+SKILL_VOCABULARY = (
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Golang", "Rust", "Ruby", "PHP", "Kotlin",
+    "Swift", "Scala", "MATLAB", "SQL", "NoSQL", "HTML", "CSS", "Bash", "PowerShell",
+    "Django", "Flask", "FastAPI", "Spring", "Spring Boot", "Node.js", "Express", "React", "Angular", "Vue.js",
+    "Next.js", ".NET", "ASP.NET", "Laravel", "Ruby on Rails", "jQuery", "Bootstrap", "Tailwind CSS",
+    "REST", "GraphQL", "gRPC", "Microservices",
+    "MySQL", "PostgreSQL", "SQLite", "Oracle", "SQL Server", "MongoDB", "Redis", "Cassandra", "Elasticsearch",
+    "DynamoDB", "Kafka", "RabbitMQ", "Celery", "Spark", "Hadoop", "Airflow", "Snowflake", "Databricks",
+    "AWS", "Azure", "GCP", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins",
+    "GitHub Actions", "CI/CD", "Linux", "Git", "Nginx",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "TensorFlow", "PyTorch", "scikit-learn",
+    "Pandas", "NumPy", "Power BI", "Tableau", "Excel",
+    "Android", "iOS", "Flutter", "React Native", "Selenium", "Cypress", "Jest", "pytest", "JUnit",
+    "Agile", "Scrum", "Jira", "Figma",
+)
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}")
+PHONE = re.compile(r"(?<![\w+(])\+?\(?\d[\d \t().-]{7,}\d(?!\w)")
+YEARS_OF_EXPERIENCE = re.compile(
+    r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)(?:\s+of)?(?:\s+\w+){0,3}?\s+experience", re.IGNORECASE
+)
+YEAR_RANGE = re.compile(
+    r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now|till date|date)\b", re.IGNORECASE
+)
+NOT_A_NAME = re.compile(
+    r"@|https?:|www\.|\d|resume|curriculum|vitae|profile|summary|objective|contact|address|phone|email",
+    re.IGNORECASE
+)
+NAME_TOKEN = re.compile(r"^[^\W\d_]+(?:[.'-][^\W\d_]*)*\.?$")
+DOCUMENT_TITLE = re.compile(r"^(?:resume|r[ée]sum[ée]|curriculum vitae|cv|bio-?data)$", re.IGNORECASE)
+JOB_TITLE_WORD = re.compile(
+    r"\b(?:engineer|developer|manager|analyst|consultant|designer|architect|administrator|scientist|"
+    r"specialist|intern|lead|senior|junior|head|director|officer|executive|associate)\b",
+    re.IGNORECASE
+)
+CONTACT_LABEL = re.compile(r"\b(?:phone|mobile|mob|cell|tel|telephone|contact)\b", re.IGNORECASE)
+
+# Contact details belong to the header; matches further down may be a referee's or an ID number
+HEADER_LINES = 10
+
+# Skills that are also everyday words only count when written the way the skill is
+CASE_SENSITIVE_SKILLS = {"Express", "Spring", "Excel", "REST", "Rust", "Swift", "Agile", "Oracle", "Jest", "Spark"}
+
+
+def _skill_pattern(skills, flags=0):
+    alternatives = "|".join(re.escape(skill) for skill in sorted(skills, key=len, reverse=True))
+    return re.compile(r"(?<![\w+#.])(" + alternatives + r")(?![\w+#]|\.\w)", flags)
+
+
+_SKILL_PATTERNS = (
+    _skill_pattern([s for s in SKILL_VOCABULARY if s not in CASE_SENSITIVE_SKILLS], re.IGNORECASE),
+    _skill_pattern(CASE_SENSITIVE_SKILLS),
+)
+_CANONICAL_SKILL = {skill.lower(): skill for skill in SKILL_VOCABULARY}
+
+
+def find_email(text):
+    match = EMAIL.search(text)
+    return match.group(0) if match else ""
+
+
+def find_phone(text):
+    for match in PHONE.finditer(text):
+        candidate = match.group(0).strip()
+        digits = re.sub(r"\D", "", candidate)
+        # Ten to fifteen digits, and not built from year ranges such as "2019 - 2021"
+        if 10 <= len(digits) <= 15 and not YEAR_RANGE.search(candidate):
+            return candidate
+    return ""
+
+
+def _content_lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _name_line(lines):
+    """(index, name) of the first of `lines` that reads like a person's name, or (None, "")."""
+    for i, line in enumerate(lines[:8]):
+        line = line.split("|")[0].strip()
+        tokens = line.replace(",", " ").split()
+        if not 2 <= len(tokens) <= 4 or len(line) > 40 or NOT_A_NAME.search(line):
+            continue
+        if all(NAME_TOKEN.match(token) for token in tokens):
+            return i, line.title() if line.isupper() else line
+    return None, ""
+
+
+def guess_name(text):
+    """The first header line that reads like a person's name: two to four alphabetic words."""
+    return _name_line(_content_lines(text))[1]
+
+
+def find_experience(text):
+    """Years of experience: a stated "N years of experience", else the span covered by date ranges."""
+    stated = [float(years) for years in YEARS_OF_EXPERIENCE.findall(text) if float(years) <= 50]
+    if stated:
+        return max(stated)
+
+    this_year = date.today().year
+    spans = []
+    for start, end in YEAR_RANGE.findall(text):
+        start = int(start)
+        end = int(end) if end.isdigit() else this_year
+        if start <= end <= this_year:
+            spans.append((start, end))
+    # Merge overlapping roles so concurrent positions aren't counted twice
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return float(total)
+
+
+def find_skills(text):
+    found = {}
+    for pattern in _SKILL_PATTERNS:
+        for match in pattern.finditer(text):
+            skill = _CANONICAL_SKILL[match.group(1).lower()]
+            found[skill] = min(found.get(skill, match.start()), match.start())
+    # In the order the resume mentions them
+    return sorted(found, key=found.get)
+
+
+def confident_name(lines):
+    # The opening line (after any "Resume" title), capitalized, and not a job title
+    index, name = _name_line(lines)
+    if index is None or not all(DOCUMENT_TITLE.match(line) for line in lines[:index]):
+        return ""
+    if JOB_TITLE_WORD.search(name) or not all(token[0].isupper() for token in name.split()):
+        return ""
+    return name
+
+
+def confident_email(text, header):
+    # In the header, or the only address anywhere in the resume
+    email = find_email(header)
+    if email:
+        return email
+    addresses = {match.lower() for match in EMAIL.findall(text)}
+    return find_email(text) if len(addresses) == 1 else ""
+
+
+def confident_phone(lines, header):
+    # In the header, or on a line labelled as a phone number
+    phone = find_phone(header)
+    if phone:
+        return phone
+    for line in lines[HEADER_LINES:]:
+        if CONTACT_LABEL.search(line):
+            phone = find_phone(line)
+            if phone:
+                return phone
+    return ""
+
+
+def preparse_contact(text):
+    """Contact fields the rules are confident about; anything less certain is left to the LLM."""
+    lines = _content_lines(text)
+    header = "\n".join(lines[:HEADER_LINES])
+    fields = {"name": confident_name(lines), "email": confident_email(text, header), "phone": confident_phone(lines, header)}
+    return {key: value for key, value in fields.items() if value}
+
+
+def parse_resume_rules(text):
+    """Every field extract_resume_data_with_llm returns, found by rules alone."""
+    experience = find_experience(text)
+    return {
+        "name": guess_name(text),
+        "email": find_email(text),
+        "phone": find_phone(text),
+        "skills": find_skills(text),
+        "experience": experience if experience else "",
+    }
@@ -0,0 +1,146 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Candidate
+
+FTS_TABLE = 'resume_app_candidate_fts'
+
+# bm25 column weights: a hit in the name or skills counts for more than one in the resume body
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+_EXPERIENCE = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+_TERM = re.compile(r"[^\W_]+(?:[.+#-][^\W_]+)*[+#]*", re.UNICODE)
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def parse_query(query):
+    """Split "kubernetes terraform 3 years" into (['kubernetes', 'terraform'], 3.0)."""
+    min_experience = None
+    match = _EXPERIENCE.search(query)
+    if match:
+        min_experience = float(match.group(1))
+        query = query[:match.start()] + " " + query[match.end():]
+    return _TERM.findall(query.lower()), min_experience
+
+
+def fts_expression(terms, match_any=False):
+    # Each term is quoted so FTS5 syntax in user input is matched literally; the trailing * adds prefix matching
+    return (" OR " if match_any else " ").join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+# ------------ Index Maintenance ------------
+def search_document(candidate):
+    skills = candidate.skills if isinstance(candidate.skills, list) else []
+    return candidate.name or "", " ".join(str(skill) for skill in skills), candidate.extracted_text
+
+
+def index_candidates(candidates):
+    """Add or refresh the search rows of `candidates` (saved Candidate instances)."""
+    if not fts_available():
+        return
+    rows = [(candidate.pk, *search_document(candidate)) for candidate in candidates if candidate.pk]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, skills, resume_text) VALUES (%s, %s, %s, %s)", rows
+        )
+
+
+def unindex_candidates(candidate_ids):
+    if not fts_available() or not candidate_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in candidate_ids])
+
+
+def rebuild_index(batch_size=500):
+    """Re-index every candidate; returns the number indexed."""
+    if not fts_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    indexed = 0
+    last_pk = 0
+    queryset = Candidate.objects.order_by('pk').only(
+        'pk', 'name', 'skills', 'extracted_text_data', 'extracted_text_compressed'
+    )
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        index_candidates(batch)
+        indexed += len(batch)
+        last_pk = batch[-1].pk
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
+
+
+# ------------ Querying ------------
+def search_candidates(query, filters, limit, offset=0, match_any=False):
+    """Return [(candidate_id, score, snippet), ...] best match first, at most `limit` rows from `offset`.
+
+    `filters` may hold position_id, domain, min_experience and max_experience. Without FTS5 (server
+    databases) this falls back to unranked substring matching on name and skills. A query with no
+    search terms ("3 years") lists every candidate passing the filters, newest first, on both paths.
+    """
+    terms, query_experience = parse_query(query)
+    if query_experience is not None and filters.get('min_experience') is None:
+        filters = {**filters, 'min_experience': query_experience}
+
+    if not terms or not fts_available():
+        return _search_fallback(terms, filters, limit, offset, match_any)
+
+    where = [f"{FTS_TABLE} MATCH %s"]
+    params = [fts_expression(terms, match_any)]
+    if filters.get('position_id') is not None:
+        where.append("c.position_id = %s")
+        params.append(filters['position_id'])
+    if filters.get('domain'):
+        where.append("c.domain = %s COLLATE NOCASE")
+        params.append(filters['domain'])
+    if filters.get('min_experience') is not None:
+        where.append("c.experience >= %s")
+        params.append(filters['min_experience'])
+    if filters.get('max_experience') is not None:
+        where.append("c.experience <= %s")
+        params.append(filters['max_experience'])
+
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    sql = (
+        f"SELECT f.rowid, bm25({FTS_TABLE}, {weights}) AS rank, "
+        f"snippet({FTS_TABLE}, 2, '[', ']', '…', 12) "
+        f"FROM {FTS_TABLE} f JOIN {Candidate._meta.db_table} c ON c.id = f.rowid "
+        f"WHERE {' AND '.join(where)} ORDER BY rank LIMIT %s OFFSET %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, limit, offset])
+        # bm25 is lower-is-better and negative; flip it so higher scores rank first
+        return [(pk, round(-rank, 4), snippet) for pk, rank, snippet in cursor.fetchall()]
+
+
+def _search_fallback(terms, filters, limit, offset, match_any):
+    queryset = Candidate.objects.all()
+    if terms:
+        conditions = [Q(name__icontains=term) | Q(skills__icontains=term) for term in terms]
+        combined = conditions[0]
+        for condition in conditions[1:]:
+            combined = (combined | condition) if match_any else (combined & condition)
+        queryset = queryset.filter(combined)
+    if filters.get('position_id') is not None:
+        queryset = queryset.filter(position_id=filters['position_id'])
+    if filters.get('domain'):
+        queryset = queryset.filter(domain__iexact=filters['domain'])
+    if filters.get('min_experience') is not None:
+        queryset = queryset.filter(experience__gte=filters['min_experience'])
+    if filters.get('max_experience') is not None:
+        queryset = queryset.filter(experience__lte=filters['max_experience'])
+    ids = queryset.order_by('-id').values_list('id', flat=True)[offset:offset + limit]
+    return [(pk, None, "") for pk in ids]
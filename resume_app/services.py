@@ -0,0 +1,429 @@
+import boto3
+import hashlib
+import logging
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
+from django.conf import settings
+from .models import Position, Candidate, ResumeExtractionCache, JDSkillCache, GeneratedJD
+from .cache import TTLCache, worth_caching
+from .extraction import EXTRACTOR_VERSION, extract_document, extractor_version, raw_file
+from .llm import LLMError, get_llm, parse_json_reply
+from .metrics import record_cache, submit_with_timings, timed
+from .prompts import (
+    JD_PROMPT_VERSION,
+    JD_TEXT_PROMPT_VERSION,
+    RESUME_PROMPT_VERSION,
+    RESUME_RULES_VERSION,
+    build_jd_prompt,
+    build_resume_prompt,
+)
+from .resume_rules import CONTACT_FIELDS, parse_resume_rules, preparse_contact
+
+# The upload, parsing and construction steps behind the position and candidate endpoints, shared by the
+# DRF views, the async views and the background job worker.
+
+logger = logging.getLogger(__name__)
+
+
+# ------------ S3 Upload Function ------------
+# boto3 clients are thread-safe and keep a connection pool, so one client serves the whole process
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=settings.AWS_S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=settings.AWS_S3_MULTIPART_CHUNKSIZE,
+    max_concurrency=4,
+)
+
+
+def get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_S3_REGION_NAME,
+                    endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                    config=BotoConfig(max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS)
+                )
+    return _s3_client
+
+
+class _KeepOpen:
+    # s3transfer closes the stream after a single-part upload; callers still need it for extraction
+    def __init__(self, file_obj):
+        self._file_obj = file_obj
+
+    def __getattr__(self, name):
+        return getattr(self._file_obj, name)
+
+    def close(self):
+        pass
+
+
+def upload_to_s3(file_obj, file_name):
+    # Streams from the given handle; files above the multipart threshold go up in parts
+    file_obj.seek(0)
+    with timed('s3'):
+        get_s3_client().upload_fileobj(
+            _KeepOpen(file_obj), settings.AWS_STORAGE_BUCKET_NAME, file_name, Config=S3_TRANSFER_CONFIG
+        )
+    url = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{file_name}"
+    return url
+
+
+# Uploads overlap with text extraction and the LLM call, so they run on their own threads
+_upload_executor = ThreadPoolExecutor(max_workers=settings.S3_UPLOAD_WORKERS, thread_name_prefix='s3-upload')
+
+
+def independent_reader(uploaded_file):
+    """Open a second read handle on an upload, so S3 and text extraction can read it at the same time."""
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return open(uploaded_file.temporary_file_path(), 'rb')
+    stream = raw_file(uploaded_file)
+    if isinstance(stream, BytesIO):
+        return BytesIO(stream.getvalue())  # shares the buffer until either side writes to it
+    uploaded_file.seek(0)
+    return BytesIO(uploaded_file.read())
+
+
+def upload_to_s3_in_background(uploaded_file):
+    """Start uploading `uploaded_file` to S3 and return a future resolving to its URL."""
+    reader = independent_reader(uploaded_file)
+    file_name = uploaded_file.name
+
+    def upload():
+        with reader:
+            return upload_to_s3(reader, file_name)
+
+    def close_if_cancelled(future):
+        # A cancelled upload never runs, so its read handle is closed here instead
+        if future.cancelled():
+            reader.close()
+
+    future = submit_with_timings(_upload_executor, upload)
+    future.add_done_callback(close_if_cancelled)
+    return future
+
+
+# ------------ Resume Extraction Cache ------------
+def resume_prompt_version():
+    return RESUME_RULES_VERSION if settings.RESUME_PARSER_MODE == 'rules' else RESUME_PROMPT_VERSION
+
+
+def file_sha256(file_obj):
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks():
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def get_cached_resume_extraction(content_hash):
+    return ResumeExtractionCache.objects.filter(
+        content_hash=content_hash,
+        prompt_version=resume_prompt_version()
+    ).first()
+
+
+def is_cacheable_extraction(extracted_data):
+    return worth_caching(extracted_data, ('name', 'email', 'skills'))
+
+
+def parse_resume(resume_file, file_name, on_stage=None):
+    """Return the ResumeExtractionCache entry for `resume_file`, extracting text and calling the LLM on a miss.
+
+    On a miss the returned entry is only saved when the LLM output is worth caching. `on_stage` is called
+    with "extracting" and "parsing" as the pipeline reaches them.
+    """
+    content_hash = file_sha256(resume_file)
+    entry = get_cached_resume_extraction(content_hash)
+    record_cache('resume_extraction', entry is not None)
+    if entry:
+        return entry
+
+    if on_stage:
+        on_stage('extracting')
+    extraction = extract_document(resume_file, file_name)
+
+    if on_stage:
+        on_stage('parsing')
+    return store_resume_extraction(content_hash, extraction, extract_resume_data_with_llm(extraction.text))
+
+
+def store_resume_extraction(content_hash, extraction, extracted_data):
+    """ResumeExtractionCache entry for a fresh parse, saved only when the LLM output is worth caching."""
+    entry = ResumeExtractionCache(
+        content_hash=content_hash,
+        prompt_version=resume_prompt_version(),
+        resume_text=extraction.text,
+        extractor_version=extractor_version(extraction),
+        extracted_data=extracted_data
+    )
+    if is_cacheable_extraction(entry.extracted_data):
+        entry, _ = ResumeExtractionCache.objects.get_or_create(
+            content_hash=content_hash,
+            prompt_version=resume_prompt_version(),
+            defaults={
+                "resume_text": entry.resume_text,
+                "extractor_version": entry.extractor_version,
+                "extracted_data": entry.extracted_data
+            }
+        )
+    return entry
+
+
+# ------------ LLM Resume Parsing ------------
+def extract_resume_data_with_llm(resume_text):
+    """Return name, email, phone, skills and experience for a resume.
+
+    Contact fields come from resume_rules where it finds them and the LLM is only asked for the rest.
+    RESUME_PARSER_MODE=rules skips the LLM entirely; if the LLM is unreachable the rules result is
+    returned marked `degraded` (when RESUME_RULES_FALLBACK is on) so it isn't cached.
+    """
+    if settings.RESUME_PARSER_MODE == 'rules':
+        return parse_resume_rules(resume_text)
+
+    prompt, contact = resume_prompt(resume_text)
+    try:
+        reply = get_llm().generate(prompt)
+    except LLMError:
+        if not settings.RESUME_RULES_FALLBACK:
+            raise
+        return degraded_resume_data(resume_text)
+    return resume_reply_data(reply, contact)
+
+
+def resume_prompt(resume_text):
+    """(prompt, contact fields the rules found); the prompt only asks the LLM for the other fields."""
+    contact = preparse_contact(resume_text)
+    wanted = [key for key in CONTACT_FIELDS if key not in contact] + ['skills (list)', 'experience']
+    keys = "\n".join(f"- {key}" for key in wanted)
+    prompt = build_resume_prompt(
+        "You are a resume parsing AI. From the given resume text, extract structured information.\n"
+        f"Return JSON with these exact keys:\n{keys}\n\nResume text:",
+        resume_text
+    )
+    return prompt, contact
+
+
+def resume_reply_data(reply, contact):
+    data = parse_json_reply(reply, {"name": "", "email": "", "phone": "", "skills": [], "experience": ""})
+    if not is_cacheable_extraction(data):
+        # Nothing usable came back; the rules' contact fields alone mustn't make the result cacheable
+        data['degraded'] = True
+    return {**data, **contact}
+
+
+def degraded_resume_data(resume_text):
+    logger.warning("LLM unavailable; parsing resume with rules only", exc_info=True)
+    return {**parse_resume_rules(resume_text), "degraded": True}
+
+
+# ------------ JD Skill Cache ------------
+# In-process tier in front of the JDSkillCache table
+_jd_skill_cache = TTLCache(maxsize=settings.JD_SKILL_CACHE_SIZE, ttl=settings.JD_SKILL_CACHE_TTL)
+
+
+def normalize_jd_text(jd_text):
+    # Re-uploads of a JD often differ only in case, spacing or line wrapping
+    return " ".join(unicodedata.normalize('NFKC', jd_text).lower().split())
+
+
+def jd_text_hash(jd_text):
+    return hashlib.sha256(normalize_jd_text(jd_text).encode('utf-8')).hexdigest()
+
+
+def get_jd_skills(jd_text):
+    """Return {"mandatory_skills": [...], "optional_skills": [...]} for a JD, calling the LLM only on a cache miss."""
+    text_hash = jd_text_hash(jd_text)
+    skills = get_cached_jd_skills(text_hash)
+    if skills is None:
+        skills = store_jd_skills(text_hash, extract_skills_from_jd(jd_text))
+    return skills
+
+
+def get_cached_jd_skills(text_hash):
+    key = (text_hash, JD_PROMPT_VERSION)
+    skills = _jd_skill_cache.get(key)
+    if skills is not None:
+        record_cache('jd_skills', True)
+        return skills
+
+    cached = JDSkillCache.objects.filter(text_hash=text_hash, prompt_version=JD_PROMPT_VERSION).first()
+    record_cache('jd_skills', cached is not None)
+    if cached:
+        skills = {"mandatory_skills": cached.mandatory_skills, "optional_skills": cached.optional_skills}
+        _jd_skill_cache.set(key, skills)
+    return skills
+
+
+def store_jd_skills(text_hash, data):
+    """Cache the skills parsed from the LLM reply `data` and return them."""
+    skills = {
+        "mandatory_skills": data.get('mandatory_skills', []),
+        "optional_skills": data.get('optional_skills', [])
+    }
+    if not worth_caching(skills, ('mandatory_skills', 'optional_skills')):
+        return skills
+    JDSkillCache.objects.get_or_create(
+        text_hash=text_hash,
+        prompt_version=JD_PROMPT_VERSION,
+        defaults=skills
+    )
+    _jd_skill_cache.set((text_hash, JD_PROMPT_VERSION), skills)
+    return skills
+
+
+# ------------ LLM JD Parsing ------------
+EMPTY_JD_SKILLS = {"mandatory_skills": [], "optional_skills": []}
+
+
+def extract_skills_from_jd(jd_text):
+    return parse_json_reply(get_llm().generate(jd_skills_prompt(jd_text)), EMPTY_JD_SKILLS)
+
+
+def jd_skills_prompt(jd_text):
+    return build_jd_prompt(
+        "You are a job description parsing AI. From the given job description text, extract structured "
+        "information about skills required for the role.\n\n"
+        "Return JSON with these exact keys:\n"
+        "- mandatory_skills (list of skills that are required)\n"
+        "- optional_skills (list of skills that are nice-to-have)\n\n"
+        "Job Description text:",
+        jd_text
+    )
+
+
+# ------------ Position Construction ------------
+def positions_with_jd_text(content_hash):
+    """Positions whose stored JD text was extracted from the same file by the current extractor."""
+    return Position.objects.filter(
+        content_hash=content_hash,
+        extractor_version__startswith=f"{EXTRACTOR_VERSION}:"
+    ).only('extracted_text_data', 'extracted_text_compressed', 'extractor_version')
+
+
+def build_position(user, data, file, mandatory_skills, optional_skills):
+    """Return an unsaved Position from request data and the LLM-extracted skills."""
+    return Position(
+        employer=user if getattr(user, 'role', None) == 'employer' else None,
+        job_title=data.get('job_title'),
+        domain=data.get('domain'),
+        exp_from=data.get('exp_from'),
+        exp_to=data.get('exp_to'),
+        job_description_file=file,
+        mandatory_skills=mandatory_skills,
+        optional_skills=optional_skills,
+        interview_instructions=data.get('interview_instructions')
+    )
+
+
+def position_data(position, s3_url):
+    return {
+        "id": position.id,
+        "job_title": position.job_title,
+        "domain": position.domain,
+        "exp_from": position.exp_from,
+        "exp_to": position.exp_to,
+        "mandatory_skills": position.mandatory_skills,
+        "optional_skills": position.optional_skills,
+        "jd_file_url": s3_url,
+        "interview_instructions": position.interview_instructions
+    }
+
+
+# ------------ Candidate Construction ------------
+def build_candidate(position, data, resume_file, extracted_data):
+    """Return an unsaved Candidate for `position` from request data and LLM-extracted fields."""
+    # Safely get experience as float
+    experience_value = data.get('experience') or extracted_data.get('experience', 0)
+    try:
+        experience_value = float(experience_value)
+    except (ValueError, TypeError):
+        experience_value = 0.0
+
+    return Candidate(
+        position=position,
+        domain=data.get('domain', position.domain),
+        mandatory_skills=data.get('mandatory_skills', position.mandatory_skills),
+        optional_skills=data.get('optional_skills', position.optional_skills),
+        jd_file=position.job_description_file,
+        resume_file=resume_file,
+        skills=extracted_data.get('skills') if isinstance(extracted_data.get('skills'), list) else [],
+        name=extracted_data.get('name', data.get('name', '')),
+        email=extracted_data.get('email', data.get('email', '')),
+        contact=extracted_data.get('phone', data.get('contact', '')),
+        experience=experience_value,
+        preferred_timings=data.get('preferred_timings'),
+        interview_instructions=position.interview_instructions
+    )
+
+
+def candidate_data(candidate, s3_url):
+    return {
+        "id": candidate.id,
+        "name": candidate.name,
+        "email": candidate.email,
+        "contact": candidate.contact,
+        "experience": candidate.experience,
+        "mandatory_skills": candidate.mandatory_skills,
+        "optional_skills": candidate.optional_skills,
+        "resume_s3_url": s3_url
+    }
+
+
+# ------------ Generated JD Cache ------------
+# In-process tier in front of the GeneratedJD table
+_generated_jd_cache = TTLCache(maxsize=settings.GENERATED_JD_CACHE_SIZE, ttl=settings.GENERATED_JD_CACHE_TTL)
+
+
+def jd_prompt(job_title, domain, experience):
+    return f"Write a professional job description for a {job_title} in {domain} with {experience} years of experience."
+
+
+def generated_jd_hash(job_title, domain, experience):
+    key = "\0".join([normalize_jd_text(job_title), normalize_jd_text(domain), str(experience)])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def get_cached_generated_jd(input_hash):
+    key = (input_hash, JD_TEXT_PROMPT_VERSION)
+    jd_text = _generated_jd_cache.get(key)
+    if jd_text is None:
+        jd_text = GeneratedJD.objects.filter(
+            input_hash=input_hash, prompt_version=JD_TEXT_PROMPT_VERSION
+        ).values_list('jd_text', flat=True).first()
+        if jd_text:
+            _generated_jd_cache.set(key, jd_text)
+    record_cache('generated_jd', jd_text is not None)
+    return jd_text
+
+
+def store_generated_jd(input_hash, job_title, domain, experience, jd_text):
+    if not jd_text or not jd_text.strip():
+        return
+    GeneratedJD.objects.get_or_create(
+        input_hash=input_hash,
+        prompt_version=JD_TEXT_PROMPT_VERSION,
+        defaults={"job_title": job_title, "domain": domain, "experience": experience, "jd_text": jd_text}
+    )
+    _generated_jd_cache.set((input_hash, JD_TEXT_PROMPT_VERSION), jd_text)
+
+
+def get_generated_jd(job_title, domain, experience):
+    """JD text for the inputs, shared by preview and download so each combination is generated once."""
+    input_hash = generated_jd_hash(job_title, domain, experience)
+    jd_text = get_cached_generated_jd(input_hash)
+    if jd_text is None:
+        jd_text = get_llm().generate(jd_prompt(job_title, domain, experience))
+        store_generated_jd(input_hash, job_title, domain, experience, jd_text)
+    return jd_text
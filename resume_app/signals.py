@@ -0,0 +1,31 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .matching import candidates_changed
+from .metrics import time_query
+from .models import Candidate
+from .search import index_candidates, unindex_candidates
+
+
+# Keep the candidate search and ranking indexes in step with single-row saves; bulk paths call
+# index_candidates and candidates_changed themselves
+@receiver(post_save, sender=Candidate)
+def index_saved_candidate(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_candidates([instance])
+        candidates_changed()
+
+
+@receiver(post_delete, sender=Candidate)
+def unindex_deleted_candidate(sender, instance, **kwargs):
+    unindex_candidates([instance.pk])
+    candidates_changed()
+
+
+# Time every query as the 'db' stage. Installed per connection rather than per request so queries that
+# async views run through sync_to_async threads are counted too.
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
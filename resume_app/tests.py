@@ -1,3 +1,1503 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from docx import Document
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import llm, matching, metrics, services
+from .assignment import InterviewerIndex, assign_pending_interviews
+from .extraction import (
+    EXTRACTOR_VERSION, ExtractionResult, ExtractionTimeout, PendingExtraction, _extract_pdf, looks_broken,
+    submit_extraction, wait_for_extraction
+)
+from .jd_files import get_jd_artifact
+from .jobs import claim_next_job, requeue_stale_jobs, run_candidate_job
+from .matching import SkillIndex, get_skill_index
+from .models import Candidate, CandidateJob, Interview, JDSkillCache, Position, ResumeExtractionCache, User
+from .pools import SharedProcessPool
+from .profiling import report_path
+from .prompts import JD_PROMPT_VERSION, RESUME_SECTIONS, clean_text, estimate_tokens, fit_to_budget
+from .resume_rules import find_email, find_phone, guess_name, preparse_contact
+from .search import FTS_TABLE, fts_expression, parse_query, search_candidates
+from .services import extract_resume_data_with_llm, get_jd_skills, parse_resume
+
+RESUME_REPLY = json.dumps({"name": "Asha Rao", "skills": ["Python", "Django"], "experience": "4"})
+
+
+def docx_upload(name, lines):
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    data = BytesIO()
+    document.save(data)
+    return SimpleUploadedFile(name, data.getvalue())
+
+
+class StubLLMTestCase(TestCase):
+    """Runs with the offline LLM backend, a fresh gateway and a scratch MEDIA_ROOT."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        self.enterContext(override_settings(
+            MEDIA_ROOT=media_root, LLM_BACKEND='resume_app.llm.StubBackend', LLM_STUB_RESPONSE=RESUME_REPLY
+        ))
+        llm._gateway = None
+        self.addCleanup(setattr, llm, '_gateway', None)
+
+
+class InterviewListViewTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', role='admin')
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_interviews(self, count):
+        position = Position.objects.create(employer=self.employer, job_title="Backend Engineer")
+        for i in range(count):
+            candidate = Candidate.objects.create(position=position, name=f"Candidate {i}")
+            Interview.objects.create(employer=self.employer, candidate=candidate, position=position)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.create_interviews(3)
+        # One query for the page; authentication is forced so it adds none
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('interview-list'))
+        self.assertEqual(len(response.data['results']), 3)
+
+        self.create_interviews(30)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('interview-list'), {'page_size': 200})
+        self.assertEqual(len(response.data['results']), 33)
+        self.assertEqual(response.data['results'][0]['candidate_name'], "Candidate 29")
+
+    def test_cursor_walks_every_row_once(self):
+        self.create_interviews(7)
+        seen = []
+        url = reverse('interview-list')
+        params = {'page_size': 3}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['interview_id'] for row in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(seen, sorted(Interview.objects.values_list('id', flat=True), reverse=True))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('interview-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CandidateJobTests(StubLLMTestCase):
+    def setUp(self):
+        super().setUp()
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.position = Position.objects.create(employer=self.employer, job_title="Backend Engineer", domain="IT")
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def queue(self, name='cv.docx'):
+        response = self.client.post(
+            reverse('add-candidate') + '?async=true',
+            {'position_id': self.position.id, 'resume_file': docx_upload(name, ["Asha Rao", "asha@example.com"])}
+        )
+        self.assertEqual(response.status_code, 202)
+        return response
+
+    def test_async_upload_is_queued(self):
+        response = self.queue()
+        job = CandidateJob.objects.get(id=response.data['job_id'])
+        self.assertEqual((job.status, job.stage, job.file_name), ('queued', 'queued', 'cv.docx'))
+        self.assertEqual(response.data['status_url'], reverse('candidate-job-status', args=[job.id]))
+
+    def test_claim_takes_oldest_queued_job_once(self):
+        first = self.queue('a.docx').data['job_id']
+        second = self.queue('b.docx').data['job_id']
+        self.assertEqual(claim_next_job().id, first)
+        self.assertEqual(claim_next_job().id, second)
+        self.assertIsNone(claim_next_job())
+        self.assertEqual(set(CandidateJob.objects.values_list('status', flat=True)), {'running'})
+
+    def test_requeue_stale_jobs(self):
+        stale = CandidateJob.objects.get(id=self.queue('a.docx').data['job_id'])
+        fresh = CandidateJob.objects.get(id=self.queue('b.docx').data['job_id'])
+        claim_next_job()
+        claim_next_job()
+        CandidateJob.objects.filter(id=stale.id).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_jobs(900), 1)
+        self.assertEqual(CandidateJob.objects.get(id=stale.id).status, 'queued')
+        self.assertEqual(CandidateJob.objects.get(id=fresh.id).status, 'running')
+        self.assertEqual(claim_next_job().id, stale.id)
+
+    @mock.patch('resume_app.jobs.upload_to_s3', return_value='https://bucket.s3.amazonaws.com/cv.docx')
+    def test_run_job_creates_candidate(self, upload):
+        self.queue()
+        job = run_candidate_job(claim_next_job())
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual([stage['stage'] for stage in job.stages],
+                         ['queued', 'uploading', 'extracting', 'parsing', 'saving', 'done'])
+        candidate = Candidate.objects.get(id=job.candidate_id)
+        self.assertEqual((candidate.email, candidate.skills), ('asha@example.com', ["Python", "Django"]))
+
+        response = self.client.get(reverse('candidate-job-status', args=[job.id]))
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response.data['result']['id'], candidate.id)
+        self.assertEqual(response.data['result']['resume_s3_url'], 'https://bucket.s3.amazonaws.com/cv.docx')
+
+    @mock.patch('resume_app.jobs.upload_to_s3', side_effect=ConnectionError("S3 unreachable"))
+    def test_failed_job_records_error(self, upload):
+        self.queue()
+        job = run_candidate_job(claim_next_job())
+
+        self.assertEqual((job.status, job.error), ('failed', "S3 unreachable"))
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(Candidate.objects.exists())
+        response = self.client.get(reverse('candidate-job-status', args=[job.id]))
+        self.assertEqual((response.data['status'], response.data['stage']), ('failed', 'uploading'))
+
+    def test_unknown_job(self):
+        response = self.client.get(reverse('candidate-job-status', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ResumeExtractionCacheTests(StubLLMTestCase):
+    RESUME = ["Asha Rao", "asha@example.com", "Skills", "Python, Django"]
+
+    def parse(self, lines=RESUME):
+        return parse_resume(docx_upload('cv.docx', lines), 'cv.docx')
+
+    def llm_calls(self):
+        return len(llm.get_llm().backend.prompts)
+
+    def test_repeat_upload_hits_cache(self):
+        first = self.parse()
+        second = self.parse()
+        self.assertEqual(self.llm_calls(), 1)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.extracted_data['skills'], ["Python", "Django"])
+        self.assertEqual(ResumeExtractionCache.objects.count(), 1)
+
+    def test_prompt_version_bump_misses_cache(self):
+        self.parse()
+        with mock.patch('resume_app.services.RESUME_PROMPT_VERSION', 'v-next'):
+            entry = self.parse()
+        self.assertEqual(self.llm_calls(), 2)
+        self.assertEqual(entry.prompt_version, 'v-next')
+        self.assertEqual(ResumeExtractionCache.objects.count(), 2)
+
+    def test_unusable_reply_is_not_cached(self):
+        # The rules still find the email, but an unparseable reply must not pin the result
+        with override_settings(LLM_STUB_RESPONSE="Sorry, I can't help with that."):
+            entry = self.parse()
+            self.parse()
+        self.assertIsNone(entry.pk)
+        self.assertEqual(entry.extracted_data['email'], 'asha@example.com')
+        self.assertEqual(self.llm_calls(), 2)
+        self.assertFalse(ResumeExtractionCache.objects.exists())
+
+    def test_degraded_result_is_not_cached(self):
+        with mock.patch.object(llm.StubBackend, 'generate', side_effect=ConnectionError("unreachable")), \
+                override_settings(LLM_MAX_RETRIES=0), self.assertLogs('resume_app.services', 'WARNING'):
+            entry = self.parse()
+        self.assertTrue(entry.extracted_data['degraded'])
+        self.assertFalse(ResumeExtractionCache.objects.exists())
+
+
+class JDSkillCacheTests(StubLLMTestCase):
+    JD = "Backend Engineer\nMust have: Python, PostgreSQL\nNice to have: Redis"
+    REPLY = json.dumps({"mandatory_skills": ["Python", "PostgreSQL"], "optional_skills": ["Redis"]})
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(LLM_STUB_RESPONSE=self.REPLY))
+        services._jd_skill_cache.clear()
+        self.addCleanup(services._jd_skill_cache.clear)
+
+    def llm_calls(self):
+        return len(llm.get_llm().backend.prompts)
+
+    def test_reworded_whitespace_and_case_hit_cache(self):
+        first = get_jd_skills(self.JD)
+        second = get_jd_skills("  backend engineer   MUST HAVE: python, postgresql\n\nnice to have: redis ")
+        self.assertEqual(second, first)
+        self.assertEqual(first["optional_skills"], ["Redis"])
+        self.assertEqual(self.llm_calls(), 1)
+        self.assertEqual(JDSkillCache.objects.count(), 1)
+
+    def test_database_tier_serves_other_processes(self):
+        get_jd_skills(self.JD)
+        services._jd_skill_cache.clear()  # as a fresh worker process would start
+        with self.assertNumQueries(1):
+            skills = get_jd_skills(self.JD)
+        self.assertEqual(skills["mandatory_skills"], ["Python", "PostgreSQL"])
+        self.assertEqual(self.llm_calls(), 1)
+
+    def test_prompt_version_bump_misses_cache(self):
+        get_jd_skills(self.JD)
+        with mock.patch('resume_app.services.JD_PROMPT_VERSION', 'v-next'):
+            get_jd_skills(self.JD)
+        self.assertEqual(self.llm_calls(), 2)
+        self.assertEqual(set(JDSkillCache.objects.values_list('prompt_version', flat=True)), {JD_PROMPT_VERSION, 'v-next'})
+
+    def test_empty_result_is_not_cached(self):
+        with override_settings(LLM_STUB_RESPONSE="no JSON here"):
+            self.assertEqual(get_jd_skills(self.JD), {"mandatory_skills": [], "optional_skills": []})
+            get_jd_skills(self.JD)
+        self.assertEqual(self.llm_calls(), 2)
+        self.assertFalse(JDSkillCache.objects.exists())
+
+
+@mock.patch('resume_app.services.upload_to_s3', side_effect=lambda file_obj, file_name: f"https://bucket/{file_name}")
+class CandidateBulkCreateTests(StubLLMTestCase):
+    def setUp(self):
+        super().setUp()
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.position = Position.objects.create(employer=self.employer, job_title="Backend Engineer", domain="IT")
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def resume(self, name, email):
+        return docx_upload(name, ["Asha Rao", email])
+
+    def archive(self, entries):
+        data = BytesIO()
+        with zipfile.ZipFile(data, 'w') as zf:
+            for name, content in entries:
+                zf.writestr(name, content)
+        return SimpleUploadedFile('resumes.zip', data.getvalue())
+
+    def post(self, **files):
+        return self.client.post(reverse('bulk-add-candidates'), {'position_id': self.position.id, **files})
+
+    def test_uploads_and_archive_together(self, upload):
+        archive = self.archive([
+            ('batch/c.docx', self.resume('c.docx', 'c@example.com').read()),
+            ('batch/notes.txt', b"not a resume"),
+            ('__MACOSX/._c.docx', b"resource fork"),
+            ('d.docx', self.resume('d.docx', 'd@example.com').read()),
+        ])
+        response = self.post(
+            resume_files=[self.resume('a.docx', 'a@example.com'), self.resume('b.docx', 'b@example.com')],
+            resume_archive=archive
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual([r['file'] for r in response.data['results']], ['a.docx', 'b.docx', 'c.docx', 'd.docx'])
+        self.assertEqual([r['email'] for r in response.data['results']],
+                         ['a@example.com', 'b@example.com', 'c@example.com', 'd@example.com'])
+        self.assertEqual(response.data['results'][2]['resume_s3_url'], 'https://bucket/c.docx')
+        self.assertEqual(Candidate.objects.filter(position=self.position).count(), 4)
+
+    def test_duplicate_files_are_parsed_once(self, upload):
+        content = self.resume('a.docx', 'a@example.com').read()
+        response = self.post(resume_files=[SimpleUploadedFile('a.docx', content), SimpleUploadedFile('copy.docx', content)])
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(len(llm.get_llm().backend.prompts), 1)
+
+    def test_uploads_run_on_the_upload_workers(self, upload):
+        threads = []
+        upload.side_effect = lambda file_obj, file_name: threads.append(threading.current_thread().name) or file_name
+        response = self.post(resume_files=[self.resume('a.docx', 'a@example.com'), self.resume('b.docx', 'b@example.com')])
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith('s3-upload') for name in threads))
+
+    def test_unreadable_file_fails_alone(self, upload):
+        response = self.post(resume_files=[self.resume('a.docx', 'a@example.com'), SimpleUploadedFile('bad.pdf', b"%PDF-garbage")])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['results'][1]['status'], 'failed')
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_spooled_files_reach_extraction_as_paths(self, upload):
+        archive = self.archive([('c.docx', self.resume('c.docx', 'c@example.com').read())])
+        with mock.patch('resume_app.views.submit_extraction', wraps=submit_extraction) as submit:
+            response = self.post(resume_files=[self.resume('a.docx', 'a@example.com')], resume_archive=archive)
+        self.assertEqual(response.data['created'], 2)
+        self.assertTrue(all(isinstance(call.args[0], str) for call in submit.call_args_list))
+
+    @override_settings(BULK_MAX_FILE_SIZE=1000)
+    def test_oversized_upload_is_rejected(self, upload):
+        response = self.post(resume_files=[SimpleUploadedFile('big.pdf', b"x" * 1001)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], "big.pdf exceeds the maximum resume size.")
+
+    @override_settings(BULK_MAX_FILE_SIZE=1000)
+    def test_oversized_archive_entry_is_rejected(self, upload):
+        response = self.post(resume_archive=self.archive([('big.pdf', b"x" * 1001)]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], "big.pdf exceeds the maximum resume size.")
+
+    @override_settings(BULK_MAX_FILES=2)
+    def test_too_many_files(self, upload):
+        archive = self.archive([('b.pdf', b"x"), ('c.pdf', b"x")])
+        response = self.post(resume_files=[SimpleUploadedFile('a.pdf', b"x")], resume_archive=archive)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], "At most 2 resumes can be uploaded at once.")
+        upload.assert_not_called()
+
+    def test_bad_archive_and_no_files(self, upload):
+        self.assertEqual(self.post(resume_archive=SimpleUploadedFile('resumes.zip', b"not a zip")).status_code, 400)
+        response = self.post(resume_archive=self.archive([('notes.txt', b"no resumes")]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], "At least one resume file is required.")
+
+
+@override_settings(EXTRACTION_WORKERS=1)
+class SharedProcessPoolTests(SimpleTestCase):
+    def test_hard_timeout_kills_stuck_worker(self):
+        pool = SharedProcessPool('EXTRACTION_WORKERS')
+        future, executor = pool.submit(time.sleep, 60)
+        workers = list(executor._processes.values())
+        with mock.patch('resume_app.extraction._pool', pool), \
+                mock.patch('resume_app.extraction._hard_timeout', return_value=0.5), \
+                self.assertRaises(ExtractionTimeout):
+            wait_for_extraction(PendingExtraction(future, executor), 'stuck.pdf')
+
+        for worker in workers:
+            worker.join(5)
+            self.assertFalse(worker.is_alive())
+        # The next task runs on a fresh executor
+        future, replacement = pool.submit(abs, -3)
+        self.assertIsNot(replacement, executor)
+        self.assertEqual(future.result(timeout=30), 3)
+        pool.discard(replacement)
+
+    def test_queued_task_timing_out_leaves_the_workers_alone(self):
+        pool = SharedProcessPool('EXTRACTION_WORKERS')
+        # One worker plus its one-slot call queue take the two sleeps; the third task stays queued
+        busy = [pool.submit(time.sleep, 1)[0] for _ in range(2)]
+        future, executor = pool.submit(abs, -3)
+        self.addCleanup(pool.discard, executor)
+        with mock.patch('resume_app.extraction._pool', pool), \
+                mock.patch('resume_app.extraction._hard_timeout', return_value=0.2), \
+                self.assertRaises(ExtractionTimeout):
+            wait_for_extraction(PendingExtraction(future, executor), 'queued.pdf')
+
+        self.assertTrue(future.cancelled())
+        self.assertIs(pool.executor(), executor)
+        self.assertEqual([f.result(timeout=30) for f in busy], [None, None])
+
+    def test_discarding_a_replaced_executor_keeps_the_current_one(self):
+        pool = SharedProcessPool('EXTRACTION_WORKERS')
+        _, old = pool.submit(abs, -1)
+        pool.discard(old)
+        _, current = pool.submit(abs, -2)
+        pool.discard(old)  # a second request timing out on the same stuck executor
+        self.assertIs(pool.executor(), current)
+        pool.discard(current)
+
+
+class JDRenderTimeoutTests(StubLLMTestCase):
+    def setUp(self):
+        super().setUp()
+        artifact_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, artifact_dir, True)
+        self.enterContext(override_settings(
+            JD_ARTIFACT_DIR=artifact_dir, JD_RENDER_TIMEOUT=0.001, LLM_STUB_RESPONSE="## About the role\nBuild APIs."
+        ))
+        self.pool = SharedProcessPool('JD_RENDER_WORKERS')
+        self.enterContext(mock.patch('resume_app.jd_files._pool', self.pool))
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='employer', role='employer'))
+
+    def test_timeout_reports_an_error_and_kills_the_worker(self):
+        executor = self.pool.executor()
+        response = self.client.post(
+            reverse('generate_jd_file'), {'job_title': "Data Engineer", 'domain': "IT", 'experience': 3}, format='json'
+        )
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json(), {"error": "Rendering the JD file for Data Engineer timed out."})
+        self.assertIsNot(self.pool.executor(), executor)
+        self.pool.discard(self.pool.executor())
+
+
+class PDFEngineTests(SimpleTestCase):
+    GOOD_TEXT = "Jane Doe\nSenior Python developer with Django and PostgreSQL experience.\f"
+
+    def engine(self, text=None, error=None):
+        def extract(file_obj, max_pages, deadline):
+            if error:
+                raise error
+            return ExtractionResult(text, False, 1, 'fake')
+        return mock.Mock(side_effect=extract)
+
+    def extract(self, **engines):
+        with mock.patch.dict('resume_app.extraction.PDF_ENGINES', engines, clear=True):
+            return _extract_pdf(BytesIO(b"%PDF"), 0, float('inf'), tuple(engines))
+
+    def test_looks_broken(self):
+        self.assertTrue(looks_broken(""))
+        self.assertTrue(looks_broken("   \f  \n"))
+        self.assertTrue(looks_broken("(cid:12)(cid:13)(cid:14)(cid:15)(cid:16)(cid:17) " * 3))
+        self.assertTrue(looks_broken("\u2022 \u2014 ~~ ## @@ %% && ** ++ == || << >> ?? !! " * 3))
+        self.assertTrue(looks_broken("Jane Doe, Python developer.", pages=10))
+        self.assertFalse(looks_broken(self.GOOD_TEXT))
+
+    def test_first_usable_engine_wins(self):
+        fast, slow = self.engine(self.GOOD_TEXT), self.engine(self.GOOD_TEXT)
+        self.assertEqual(self.extract(fast=fast, slow=slow).text, self.GOOD_TEXT)
+        slow.assert_not_called()
+
+    def test_garbled_output_falls_back(self):
+        result = self.extract(fast=self.engine("(cid:1)" * 20), slow=self.engine(self.GOOD_TEXT))
+        self.assertEqual(result.text, self.GOOD_TEXT)
+
+    def test_missing_library_and_failing_engine_are_skipped(self):
+        result = self.extract(
+            missing=self.engine(error=ImportError()), failing=self.engine(error=ValueError("bad xref")),
+            last=self.engine(self.GOOD_TEXT)
+        )
+        self.assertEqual(result.text, self.GOOD_TEXT)
+
+    def test_last_engine_failure_is_raised(self):
+        with self.assertRaisesMessage(ValueError, "bad xref"):
+            self.extract(fast=self.engine(""), last=self.engine(error=ValueError("bad xref")))
+
+    def test_no_available_engine(self):
+        with self.assertRaisesMessage(ValueError, "No PDF text engine is available."):
+            self.extract(missing=self.engine(error=ImportError()))
+
+    def test_broken_output_is_returned_when_nothing_better(self):
+        self.assertEqual(self.extract(only=self.engine("(cid:1)" * 20)).text, "(cid:1)" * 20)
+
+
+@override_settings(MATCH_MANDATORY_WEIGHT=0.6, MATCH_OPTIONAL_WEIGHT=0.25, MATCH_EXPERIENCE_WEIGHT=0.15)
+class SkillIndexTests(SimpleTestCase):
+    position = SimpleNamespace(
+        id=1, mandatory_skills=["Python", "Django"], optional_skills=["Docker"], exp_from=2, exp_to=5
+    )
+
+    def setUp(self):
+        self.index = SkillIndex()
+        self.index.add([
+            (5, [" python ", "Django."], 3, 1),
+            (6, ["Python"], 3, 2),
+            (7, ["Java"], 3, 1),
+            (8, ["PYTHON", "django", "Docker"], 0, 2),
+            (2, ["Python", "Django"], 4, 2),
+            (9, ["Python", "Django"], 10, 1),
+        ])
+
+    def ranked_ids(self, *args, **kwargs):
+        total, ranked = self.index.rank(self.position, *args, **kwargs)
+        return total, [int(self.index.ids[row]) for row, *_ in ranked]
+
+    def test_scores(self):
+        _, ranked = self.index.rank(self.position, 10)
+        scores = {int(self.index.ids[row]): (round(float(score), 4), float(experience))
+                  for row, score, _, _, experience in ranked}
+        self.assertEqual(scores[5], (0.75, 1.0))  # all mandatory skills, experience in range
+        self.assertEqual(scores[6], (0.45, 1.0))  # half the mandatory skills
+        self.assertEqual(scores[8], (0.85, 0.0))  # every skill, no experience
+        self.assertEqual(scores[9], (0.675, 0.5))  # twice the top of the range
+
+    def test_ranking_order_and_paging(self):
+        # Java-only candidate 7 matches nothing; equal scores go to the lower id
+        self.assertEqual(self.ranked_ids(10), (5, [8, 2, 5, 9, 6]))
+        self.assertEqual(self.ranked_ids(2, offset=1), (5, [2, 5]))
+        self.assertEqual(self.ranked_ids(10, offset=5), (5, []))
+        self.assertEqual(self.ranked_ids(10, applied_only=True), (2, [5, 9]))
+
+    def test_updated_candidate_replaces_its_row(self):
+        self.index.add([(8, ["Java"], 0, 2)])
+        self.assertEqual(self.ranked_ids(10), (4, [2, 5, 9, 6]))
+        self.assertEqual((self.index.size, self.index.dead), (7, 1))
+
+    def test_no_requested_skills_ranks_everyone_by_experience(self):
+        position = SimpleNamespace(id=1, mandatory_skills=[], optional_skills=[], exp_from=2, exp_to=5)
+        total, ranked = self.index.rank(position, 10)
+        self.assertEqual(total, 6)
+        self.assertEqual([int(self.index.ids[row]) for row, *_ in ranked][:4], [2, 5, 6, 7])
+
+
+@override_settings(MATCH_INDEX_RECHECK=3600)
+class SharedSkillIndexTests(TestCase):
+    def setUp(self):
+        matching._index = None
+        self.addCleanup(setattr, matching, '_index', None)
+        self.position = Position.objects.create(mandatory_skills=["Python"])
+        self.first = self.create_candidate(skills=["Python"])
+        # Enough unrelated rows that one superseded row stays under the rebuild threshold
+        Candidate.objects.bulk_create(Candidate(skills=["Java"]) for _ in range(10))
+
+    def create_candidate(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Candidate.objects.create(position=self.position, **fields)
+
+    def ranked_ids(self, index):
+        return [int(index.ids[row]) for row, *_ in index.rank(self.position, 10)[1]]
+
+    def test_unchanged_index_is_served_without_queries(self):
+        index = get_skill_index()
+        with self.assertNumQueries(0):
+            self.assertIs(get_skill_index(), index)
+
+    def test_saves_are_applied_incrementally(self):
+        index = get_skill_index()
+        second = self.create_candidate(skills=["Python"])
+        self.first.skills = ["Java"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.save()
+
+        refreshed = get_skill_index()
+        self.assertIsNot(refreshed, index)
+        self.assertEqual(self.ranked_ids(refreshed), [second.id])
+        self.assertEqual(refreshed.watermark, Candidate.objects.get(id=self.first.id).updated_at)
+        # readers still holding the old index keep a consistent view
+        self.assertEqual(self.ranked_ids(index), [self.first.id])
+        self.assertEqual(len(index.skills), index.size)
+        self.assertIs(get_skill_index(), refreshed)
+
+    def test_delete_rebuilds(self):
+        index = get_skill_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.delete()
+        rebuilt = get_skill_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(self.ranked_ids(rebuilt), [])
+
+    def test_writes_without_signals_are_seen_after_the_recheck_interval(self):
+        index = get_skill_index()
+        Candidate.objects.filter(id=self.first.id).update(skills=["Java"], updated_at=timezone.now())
+        self.assertEqual(self.ranked_ids(get_skill_index()), [self.first.id])
+        with override_settings(MATCH_INDEX_RECHECK=0):
+            self.assertEqual(self.ranked_ids(get_skill_index()), [])
+        self.assertEqual(self.ranked_ids(index), [self.first.id])
+
+
+class RankedCandidatesViewTests(TestCase):
+    def setUp(self):
+        matching._index = None
+        self.addCleanup(setattr, matching, '_index', None)
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        self.position = Position.objects.create(mandatory_skills=["Python", "Django"])
+        # Candidates with more matching skills rank first: 3 full matches, then 4 half matches
+        Candidate.objects.bulk_create(
+            [Candidate(name=f"full {i}", skills=["Python", "Django"]) for i in range(3)]
+            + [Candidate(name=f"half {i}", skills=["Python"]) for i in range(4)]
+            + [Candidate(name="other", skills=["Java"])]
+        )
+        self.url = reverse('ranked-candidates', args=[self.position.id])
+
+    def names(self, response):
+        return [result['name'] for result in response.data['results']]
+
+    def test_pages_through_the_ranking(self):
+        first = self.client.get(self.url, {'page_size': 4})
+        second = self.client.get(self.url, {'page_size': 4, 'page': 2})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['total'], 7)
+        self.assertEqual(self.names(first)[:3], ["full 0", "full 1", "full 2"])
+        self.assertEqual(len(self.names(first)), 4)
+        self.assertEqual(len(self.names(second)), 3)
+        self.assertFalse(set(self.names(first)) & set(self.names(second)))
+        self.assertEqual(first.data['results'][0]['matched_mandatory_skills'], ["python", "django"])
+
+    def test_top_k_caps_total_and_pages(self):
+        response = self.client.get(self.url, {'top_k': 5, 'page_size': 4, 'page': 2})
+        self.assertEqual(response.data['total'], 5)
+        self.assertEqual(len(response.data['results']), 1)
+
+        beyond = self.client.get(self.url, {'top_k': 5, 'page_size': 4, 'page': 3})
+        self.assertEqual(beyond.data['results'], [])
+
+    def test_unknown_position(self):
+        response = self.client.get(reverse('ranked-candidates', args=[self.position.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+
+class InterviewerIndexTests(SimpleTestCase):
+    INTERVIEWERS = [
+        {'id': 11, 'keywords': ["python", "Django"], 'domain': "IT", 'experience': 4},
+        {'id': 12, 'keywords': ["Python"], 'domain': "Finance", 'experience': 2},
+        {'id': 13, 'keywords': [], 'domain': "it", 'experience': 10},
+        {'id': 14, 'keywords': ["Java"], 'domain': "Sales", 'experience': 10},
+    ]
+
+    def setUp(self):
+        self.position = Position(
+            id=1, mandatory_skills=["Python", "Django"], optional_skills=["AWS"], domain="IT", exp_from=2, exp_to=4
+        )
+
+    def index(self, load=None):
+        return InterviewerIndex(self.INTERVIEWERS, load or {})
+
+    def test_fit_combines_skills_domain_and_experience(self):
+        fit = self.index().fit(self.position)
+        # skills: mandatory hits / (2 mandatory + 0.5 * 1 optional); experience: years / 4 required
+        expected = [
+            0.6 * 2 / 2.5 + 0.25 + 0.15,
+            0.6 * 1 / 2.5 + 0.15 * 0.5,
+            0.25 + 0.15,
+            0,  # no skill or domain overlap
+        ]
+        for actual, value in zip(fit, expected):
+            self.assertAlmostEqual(actual, value)
+
+    def test_best_prefers_fit_then_light_load(self):
+        self.assertEqual(self.index().best(self.position), 0)
+        with override_settings(ASSIGNMENT_LOAD_WEIGHT=1, INTERVIEWER_MAX_OPEN_INTERVIEWS=10):
+            # 0.88 - 6/10 falls below the unloaded domain-only interviewer's 0.4
+            self.assertEqual(self.index({11: 6}).best(self.position), 2)
+
+    @override_settings(INTERVIEWER_MAX_OPEN_INTERVIEWS=2)
+    def test_full_interviewers_are_skipped(self):
+        self.assertEqual(self.index({11: 2, 13: 5}).best(self.position), 1)
+        self.assertIsNone(self.index({11: 2, 12: 2, 13: 2}).best(self.position))
+
+    def test_nobody_fits(self):
+        position = Position(id=2, mandatory_skills=["Rust"], domain="Art")
+        self.assertIsNone(self.index().best(position))
+        self.assertIsNone(InterviewerIndex([], {}).best(position))
+
+
+class AssignPendingInterviewsTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.python = User.objects.create(username='py', role='interviewer', keywords=["Python"], experience=5)
+        self.java = User.objects.create(username='java', role='interviewer', keywords=["Java"], experience=5)
+        User.objects.create(username='retired', role='interviewer', keywords=["Python"], is_active=False)
+        self.python_role = Position.objects.create(employer=self.employer, mandatory_skills=["Python"])
+        self.java_role = Position.objects.create(employer=self.employer, mandatory_skills=["Java"])
+        self.rust_role = Position.objects.create(employer=self.employer, mandatory_skills=["Rust"])
+
+    def create_interviews(self, position, count, **fields):
+        candidate = Candidate.objects.create(position=position)
+        return Interview.objects.bulk_create(
+            Interview(employer=self.employer, candidate=candidate, position=position, **fields) for _ in range(count)
+        )
+
+    def assigned(self):
+        return dict(
+            Interview.objects.filter(interviewer__isnull=False).values_list('interviewer').annotate(n=Count('id'))
+        )
+
+    def test_assigns_in_bulk(self):
+        self.create_interviews(self.python_role, 3)
+        self.create_interviews(self.java_role, 2)
+        self.create_interviews(self.rust_role, 1)
+        self.create_interviews(self.java_role, 1, status='completed')
+
+        # Two queries build the index; each batch is one select and one bulk update inside a savepoint, and
+        # the final empty batch ends the loop
+        with self.assertNumQueries(2 + 2 * 4 + 3):
+            self.assertEqual(assign_pending_interviews(batch_size=4), (5, 1))
+        self.assertEqual(self.assigned(), {self.python.id: 3, self.java.id: 2})
+
+    def test_dry_run_saves_nothing(self):
+        self.create_interviews(self.python_role, 2)
+        self.assertEqual(assign_pending_interviews(dry_run=True), (2, 0))
+        self.assertEqual(self.assigned(), {})
+
+    def test_limit_stops_mid_batch(self):
+        self.create_interviews(self.python_role, 5)
+        self.assertEqual(assign_pending_interviews(batch_size=2, limit=3), (3, 0))
+        self.assertEqual(self.assigned(), {self.python.id: 3})
+
+    @override_settings(INTERVIEWER_MAX_OPEN_INTERVIEWS=2)
+    def test_load_counts_interviews_assigned_in_the_run(self):
+        self.create_interviews(self.python_role, 1, interviewer=self.python, status='scheduled')
+        self.create_interviews(self.python_role, 3)
+        self.assertEqual(assign_pending_interviews(), (1, 2))
+        self.assertEqual(self.assigned(), {self.python.id: 2})
+
+
+class PositionListTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        Position.objects.bulk_create(
+            Position(employer=self.employer, job_title=f"Role {i}") for i in range(105)
+        )
+        self.url = reverse('create-position')
+
+    def test_unpaged_request_returns_every_position(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 105)
+        self.assertNotIn('Link', response)
+
+    def test_paging(self):
+        response = self.client.get(self.url, {'page_size': 100, 'fields': 'id'})
+        ids = [item['id'] for item in response.json()]
+        self.assertEqual(len(ids), 100)
+        self.assertIn(f"after={ids[-1]}", response['Link'])
+
+        response = self.client.get(self.url, {'page_size': 100, 'fields': 'id', 'after': ids[-1]})
+        self.assertEqual(len(response.json()), 5)
+        self.assertNotIn('Link', response)
+        self.assertEqual(self.client.get(self.url, {'after': 'x'}).status_code, 400)
+
+    def test_unchanged_list_is_not_modified(self):
+        first = self.client.get(self.url, {'page_size': 10})
+        response = self.client.get(self.url, {'page_size': 10}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+        response = self.client.get(self.url, {'page_size': 10}, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        position = Position.objects.first()
+        position.job_title = "Renamed"
+        position.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        position.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ScriptedBackend:
+    """LLM backend replying with each of `outcomes` in turn: text, an exception to raise, or 'hang'."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def next_outcome(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def generate(self, prompt, max_output_tokens=None):
+        return self.next_outcome()
+
+    async def agenerate(self, prompt, max_output_tokens=None):
+        outcome = self.next_outcome()
+        if outcome == 'hang':
+            await asyncio.sleep(60)
+        return outcome
+
+    def is_retryable(self, exc):
+        return isinstance(exc, ConnectionError)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_then_rate(self):
+        bucket = llm.TokenBucket(rate=50, burst=2)
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0))
+        started = time.monotonic()
+        self.assertTrue(bucket.acquire(timeout=1))
+        self.assertGreater(time.monotonic() - started, 0.01)
+
+    def test_async_acquire(self):
+        bucket = llm.TokenBucket(rate=50, burst=1)
+        self.assertTrue(asyncio.run(bucket.aacquire(timeout=0)))
+        self.assertFalse(asyncio.run(bucket.aacquire(timeout=0)))
+        self.assertTrue(asyncio.run(bucket.aacquire(timeout=1)))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(llm, 'logger'))  # "circuit opened" warnings
+
+    def open_breaker(self, cooldown=0):
+        breaker = llm.CircuitBreaker(threshold=2, cooldown=cooldown)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        return breaker
+
+    def test_opens_after_threshold_and_refuses_during_cooldown(self):
+        breaker = self.open_breaker(cooldown=60)
+        self.assertTrue(breaker.blocked())
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = self.open_breaker()
+        self.assertFalse(breaker.blocked())
+        ticket = breaker.allow()
+        self.assertTrue(ticket)
+        self.assertTrue(breaker.blocked())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertIsNone(breaker.opened_at)
+        self.assertIs(breaker.allow(), True)
+
+    def test_released_trial_frees_the_breaker(self):
+        breaker = self.open_breaker()
+        ticket = breaker.allow()
+        breaker.release_trial(ticket)
+        self.assertFalse(breaker.trial_running)
+        self.assertTrue(breaker.allow())
+
+    def test_stale_ticket_does_not_release_a_later_trial(self):
+        breaker = self.open_breaker()
+        first = breaker.allow()
+        breaker.record_failure()
+        second = breaker.allow()
+        breaker.release_trial(first)
+        self.assertTrue(breaker.trial_running)
+        breaker.release_trial(second)
+        self.assertFalse(breaker.trial_running)
+
+
+@override_settings(
+    LLM_MAX_CONCURRENCY=1, LLM_QUEUE_TIMEOUT=0.05, LLM_RATE_PER_MINUTE=0, LLM_MAX_RETRIES=2,
+    LLM_BACKOFF_BASE=0, LLM_BACKOFF_MAX=0, LLM_BREAKER_THRESHOLD=3, LLM_BREAKER_COOLDOWN=0
+)
+class LLMGatewayTests(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(llm, 'logger'))
+
+    def gateway(self, *outcomes):
+        return llm.LLMGateway(ScriptedBackend(*outcomes))
+
+    def half_open(self, gateway):
+        for _ in range(gateway.breaker.threshold):
+            gateway.breaker.record_failure()
+        self.assertIsNotNone(gateway.breaker.opened_at)
+
+    def assertIdle(self, gateway):
+        self.assertEqual(gateway.state()['in_flight'], 0)
+        self.assertFalse(gateway.breaker.trial_running)
+        self.assertTrue(gateway.slots.acquire(blocking=False))
+        gateway.slots.release()
+
+    def test_retries_retryable_errors(self):
+        gateway = self.gateway(ConnectionError("reset"), ConnectionError("reset"), "reply")
+        self.assertEqual(gateway.generate("prompt"), "reply")
+        self.assertEqual(gateway.backend.calls, 3)
+        self.assertEqual(gateway.breaker.failures, 0)
+        self.assertIdle(gateway)
+
+    def test_gives_up_after_max_retries(self):
+        gateway = self.gateway(*[ConnectionError("reset")] * 3)
+        with self.assertRaisesMessage(llm.LLMError, "Language model request failed: reset"):
+            gateway.generate("prompt")
+        self.assertEqual(gateway.backend.calls, 3)
+        self.assertIsNotNone(gateway.breaker.opened_at)
+        self.assertIdle(gateway)
+
+    def test_bad_request_is_not_retried(self):
+        gateway = self.gateway(ValueError("bad prompt"))
+        with self.assertRaisesMessage(ValueError, "bad prompt"):
+            gateway.generate("prompt")
+        self.assertEqual(gateway.backend.calls, 1)
+        self.assertEqual(gateway.breaker.failures, 0)
+        self.assertIdle(gateway)
+
+    def test_open_breaker_fails_fast(self):
+        gateway = self.gateway("reply")
+        gateway.breaker.cooldown = 60
+        self.half_open(gateway)
+        with self.assertRaises(llm.LLMUnavailable):
+            gateway.generate("prompt")
+        self.assertEqual(gateway.backend.calls, 0)
+        self.assertIdle(gateway)
+
+    def test_half_open_slot_timeout_does_not_leak_the_trial(self):
+        gateway = self.gateway("reply")
+        self.half_open(gateway)
+        gateway.slots.acquire()
+        with self.assertRaisesMessage(llm.LLMUnavailable, "Too many language model requests"):
+            gateway.generate("prompt")
+        gateway.slots.release()
+        self.assertEqual(gateway.generate("prompt"), "reply")
+        self.assertIsNone(gateway.breaker.opened_at)
+        self.assertIdle(gateway)
+
+    @override_settings(LLM_RATE_PER_MINUTE=60, LLM_BURST=1)
+    def test_half_open_rate_limit_does_not_leak_the_trial(self):
+        gateway = self.gateway("reply")
+        gateway.bucket.acquire(timeout=0)
+        self.half_open(gateway)
+        with self.assertRaisesMessage(llm.LLMUnavailable, "rate limit"):
+            gateway.generate("prompt")
+        self.assertIdle(gateway)
+
+    def test_cancelled_half_open_trial_is_released(self):
+        gateway = self.gateway('hang', "reply")
+        self.half_open(gateway)
+
+        async def cancel_trial():
+            task = asyncio.create_task(gateway.agenerate("prompt"))
+            while not gateway.breaker.trial_running:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return await gateway.agenerate("prompt")
+
+        self.assertEqual(asyncio.run(cancel_trial()), "reply")
+        self.assertIdle(gateway)
+
+    def test_stream_holds_the_slot_until_closed(self):
+        gateway = llm.LLMGateway(llm.StubBackend())
+        with override_settings(LLM_STUB_RESPONSE="one two three"):
+            chunks = gateway.stream("prompt")
+            self.assertEqual(gateway.state()['in_flight'], 1)
+            self.assertEqual("".join(chunks), "one two three")
+        self.assertIdle(gateway)
+
+    def test_unread_stream_releases_the_slot_when_closed(self):
+        gateway = llm.LLMGateway(llm.StubBackend())
+        for _ in range(3):  # more than LLM_MAX_CONCURRENCY
+            gateway.stream("prompt").close()
+        self.assertIdle(gateway)
+        self.assertEqual(gateway.generate("prompt"), settings.LLM_STUB_RESPONSE)
+
+
+class JDArtifactStoreTests(SimpleTestCase):
+    def setUp(self):
+        artifact_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, artifact_dir, True)
+        self.enterContext(override_settings(JD_ARTIFACT_DIR=artifact_dir, JD_ARTIFACT_KEEP=2))
+        self.render = self.enterContext(mock.patch(
+            'resume_app.jd_files.render_jd_in_pool', side_effect=lambda fmt, title, text: text.encode()
+        ))
+
+    def artifact(self, text):
+        return get_jd_artifact('pdf', "Engineer", text)[0]
+
+    def test_least_recently_used_files_are_pruned(self):
+        first, second = self.artifact("first"), self.artifact("second")
+        os.utime(first, (1000, 1000))
+        os.utime(second, (2000, 2000))
+        self.assertEqual(self.artifact("first"), first)  # a hit makes it the most recently used
+        self.assertEqual(self.render.call_count, 2)
+
+        third = self.artifact("third")
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(third))
+
+    def test_pruned_artifact_is_rendered_again(self):
+        first = self.artifact("first")
+        os.utime(first, (1000, 1000))
+        self.artifact("second")
+        self.artifact("third")
+        with open(self.artifact("first"), 'rb') as f:
+            self.assertEqual(f.read(), b"first")
+        self.assertEqual(self.render.call_count, 4)
+
+
+class ResumeRulesTests(SimpleTestCase):
+    def test_phone_formats(self):
+        cases = [
+            ("+44 20 7946 0958", "+44 20 7946 0958"),
+            ("Tel: +1 (415) 555-0132", "+1 (415) 555-0132"),
+            ("+91 98765 43210", "+91 98765 43210"),
+            ("0044 20 7946 0958", "0044 20 7946 0958"),
+            ("+33 1 23 45 67 89", "+33 1 23 45 67 89"),
+            ("Phone: +81-3-1234-5678", "+81-3-1234-5678"),
+            ("415.555.0132 | jane@example.com", "415.555.0132"),
+            ("Mobile: 98765-43210", "98765-43210"),
+            ("2015 - 2019 2019 - 2021", ""),  # year ranges
+            ("Order 12345678901234567890", ""),  # too many digits
+            ("Call 555-0132", ""),  # too few
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(find_phone(text), expected)
+
+    def test_email(self):
+        cases = [
+            ("jane.doe+jobs@mail.co.uk", "jane.doe+jobs@mail.co.uk"),
+            ("Email: j_doe@sub.example.com.", "j_doe@sub.example.com"),
+            ("jane at example dot com", ""),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(find_email(text), expected)
+
+    def test_names(self):
+        cases = [
+            ("JOHN A. DOE\nBackend Engineer", "John A. Doe"),
+            ("J. R. Smith\njr@example.com", "J. R. Smith"),
+            ("Mary-Jane O'Neil", "Mary-Jane O'Neil"),
+            ("Jane Doe | Python Developer", "Jane Doe"),
+            ("Curriculum Vitae\nJOSÉ GARCÍA", "José García"),
+            ("jane@example.com\n+44 20 7946 0958", ""),
+            ("Madonna\nSinger", ""),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(guess_name(text), expected)
+
+    def test_only_confident_contact_fields(self):
+        body = "\n".join(["Experience"] + [f"Built service {i} in Python." for i in range(12)])
+        cases = [
+            ("header block", "PRIYA SHARMA\npriya@example.com | +91 98765 43210\n" + body,
+             {"name": "Priya Sharma", "email": "priya@example.com", "phone": "+91 98765 43210"}),
+            ("resume title first", "RESUME\nJ. R. Smith\njr@example.com\n" + body,
+             {"name": "J. R. Smith", "email": "jr@example.com"}),
+            ("job title above the name", "Senior Software Engineer\nJane Doe\njane@example.com\n" + body,
+             {"email": "jane@example.com"}),
+            ("lower-case name", "jane doe\njane@example.com\n" + body, {"email": "jane@example.com"}),
+            ("no contact block", body + "\nReferences: a.lee@corp.com, b.khan@corp.com\nEmployee ID 1234567890", {}),
+            ("only address is in the body", body + "\nReach me at jane@example.com", {"email": "jane@example.com"}),
+            ("labelled phone in the body", body + "\nMobile: +44 20 7946 0958", {"phone": "+44 20 7946 0958"}),
+        ]
+        for label, text, expected in cases:
+            with self.subTest(label):
+                self.assertEqual(preparse_contact(text), expected)
+
+
+class ResumeContactMergeTests(StubLLMTestCase):
+    LLM_REPLY = json.dumps({
+        "name": "Jane Doe", "email": "jane@llm.example", "phone": "", "skills": ["Python"], "experience": "5"
+    })
+
+    def test_llm_value_kept_when_rules_are_unsure(self):
+        with override_settings(LLM_STUB_RESPONSE=self.LLM_REPLY, RESUME_PARSER_MODE='llm'):
+            data = extract_resume_data_with_llm("Senior Software Engineer\nJane Doe\njane@example.com\nPython")
+        self.assertEqual(data['name'], "Jane Doe")
+        self.assertEqual(data['email'], "jane@example.com")
+        prompt = llm.get_llm().backend.prompts[-1]
+        self.assertIn("- name", prompt)
+        self.assertNotIn("- email", prompt)
+
+
+@override_settings(LLM_CHARS_PER_TOKEN=4)
+class PromptBudgetTests(SimpleTestCase):
+    RESUME = (
+        "Jane Doe\njane@example.com\n9876543210\n"
+        "Education\nB.Sc. Computer Science\n2016\n"
+        "Experience\nAcme Corp, 08/2020 - 12/2023\nBuilt billing APIs in Django\nPage 1 of 2\f"
+        "Globex, 2018 - 2020\nMaintained ETL jobs\n"
+        "Skills\nPython, Django, PostgreSQL\nPage 2 of 2\f"
+    )
+
+    def test_repeated_page_numbers_are_dropped(self):
+        for first, second in (("Page 1 of 2", "Page 2 of 2"), ("1/2", "2/2"), ("1", "2")):
+            with self.subTest(first):
+                text = f"Jane Doe\nPython developer\n{first}\fDjango, AWS\nLinux\n{second}\f"
+                self.assertEqual(clean_text(text), "Jane Doe\nPython developer\nDjango, AWS\nLinux")
+
+    def test_phone_year_and_date_lines_are_kept(self):
+        cleaned = clean_text(self.RESUME).split("\n")
+        for line in ("9876543210", "2016", "Acme Corp, 08/2020 - 12/2023"):
+            self.assertIn(line, cleaned)
+        self.assertNotIn("Page 1 of 2", cleaned)
+        # A short number on a single page isn't a page number
+        self.assertEqual(clean_text("Team size\n12\nLed the migration"), "Team size\n12\nLed the migration")
+
+    def test_text_within_budget_is_only_cleaned(self):
+        self.assertEqual(fit_to_budget(self.RESUME, RESUME_SECTIONS, 1000), clean_text(self.RESUME))
+
+    def test_over_budget_keeps_header_then_sections_in_priority_order(self):
+        budget = estimate_tokens(clean_text(self.RESUME)) - 5
+        trimmed = fit_to_budget(self.RESUME, RESUME_SECTIONS, budget)
+        self.assertLessEqual(estimate_tokens(trimmed), budget + 5)
+        self.assertTrue(trimmed.startswith("Jane Doe\njane@example.com\n9876543210"))
+        self.assertLess(trimmed.index("Skills:\nPython, Django, PostgreSQL"), trimmed.index("Experience:"))
+        self.assertNotIn("2016", trimmed)  # education goes first when the budget runs out
+
+
+class SearchQueryTests(SimpleTestCase):
+    def test_parse_query(self):
+        cases = [
+            ("Kubernetes terraform 3 years", (['kubernetes', 'terraform'], 3.0)),
+            ("python 5+ yrs django", (['python', 'django'], 5.0)),
+            ("C++ C# node.js", (['c++', 'c#', 'node.js'], None)),
+            ("3 years", ([], 3.0)),
+            ("scikit-learn, AWS!", (['scikit-learn', 'aws'], None)),
+        ]
+        for query, expected in cases:
+            with self.subTest(query):
+                self.assertEqual(parse_query(query), expected)
+
+    def test_fts_expression_quotes_terms(self):
+        self.assertEqual(fts_expression(['python', 'django']), '"python"* "django"*')
+        self.assertEqual(fts_expression(['python', 'django'], match_any=True), '"python"* OR "django"*')
+        self.assertEqual(fts_expression(['a"b', 'near']), '"a""b"* "near"*')
+
+
+class CandidateSearchTests(TestCase):
+    def setUp(self):
+        self.junior = self.candidate("Asha Rao", ["Python", "Django"], 1, "Built Django REST APIs.")
+        self.senior = self.candidate("Ben Okafor", ["Go", "Kubernetes"], 6, "Ran Kubernetes clusters with Terraform.")
+
+    def candidate(self, name, skills, experience, text):
+        candidate = Candidate(name=name, skills=skills, experience=experience)
+        candidate.set_extracted_text(text, "", "test")
+        candidate.save()
+        return candidate
+
+    def search(self, query, **filters):
+        return [pk for pk, _, _ in search_candidates(query, filters, 10)]
+
+    def test_saves_and_deletes_keep_the_index_in_step(self):
+        self.assertEqual(self.search("terraform"), [self.senior.id])
+        self.senior.name = "Benedict Okafor"
+        self.senior.save()
+        self.assertEqual(self.search("benedict"), [self.senior.id])
+        self.senior.delete()
+        self.assertEqual(self.search("terraform"), [])
+
+    def test_rebuild_command_restores_the_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        self.assertEqual(self.search("django"), [])
+        out = StringIO()
+        call_command('rebuild_candidate_search', stdout=out)
+        self.assertIn("Indexed 2 candidate(s)", out.getvalue())
+        self.assertEqual(self.search("django"), [self.junior.id])
+
+    def test_experience_only_query_matches_on_both_paths(self):
+        for fts in (True, False):
+            with self.subTest(fts=fts), mock.patch('resume_app.search.fts_available', return_value=fts):
+                self.assertEqual(self.search("3 years"), [self.senior.id])
+                self.assertEqual(self.search("0 years"), [self.senior.id, self.junior.id])
+                self.assertEqual(self.search("python 3 years"), [])
+
+
+@mock.patch('resume_app.services.upload_to_s3', side_effect=lambda file_obj, file_name: f"https://bucket/{file_name}")
+class AsyncViewTests(StubLLMTestCase):
+    def setUp(self):
+        super().setUp()
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.position = Position.objects.create(employer=self.employer, job_title="Backend Engineer", domain="IT")
+        self.auth = {'Authorization': f"Bearer {AccessToken.for_user(self.employer)}"}
+        self.async_client = AsyncClient()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.auth['Authorization'])
+
+    def candidate_form(self, name='asha.docx'):
+        return {'position_id': self.position.id, 'resume_file': docx_upload(name, ["Asha Rao", "asha@example.com"])}
+
+    async def test_requires_a_valid_token(self, upload):
+        url = reverse('async-generate-jd-preview')
+        data = {'job_title': "Data Engineer", 'domain': "IT", 'experience': 3}
+        response = await self.async_client.post(url, data, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"detail": "Authentication credentials were not provided."})
+        response = await self.async_client.post(
+            url, data, content_type='application/json', headers={'Authorization': "Bearer not-a-token"}
+        )
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.post(url, data, content_type='application/json', headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+
+    def test_candidate_matches_the_sync_view(self, upload):
+        sync = self.client.post(reverse('add-candidate'), self.candidate_form('sync.docx'))
+        response = async_to_sync(self.async_client.post)(
+            reverse('async-add-candidate'), self.candidate_form('async.docx'), headers=self.auth
+        )
+        self.assertEqual(sync.status_code, 201)
+        self.assertEqual(response.status_code, 201)
+        sync_data, async_data = sync.json(), response.json()
+        for data in (sync_data, async_data):
+            data.pop('id')
+            data.pop('resume_s3_url')
+        self.assertEqual(async_data, sync_data)
+        self.assertEqual(async_data['name'], "Asha Rao")
+
+    def test_jd_preview_matches_the_sync_view(self, upload):
+        data = {'job_title': "Data Engineer", 'domain': "IT", 'experience': 3}
+        with override_settings(LLM_STUB_RESPONSE="## About the role\nBuild pipelines."):
+            sync = self.client.post(reverse('generate-jd-preview'), data, format='json')
+            response = async_to_sync(self.async_client.post)(
+                reverse('async-generate-jd-preview'), data, content_type='application/json', headers=self.auth
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync.json())
+
+    def test_unavailable_llm_maps_to_503_like_the_sync_view(self, upload):
+        unavailable = llm.LLMUnavailable("The language model is temporarily unavailable; try again shortly.")
+        with override_settings(RESUME_RULES_FALLBACK=False), \
+                mock.patch.object(llm.LLMGateway, 'generate', side_effect=unavailable), \
+                mock.patch.object(llm.LLMGateway, 'agenerate', side_effect=unavailable):
+            sync = self.client.post(reverse('add-candidate'), self.candidate_form())
+            response = async_to_sync(self.async_client.post)(
+                reverse('async-add-candidate'), self.candidate_form(), headers=self.auth
+            )
+        self.assertEqual(sync.status_code, 503)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), sync.json())
+        self.assertFalse(Candidate.objects.exists())
+
+    def test_failed_parse_cancels_the_pending_upload(self, upload):
+        pending = Future()
+        with mock.patch('resume_app.async_views.upload_to_s3_in_background', return_value=pending), \
+                mock.patch('resume_app.async_views.aparse_resume', side_effect=ValueError("Unreadable resume.")):
+            response = async_to_sync(self.async_client.post)(
+                reverse('async-add-candidate'), self.candidate_form(), headers=self.auth
+            )
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json(), {"error": "Unreadable resume."})
+        self.assertTrue(pending.cancelled())
+
+    def test_cancelled_upload_closes_its_reader(self, upload):
+        blocker = threading.Event()
+        with mock.patch.object(services, '_upload_executor', ThreadPoolExecutor(max_workers=1)) as executor:
+            self.addCleanup(executor.shutdown)
+            self.addCleanup(blocker.set)  # runs first, freeing the worker
+            executor.submit(blocker.wait)  # keeps the next upload queued
+            resume = docx_upload('queued.docx', ["Asha Rao"])
+            with mock.patch.object(services, 'independent_reader', return_value=BytesIO(resume.read())) as reader:
+                future = services.upload_to_s3_in_background(resume)
+                self.assertTrue(future.cancel())
+            self.assertTrue(reader.return_value.closed)
+
+
+class JDPreviewStreamTests(StubLLMTestCase):
+    data = {'job_title': "Data Engineer", 'domain': "IT", 'experience': 3}
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(LLM_STUB_RESPONSE="## About the role\nBuild pipelines.", LLM_MAX_CONCURRENCY=2))
+        services._generated_jd_cache.clear()
+        self.addCleanup(services._generated_jd_cache.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='employer', role='employer'))
+
+    def post(self, query="?stream=true", **extra):
+        return self.client.post(reverse('generate-jd-preview') + query, self.data, format='json', **extra)
+
+    def events(self, response):
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = b"".join(response.streaming_content).decode().strip().split("\n\n")
+        events = []
+        for frame in frames:
+            event, data = frame.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+        return events
+
+    def test_chunks_then_done(self):
+        events = self.events(self.post())
+        self.assertEqual(events[-1], ('done', {}))
+        self.assertTrue(all(name == 'chunk' for name, _ in events[:-1]))
+        self.assertEqual("".join(data['text'] for _, data in events[:-1]), "## About the role\nBuild pipelines.")
+        # The finished text is cached and replayed as a single chunk
+        self.assertEqual(self.events(self.post())[0], ('chunk', {"text": "## About the role\nBuild pipelines."}))
+        self.assertEqual(llm.get_llm().state()['in_flight'], 0)
+
+    def test_accept_header_selects_the_stream(self):
+        self.assertEqual(self.events(self.post("", HTTP_ACCEPT='text/event-stream'))[-1], ('done', {}))
+
+    def test_failure_mid_stream_sends_an_error_event(self):
+        def broken_stream(backend, prompt, max_output_tokens=None):
+            yield "Build "
+            raise ValueError("connection reset")
+
+        with mock.patch.object(llm.StubBackend, 'stream', broken_stream):
+            events = self.events(self.post())
+        self.assertEqual(events[0], ('chunk', {"text": "Build "}))
+        self.assertEqual(events[-1], ('error', {"error": "Language model stream failed: connection reset"}))
+        self.assertEqual(llm.get_llm().state()['in_flight'], 0)
+
+    def test_json_preview_without_streaming(self):
+        response = self.post("")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"jd_lines": ["## About the role", "Build pipelines."]})
+
+    def test_abandoned_stream_releases_its_slot(self):
+        for _ in range(3):  # more than LLM_MAX_CONCURRENCY
+            self.post().close()  # client gone before the body was read
+        self.assertEqual(llm.get_llm().state()['in_flight'], 0)
+        self.assertEqual(self.post("").status_code, 200)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create(username='employer', role='employer')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def test_server_timing_header(self):
+        self.assertEqual(
+            metrics.server_timing([('db', 0.001), ('llm', 0.5), ('db', 0.002)], 0.6),
+            'db;dur=3.0;desc="2x", llm;dur=500.0;desc="1x", total;dur=600.0'
+        )
+        response = self.client.get(reverse('create-position'))
+        entries = response['Server-Timing'].split(", ")
+        self.assertTrue(entries[0].startswith("db;dur="))
+        self.assertTrue(entries[-1].startswith("total;dur="))
+
+        with override_settings(SERVER_TIMING=False):
+            self.assertNotIn('Server-Timing', self.client.get(reverse('create-position')))
+
+    def test_queries_are_timed_as_the_db_stage(self):
+        self.assertIn(metrics.time_query, connection.execute_wrappers)
+        token = metrics.start_request()
+        Candidate.objects.count()
+        Position.objects.exists()
+        self.assertEqual([stage for stage, _ in metrics.finish_request(token)], ['db', 'db'])
+
+    def test_render_prometheus(self):
+        histogram = metrics.Histogram('test_seconds', "Test durations.", ('stage',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, 'db')
+        histogram.observe(0.5, 'db')
+        counter = metrics.Counter('test_total', "Test lookups.", ('cache',))
+        counter.inc('jd "v2"', amount=3)
+        extra = [('test_ratio', "Test ratio.", 'gauge', ('cache',), [(('jd',), 0.75)])]
+        with mock.patch('resume_app.metrics.METRICS', [histogram, counter]):
+            self.assertEqual(metrics.render_prometheus(extra), "\n".join([
+                '# HELP test_seconds Test durations.',
+                '# TYPE test_seconds histogram',
+                'test_seconds_bucket{stage="db",le="0.1"} 1',
+                'test_seconds_bucket{stage="db",le="1.0"} 2',
+                'test_seconds_bucket{stage="db",le="+Inf"} 2',
+                'test_seconds_sum{stage="db"} 0.55',
+                'test_seconds_count{stage="db"} 2',
+                '# HELP test_total Test lookups.',
+                '# TYPE test_total counter',
+                'test_total{cache="jd \\"v2\\""} 3',
+                '# HELP test_ratio Test ratio.',
+                '# TYPE test_ratio gauge',
+                'test_ratio{cache="jd"} 0.75',
+            ]) + "\n")
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_needs_the_token(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE resume_app_stage_duration_seconds histogram", response.content.decode())
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_endpoint_without_a_token_is_for_local_debugging_only(self):
+        url = reverse('metrics')
+        with override_settings(DEBUG=False):
+            self.assertEqual(self.client.get(url).status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.5').status_code, 403)
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir, True)
+        self.enterContext(override_settings(PROFILE_DIR=profile_dir, PROFILE_SAMPLE_RATE=0))
+        self.profile_dir = profile_dir
+        self.client = APIClient()
+
+    def login(self, role):
+        user = User.objects.create(username=role, role=role)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    def test_non_admin_request_is_not_profiled(self):
+        self.login('employer')
+        response = self.client.get(reverse('interview-list'), HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_admin_request_is_profiled(self):
+        self.login('admin')
+        self.assertNotIn('X-Profile-Id', self.client.get(reverse('interview-list')))
+
+        response = self.client.get(reverse('interview-list'), HTTP_X_PROFILE='1')
+        name = response['X-Profile-Id']
+        self.assertEqual(sorted(os.listdir(self.profile_dir)), [f"{name}.prof", f"{name}.txt"])
+
+        reports = self.client.get(reverse('profile-list')).json()
+        self.assertEqual([(r['name'], r['method'], r['path']) for r in reports],
+                         [(name, 'GET', reverse('interview-list'))])
+        summary = self.client.get(reverse('profile-detail', args=[name]))
+        self.assertTrue(summary.content.decode().startswith(f"GET {reverse('interview-list')} took "))
+        download = self.client.get(reverse('profile-detail', args=[name]), {'download': 1})
+        self.assertEqual(download['Content-Type'], 'application/octet-stream')
+
+    def test_profile_views_require_the_admin_role(self):
+        self.login('admin')
+        name = self.client.get(reverse('interview-list'), HTTP_X_PROFILE='1')['X-Profile-Id']
+
+        self.login('employer')
+        self.assertEqual(self.client.get(reverse('profile-list')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('profile-detail', args=[name])).status_code, 403)
+        self.client.credentials()
+        self.assertEqual(self.client.get(reverse('profile-list')).status_code, 401)
+
+    def test_report_path_rejects_names_outside_the_profile_dir(self):
+        name = "20261018T120000.000000Z-GET-api_positions-12ms"
+        with open(os.path.join(self.profile_dir, f"{name}.txt"), 'w') as f:
+            f.write("GET /api/positions/ took 12.0 ms\n")
+        os.makedirs(os.path.join(self.profile_dir, "nested"))
+        with open(os.path.join(self.profile_dir, "nested", f"{name}.txt"), 'w') as f:
+            f.write("secret")
+
+        self.assertEqual(report_path(name, 'txt'), os.path.join(self.profile_dir, f"{name}.txt"))
+        for bad in (f"../{name}", f"nested/../{name}", f"nested/{name}", "../../etc/passwd"):
+            self.assertIsNone(report_path(bad, 'txt'), bad)
+        self.login('admin')
+        self.assertEqual(self.client.get(reverse('profile-detail', args=["..secrets"])).status_code, 404)
+
+
+class BackfillExtractedTextTests(StubLLMTestCase):
+    # Long enough that the stored text goes over ExtractedTextMixin.COMPRESS_OVER
+    LINES = [f"Line {i}: built Python and Django services for data pipelines." for i in range(60)]
+
+    def setUp(self):
+        super().setUp()
+        self.candidates = [
+            Candidate.objects.create(
+                name=f"Candidate {i}", resume_file=docx_upload(f"r{i}.docx", [f"Candidate {i}", *self.LINES])
+            )
+            for i in range(3)
+        ]
+        self.position = Position.objects.create(job_description_file=docx_upload('jd.docx', ["Build APIs."]))
+
+    def backfill(self, **options):
+        out = StringIO()
+        call_command('backfill_extracted_text', stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_stores_compressed_text_hash_and_version(self):
+        output = self.backfill()
+        self.assertIn("candidate: 3 row(s) updated, 0 failed", output)
+        self.assertIn("position: 1 row(s) updated, 0 failed", output)
+
+        for candidate in self.candidates:
+            candidate.refresh_from_db()
+            with candidate.resume_file.open('rb') as f:
+                self.assertEqual(candidate.content_hash, hashlib.sha256(f.read()).hexdigest())
+            self.assertTrue(candidate.extractor_version.startswith(f"{EXTRACTOR_VERSION}:"))
+            self.assertTrue(candidate.extracted_text_compressed)
+            self.assertIn(candidate.name, candidate.extracted_text)
+            self.assertIn(self.LINES[-1], candidate.extracted_text)
+        self.position.refresh_from_db()
+        self.assertFalse(self.position.extracted_text_compressed)
+        self.assertEqual(self.position.extracted_text.strip(), "Build APIs.")
+
+        with mock.patch('resume_app.management.commands.backfill_extracted_text.submit_extraction') as submit:
+            output = self.backfill()
+        submit.assert_not_called()
+        self.assertIn("candidate: 0 row(s) updated, 0 failed", output)
+        self.assertIn("position: 0 row(s) updated, 0 failed", output)
+
+    def test_limit_stops_mid_batch(self):
+        self.assertIn("candidate: 1 row(s) updated", self.backfill(model='candidate', batch_size=2, limit=1))
+        self.assertEqual(Candidate.objects.exclude(extractor_version="").count(), 1)
@@ -1,6 +1,7 @@
 from django.urls import path
 from django.views.generic import TemplateView
-from .views import PositionCreateView, PositionDetailView, CandidateCreateView, test_position, test_candidate, test_jd, GenerateJDPreviewView, GenerateJDFileView,EmployerSignupView, InterviewerSignupView,test_employer_signup, test_interviwer_signup, LoginView , InterviewListView
+from .async_views import AsyncPositionCreateView, AsyncCandidateCreateView, AsyncGenerateJDPreviewView, AsyncGenerateJDFileView
+from .views import PositionCreateView, PositionDetailView, RankedCandidatesView, CandidateCreateView, CandidateBulkCreateView, CandidateSearchView, CandidateJobStatusView, test_position, test_candidate, test_jd, GenerateJDPreviewView, GenerateJDFileView,EmployerSignupView, InterviewerSignupView,test_employer_signup, test_interviwer_signup, LoginView , InterviewListView, MetricsView, ProfileListView, ProfileDetailView
 
 urlpatterns = [
     path('employer-signup/', EmployerSignupView.as_view(), name='signup-employer'),
@@ -13,9 +14,13 @@ urlpatterns = [
     # Position APIs
     path('positions/', PositionCreateView.as_view(), name='create-position'),
     path('positions/<int:pk>/details/', PositionDetailView.as_view(), name='position-details'),
+    path('positions/<int:pk>/ranked-candidates/', RankedCandidatesView.as_view(), name='ranked-candidates'),
 
     # Candidate APIs
     path('candidates/', CandidateCreateView.as_view(), name='add-candidate'),
+    path('candidates/bulk/', CandidateBulkCreateView.as_view(), name='bulk-add-candidates'),
+    path('candidates/search/', CandidateSearchView.as_view(), name='candidate-search'),
+    path('candidates/jobs/<int:pk>/', CandidateJobStatusView.as_view(), name='candidate-job-status'),
     path('test/position/', test_position, name='test-position'),
 path('test/candidate/', test_candidate, name='test-candidate'),
 path('test/jd/', test_jd, name='test-jd'),
@@ -24,4 +29,13 @@ path('test/jd/', test_jd, name='test-jd'),
 path('generate-jd-preview/', GenerateJDPreviewView.as_view(), name='generate-jd-preview'),
 path('generate-jd-file/', GenerateJDFileView.as_view(), name='generate_jd_file'),
 path('interviews/', InterviewListView.as_view(), name='interview-list'),
+path('internal/metrics/', MetricsView.as_view(), name='metrics'),
+path('admin/profiles/', ProfileListView.as_view(), name='profile-list'),
+path('admin/profiles/<str:name>/', ProfileDetailView.as_view(), name='profile-detail'),
+
+    # Async variants, for deployments served through ResumeExtractor/asgi.py
+    path('async/positions/', AsyncPositionCreateView.as_view(), name='async-create-position'),
+    path('async/candidates/', AsyncCandidateCreateView.as_view(), name='async-add-candidate'),
+    path('async/generate-jd-preview/', AsyncGenerateJDPreviewView.as_view(), name='async-generate-jd-preview'),
+    path('async/generate-jd-file/', AsyncGenerateJDFileView.as_view(), name='async-generate-jd-file'),
 ]
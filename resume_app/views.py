@@ -1,17 +1,52 @@
-import boto3
-import json
-from io import BytesIO
-from docx import Document
-from pdfminer.high_level import extract_text
+import hashlib
+import hmac
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db.models import Count, Max
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Position, Candidate , Interview
-import google.generativeai as genai
+from .models import Position, Candidate , Interview, ResumeExtractionCache, CandidateJob
+from .jd_files import JD_FILE_TYPES, artifact_digest, get_jd_artifact
+from . import llm
+from .llm import LLMUnavailable, get_llm
+from .matching import candidates_changed, get_skill_index, normalize_skills
+from .metrics import cache_hit_ratios, record_cache, render_prometheus, submit_with_timings
+from .pagination import InvalidCursor, id_keyset_page, keyset_page
+from .profiling import list_reports, report_path
+from .prompts import prompt_stats
+from .renderers import EventStream, EventStreamRenderer, sse_event
+from .search import index_candidates, search_candidates
+from .extraction import extract_document, extraction_source, extractor_version, submit_extraction, wait_for_extraction
+from .services import (
+    build_candidate,
+    build_position,
+    candidate_data,
+    extract_resume_data_with_llm,
+    file_sha256,
+    generated_jd_hash,
+    get_cached_generated_jd,
+    get_generated_jd,
+    get_jd_skills,
+    is_cacheable_extraction,
+    jd_prompt,
+    parse_resume,
+    position_data,
+    positions_with_jd_text,
+    resume_prompt_version,
+    store_generated_jd,
+    upload_to_s3_in_background,
+)
 from django.shortcuts import render
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework.permissions import AllowAny
@@ -20,6 +55,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework import status, permissions
 from .serializers import EmployerSignupSerializer, InterviewerSignupSerializer, MyTokenObtainPairSerializer , InterviewSerializer
 
+
 class LoginView(TokenObtainPairView):
     permission_classes = [AllowAny]
     serializer_class = MyTokenObtainPairSerializer
@@ -60,94 +96,38 @@ def test_interviwer_signup(request):
 def test_jd(request):
     return render(request, 'resume_app/jd.html')
 
-# ------------ S3 Upload Function ------------
-def upload_to_s3(file_obj, file_name):
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME
-    )
-    s3.upload_fileobj(file_obj, settings.AWS_STORAGE_BUCKET_NAME, file_name)
-    url = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{file_name}"
-    return url
-
-
-# ------------ Extract Text from File ------------
-def extract_text_from_file(file_obj, file_name):
-    text = ""
-    if file_name.endswith('.pdf'):
-        text = extract_text(file_obj)
-    elif file_name.endswith('.docx'):
-        doc = Document(file_obj)
-        text = "\n".join([p.text for p in doc.paragraphs])
-    else:
-        raise ValueError("Unsupported file format. Please upload PDF or DOCX.")
-    return text
-
-
-# ------------ LLM Resume Parsing ------------
-def extract_resume_data_with_llm(resume_text):
-    genai.configure(api_key=settings.GEMINI_API_KEY)
-    model = genai.GenerativeModel("models/gemini-2.5-flash")
-
-    prompt = f"""
-    You are a resume parsing AI. From the given resume text, extract structured information.
-    Return JSON with these exact keys:
-    - name
-    - email
-    - phone
-    - skills (list)
-    - experience
-
-    Resume text:
-    {resume_text}
-    """
-
-    response = model.generate_content(prompt)
-    result_text = response.text.strip()
-
-    try:
-        data = json.loads(result_text)
-    except json.JSONDecodeError:
-        try:
-            json_start = result_text.find('{')
-            json_end = result_text.rfind('}') + 1
-            data = json.loads(result_text[json_start:json_end])
-        except Exception:
-            data = {"name": "", "email": "", "phone": "", "skills": [], "experience": ""}
-    return data
-
-
-# ------------ LLM JD Parsing ------------
-def extract_skills_from_jd(jd_text):
-    genai.configure(api_key=settings.GEMINI_API_KEY)
-    model = genai.GenerativeModel("models/gemini-2.5-flash")
-
-    prompt = f"""
-    You are a job description parsing AI. From the given job description text, extract structured information about skills required for the role.
-
-    Return JSON with these exact keys:
-    - mandatory_skills (list of skills that are required)
-    - optional_skills (list of skills that are nice-to-have)
-
-    Job Description text:
-    {jd_text}
-    """
+# ------------ Position List Helpers ------------
+# Keys of the position list -> model field each one reads
+POSITION_LIST_FIELDS = {
+    "id": 'id',
+    "job_title": 'job_title',
+    "domain": 'domain',
+    "exp_from": 'exp_from',
+    "exp_to": 'exp_to',
+    "mandatory_skills": 'mandatory_skills',
+    "optional_skills": 'optional_skills',
+    "jd_file_url": 'job_description_file',
+    "interview_instructions": 'interview_instructions',
+}
+
+
+def position_list_item(pos, fields):
+    item = {}
+    for field in fields:
+        if field == "jd_file_url":
+            item[field] = pos.job_description_file.url if pos.job_description_file else ""
+        else:
+            item[field] = getattr(pos, POSITION_LIST_FIELDS[field])
+    return item
 
-    response = model.generate_content(prompt)
-    result_text = response.text.strip()
 
-    try:
-        data = json.loads(result_text)
-    except json.JSONDecodeError:
-        try:
-            json_start = result_text.find('{')
-            json_end = result_text.rfind('}') + 1
-            data = json.loads(result_text[json_start:json_end])
-        except Exception:
-            data = {"mandatory_skills": [], "optional_skills": []}
-    return data
+def not_modified(request, etag, last_modified):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since') or "")
+    return bool(last_modified and if_modified_since and int(last_modified.timestamp()) <= if_modified_since)
 
 
 # ------------ API: Create Position ------------
@@ -158,61 +138,94 @@ class PositionCreateView(APIView):
             if not file:
                 return Response({"error": "JD file is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Upload JD to S3
-            s3_url = upload_to_s3(BytesIO(file.read()), file.name)
-
-            # Extract JD text
-            file.seek(0)
-            jd_text = extract_text_from_file(BytesIO(file.read()), file.name)
-
-            # Extract mandatory & optional skills using LLM
-            skills_data = extract_skills_from_jd(jd_text)
+            # Upload JD to S3 in the background while the text is extracted and parsed
+            upload_future = upload_to_s3_in_background(file)
+
+            # Extract JD text, reusing the stored text when the same file was posted before
+            content_hash = file_sha256(file)
+            previous = positions_with_jd_text(content_hash).first()
+            record_cache('jd_text', previous is not None)
+            if previous:
+                jd_text = previous.extracted_text
+                jd_extractor_version = previous.extractor_version
+            else:
+                extraction = extract_document(file, file.name)
+                jd_text = extraction.text
+                jd_extractor_version = extractor_version(extraction)
+
+            # Extract mandatory & optional skills using LLM (cached by normalized JD text)
+            skills_data = get_jd_skills(jd_text)
             mandatory_skills = skills_data.get('mandatory_skills', [])
             optional_skills = skills_data.get('optional_skills', [])
 
+            s3_url = upload_future.result()
+
             # Create Position
-            position = Position.objects.create(
-                job_title=request.data.get('job_title'),
-                domain=request.data.get('domain'),
-                exp_from=request.data.get('exp_from'),
-                exp_to=request.data.get('exp_to'),
-                job_description_file=file,
-                mandatory_skills=mandatory_skills,
-                optional_skills=optional_skills,
-                interview_instructions=request.data.get('interview_instructions')
-            )
+            position = build_position(request.user, request.data, file, mandatory_skills, optional_skills)
+            position.set_extracted_text(jd_text, content_hash, jd_extractor_version)
+            position.save()
 
-            return Response({
-                "id": position.id,
-                "job_title": position.job_title,
-                "domain": position.domain,
-                "exp_from": position.exp_from,
-                "exp_to": position.exp_to,
-                "mandatory_skills": position.mandatory_skills,
-                "optional_skills": position.optional_skills,
-                "jd_file_url": s3_url,
-                "interview_instructions": position.interview_instructions
-            }, status=status.HTTP_201_CREATED)
+            return Response(position_data(position, s3_url), status=status.HTTP_201_CREATED)
 
+        except LLMUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     def get(self, request):
+        """Positions in id order, paged by ?after= and ?page_size= with a `Link: rel="next"` header.
+
+        Without either parameter every position is returned, as the list was before paging existed.
+
+        ?employer=<id> (or `me`) limits the list to one employer and ?fields= picks the keys returned.
+        Responses carry an ETag and Last-Modified so pollers get a 304 while nothing has changed.
+        """
         positions = Position.objects.all()
-        data = [
-            {
-                "id": pos.id,
-                "job_title": pos.job_title,
-                "domain": pos.domain,
-                "exp_from": pos.exp_from,
-                "exp_to": pos.exp_to,
-                "mandatory_skills": pos.mandatory_skills,
-                "optional_skills": pos.optional_skills,
-                "jd_file_url": pos.job_description_file.url if pos.job_description_file else "",
-                "interview_instructions": pos.interview_instructions,
-            }
-            for pos in positions
-        ]
-        return Response(data, status=status.HTTP_200_OK)
+        employer = request.query_params.get('employer')
+        if employer == 'me':
+            positions = positions.filter(employer=request.user)
+        elif employer:
+            if not employer.isdigit():
+                return Response({"error": "employer must be an id or 'me'."}, status=status.HTTP_400_BAD_REQUEST)
+            positions = positions.filter(employer_id=int(employer))
+
+        fields = list(POSITION_LIST_FIELDS)
+        if request.query_params.get('fields'):
+            fields = [f.strip() for f in request.query_params['fields'].split(',') if f.strip()]
+            unknown = [f for f in fields if f not in POSITION_LIST_FIELDS]
+            if unknown:
+                return Response(
+                    {"error": f"Unknown field(s): {', '.join(unknown)}. Choose from {', '.join(POSITION_LIST_FIELDS)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # Row count catches deletions, which don't move the newest timestamp
+        state = positions.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+        etag = quote_etag(hashlib.md5(
+            f"{state['count']}:{state['last_modified']}:{request.query_params.urlencode()}".encode('utf-8')
+        ).hexdigest())
+        last_modified = state['last_modified']
+        if not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            positions = positions.only('id', *{POSITION_LIST_FIELDS[f] for f in fields})
+            if 'after' in request.query_params or 'page_size' in request.query_params:
+                try:
+                    page, next_after = id_keyset_page(positions, request)
+                except InvalidCursor as e:
+                    return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                page, next_after = positions.order_by('id'), None
+            response = Response([position_list_item(pos, fields) for pos in page], status=status.HTTP_200_OK)
+            if next_after is not None:
+                params = request.query_params.copy()
+                params['after'] = next_after
+                response['Link'] = f'<{request.build_absolute_uri(f"{request.path}?{params.urlencode()}")}>; rel="next"'
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 # ------------ API: Get Position Details ------------
@@ -233,6 +246,177 @@ class PositionDetailView(APIView):
             return Response({"error": "Position not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
+# ------------ API: Ranked Candidates ------------
+def int_param(request, name, default, minimum=1, maximum=None):
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    value = max(value, minimum)
+    return min(value, maximum) if maximum else value
+
+
+class RankedCandidatesView(APIView):
+    """Candidates ranked for a position by skill coverage and experience fit.
+
+    ?top_k= caps how many ranked candidates are considered (default 100), ?page= / ?page_size= page
+    through them and ?scope=position restricts the ranking to candidates who applied to this position.
+    """
+
+    def get(self, request, pk):
+        try:
+            position = Position.objects.only(
+                'id', 'mandatory_skills', 'optional_skills', 'exp_from', 'exp_to'
+            ).get(id=pk)
+        except Position.DoesNotExist:
+            return Response({"error": "Position not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        top_k = int_param(request, 'top_k', 100, maximum=settings.MATCH_MAX_TOP_K)
+        page = int_param(request, 'page', 1)
+        page_size = int_param(request, 'page_size', 20, maximum=100)
+        offset = (page - 1) * page_size
+        limit = max(min(page_size, top_k - offset), 0)
+
+        index = get_skill_index()
+        total, ranked = index.rank(position, limit, offset, applied_only=request.query_params.get('scope') == 'position')
+
+        mandatory = set(normalize_skills(position.mandatory_skills))
+        optional = set(normalize_skills(position.optional_skills))
+        candidates = Candidate.objects.only('id', 'name', 'email', 'experience', 'position_id').in_bulk(
+            [int(index.ids[row]) for row, *_ in ranked]
+        )
+        results = []
+        for row, score, mandatory_coverage, optional_coverage, experience_fit in ranked:
+            candidate = candidates.get(int(index.ids[row]))
+            if candidate is None:  # deleted since the index was refreshed
+                continue
+            skills = index.skills[row]
+            results.append({
+                "candidate_id": candidate.id,
+                "name": candidate.name,
+                "email": candidate.email,
+                "experience": candidate.experience,
+                "position_id": candidate.position_id,
+                "score": round(float(score), 4),
+                "mandatory_coverage": round(float(mandatory_coverage), 4),
+                "optional_coverage": round(float(optional_coverage), 4),
+                "experience_fit": round(float(experience_fit), 4),
+                "matched_mandatory_skills": [s for s in skills if s in mandatory],
+                "matched_optional_skills": [s for s in skills if s in optional],
+            })
+
+        return Response({
+            "position_id": position.id,
+            "total": min(total, top_k),
+            "page": page,
+            "page_size": page_size,
+            "results": results
+        }, status=status.HTTP_200_OK)
+
+
+# ------------ API: Candidate Search ------------
+def float_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    return float(value)
+
+
+class CandidateSearchView(APIView):
+    """Full-text candidate search over name, skills and resume text, best match first.
+
+    ?q= is the query ("kubernetes terraform 3 years" also sets a minimum experience), ?match=any
+    matches any term instead of all. Filters: ?position=, ?domain=, ?min_experience=, ?max_experience=.
+    Paged by ?page= and ?page_size= (default 20, max 100).
+    """
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            filters = {
+                'position_id': int(request.query_params['position']) if request.query_params.get('position') else None,
+                'domain': request.query_params.get('domain', '').strip(),
+                'min_experience': float_param(request, 'min_experience'),
+                'max_experience': float_param(request, 'max_experience'),
+            }
+        except ValueError:
+            return Response(
+                {"error": "position must be an id; min_experience and max_experience must be numbers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        page = int_param(request, 'page', 1)
+        page_size = int_param(request, 'page_size', 20, maximum=100)
+        # One extra row tells us whether there is a next page without counting every match
+        hits = search_candidates(
+            query, filters, page_size + 1, (page - 1) * page_size,
+            match_any=request.query_params.get('match') == 'any'
+        )
+        has_next = len(hits) > page_size
+        hits = hits[:page_size]
+
+        candidates = Candidate.objects.only(
+            'id', 'name', 'email', 'experience', 'domain', 'position_id', 'skills'
+        ).in_bulk([pk for pk, _, _ in hits])
+        results = []
+        for pk, score, snippet in hits:
+            candidate = candidates.get(pk)
+            if candidate is None:
+                continue
+            results.append({
+                "candidate_id": candidate.id,
+                "name": candidate.name,
+                "email": candidate.email,
+                "experience": candidate.experience,
+                "domain": candidate.domain,
+                "position_id": candidate.position_id,
+                "skills": candidate.skills,
+                "score": score,
+                "snippet": snippet,
+            })
+
+        next_url = None
+        if has_next:
+            params = request.query_params.copy()
+            params['page'] = page + 1
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        return Response({
+            "query": query,
+            "page": page,
+            "page_size": page_size,
+            "results": results,
+            "next": next_url
+        }, status=status.HTTP_200_OK)
+
+
+# ------------ Background Candidate Jobs ------------
+def wants_async(query_params, data, headers):
+    # Clients opt in with ?async=true (or an `async` form field) or the standard `Prefer: respond-async` header
+    flag = query_params.get('async', data.get('async', ''))
+    return str(flag).lower() in ('1', 'true', 'yes') or 'respond-async' in headers.get('Prefer', '')
+
+
+def new_candidate_job(position, resume_file, data, files):
+    """Unsaved CandidateJob queuing `resume_file` for `manage.py process_candidate_jobs`."""
+    return CandidateJob(
+        position=position,
+        resume_file=resume_file,
+        file_name=resume_file.name,
+        request_data={k: v for k, v in data.items() if k not in files},
+        stages=[{"stage": "queued", "at": timezone.now().isoformat()}]
+    )
+
+
+def candidate_job_data(job):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": reverse('candidate-job-status', args=[job.id])
+    }
+
+
 # ------------ API: Add Candidate ------------
 class CandidateCreateView(APIView):
     def post(self, request):
@@ -250,57 +434,248 @@ class CandidateCreateView(APIView):
             if not resume_file:
                 return Response({"error": "Resume file is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Upload resume to S3
-            s3_url = upload_to_s3(BytesIO(resume_file.read()), resume_file.name)
+            # Background mode: queue the upload for `manage.py process_candidate_jobs` and return at once
+            if wants_async(request.query_params, request.data, request.headers):
+                job = new_candidate_job(position, resume_file, request.data, request.FILES)
+                job.save()
+                return Response(candidate_job_data(job), status=status.HTTP_202_ACCEPTED)
 
-            # Reset pointer and extract text
-            resume_file.seek(0)
-            resume_text = extract_text_from_file(BytesIO(resume_file.read()), resume_file.name)
+            # Upload resume to S3 in the background while the text is extracted and parsed
+            upload_future = upload_to_s3_in_background(resume_file)
 
-            # Extract structured data from resume using LLM
-            extracted_data = extract_resume_data_with_llm(resume_text)
+            # Extract text and structured data with the LLM; repeat uploads of the same file hit the cache
+            parsed = parse_resume(resume_file, resume_file.name)
 
-            # Safely get experience as float
-            experience_value = request.data.get('experience') or extracted_data.get('experience', 0)
-            try:
-                experience_value = float(experience_value)
-            except (ValueError, TypeError):
-                experience_value = 0.0
+            s3_url = upload_future.result()
 
             # Create candidate
-            candidate = Candidate.objects.create(
-                position=position,
-                domain=request.data.get('domain', position.domain),
-                mandatory_skills=request.data.get('mandatory_skills', position.mandatory_skills),
-                optional_skills=request.data.get('optional_skills', position.optional_skills),
-                jd_file=position.job_description_file,
-                resume_file=resume_file,
-                name=extracted_data.get('name', request.data.get('name', '')),
-                email=extracted_data.get('email', request.data.get('email', '')),
-                contact=extracted_data.get('phone', request.data.get('contact', '')),
-                experience=experience_value,
-                preferred_timings=request.data.get('preferred_timings'),
-                interview_instructions=position.interview_instructions
-            )
+            candidate = build_candidate(position, request.data, resume_file, parsed.extracted_data)
+            candidate.set_extracted_text(parsed.resume_text, parsed.content_hash, parsed.extractor_version)
+            candidate.save()
 
-            return Response({
-                "id": candidate.id,
-                "name": candidate.name,
-                "email": candidate.email,
-                "contact": candidate.contact,
-                "experience": candidate.experience,
-                "mandatory_skills": candidate.mandatory_skills,
-                "optional_skills": candidate.optional_skills,
-                "resume_s3_url": s3_url
-            }, status=status.HTTP_201_CREATED)
+            return Response(candidate_data(candidate, s3_url), status=status.HTTP_201_CREATED)
+
+        except LLMUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ------------ API: Candidate Job Status ------------
+class CandidateJobStatusView(APIView):
+    def get(self, request, pk):
+        try:
+            job = CandidateJob.objects.get(id=pk)
+        except CandidateJob.DoesNotExist:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "job_id": job.id,
+            "position_id": job.position_id,
+            "file_name": job.file_name,
+            "status": job.status,
+            "stage": job.stage,
+            "stages": job.stages,
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at
+        }, status=status.HTTP_200_OK)
+
+
+# ------------ Bulk Resume Helpers ------------
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+
+def read_bulk_resumes(request):
+    """Return the `resume_files` uploads and the resumes in a `resume_archive` zip as uploaded files.
+
+    Every file is checked against BULK_MAX_FILE_SIZE. Zip entries are spooled to temporary files, so
+    like large uploads they reach extraction and S3 as paths instead of bytes held in memory; the
+    caller closes them when the request is done.
+    """
+    too_many = f"At most {settings.BULK_MAX_FILES} resumes can be uploaded at once."
+    resumes = []
+    try:
+        for uploaded_file in request.FILES.getlist('resume_files'):
+            check_resume_size(uploaded_file.name, uploaded_file.size)
+            resumes.append(uploaded_file)
+        if len(resumes) > settings.BULK_MAX_FILES:
+            raise ValueError(too_many)
+
+        archive = request.FILES.get('resume_archive')
+        if archive:
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    file_name = os.path.basename(info.filename)
+                    if info.is_dir() or file_name.startswith('.') or not file_name.lower().endswith(RESUME_EXTENSIONS):
+                        continue
+                    if len(resumes) >= settings.BULK_MAX_FILES:
+                        raise ValueError(too_many)
+                    check_resume_size(file_name, info.file_size)
+                    resumes.append(spool_zip_entry(zf, info, file_name))
+    except BaseException:
+        for uploaded_file in resumes:
+            uploaded_file.close()
+        raise
+    return resumes
+
+
+def check_resume_size(file_name, size):
+    if size > settings.BULK_MAX_FILE_SIZE:
+        raise ValueError(f"{file_name} exceeds the maximum resume size.")
+
+
+def spool_zip_entry(zf, info, file_name):
+    # The size in the zip directory can lie, so the limit is also enforced on the bytes actually inflated
+    spooled = TemporaryUploadedFile(file_name, 'application/octet-stream', info.file_size, None)
+    try:
+        with zf.open(info) as entry:
+            while chunk := entry.read(64 * 1024):
+                spooled.write(chunk)
+                check_resume_size(file_name, spooled.tell())
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.size = spooled.tell()
+    spooled.seek(0)
+    return spooled
+
+
+# ------------ API: Bulk Add Candidates ------------
+class CandidateBulkCreateView(APIView):
+    def post(self, request):
+        try:
+            position_id = request.data.get('position_id')
+            if not position_id:
+                return Response({"error": "Position ID is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                position = Position.objects.get(id=position_id)
+            except Position.DoesNotExist:
+                return Response({"error": "Position not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            try:
+                resumes = read_bulk_resumes(request)
+            except (ValueError, zipfile.BadZipFile) as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            if not resumes:
+                return Response({"error": "At least one resume file is required."}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                return self.create_candidates(request, position, resumes)
+            finally:
+                for resume_file in resumes:
+                    resume_file.close()
 
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
+
+    def create_candidates(self, request, position, resumes):
+        results = [{"file": resume_file.name} for resume_file in resumes]
+        hashes = [file_sha256(resume_file) for resume_file in resumes]
+        cached = {
+            entry.content_hash: entry
+            for entry in ResumeExtractionCache.objects.filter(
+                content_hash__in=set(hashes), prompt_version=resume_prompt_version()
+            )
+        }
+        entries = [cached.get(h) for h in hashes]
+
+        with ThreadPoolExecutor(max_workers=settings.BULK_LLM_CONCURRENCY) as io_pool:
+            # S3 uploads don't depend on parsing, so they run alongside it on the upload workers
+            upload_futures = [upload_to_s3_in_background(resume_file) for resume_file in resumes]
+
+            # CPU-bound text extraction fans out across processes, one task per distinct file
+            first_index = {}
+            for i, entry in enumerate(entries):
+                if entry is None:
+                    first_index.setdefault(hashes[i], i)
+            text_futures = {}
+            for i in first_index.values():
+                try:
+                    text_futures[i] = submit_extraction(extraction_source(resumes[i], resumes[i].name), resumes[i].name)
+                except ValueError as e:
+                    results[i].update(status="failed", error=str(e))
+
+            # Each extracted text goes to the LLM as soon as it is ready, bounded by the pool size
+            llm_futures = {}
+            extractions = {}
+            for i, pending in text_futures.items():
+                try:
+                    extractions[i] = wait_for_extraction(pending, resumes[i].name)
+                except Exception as e:
+                    results[i].update(status="failed", error=str(e))
+                    continue
+                if extractions[i].truncated:
+                    results[i]["text_truncated"] = True
+                llm_futures[i] = submit_with_timings(io_pool, extract_resume_data_with_llm, extractions[i].text)
+
+            for i, future in llm_futures.items():
+                try:
+                    extracted_data = future.result()
+                except Exception as e:
+                    results[i].update(status="failed", error=str(e))
+                    continue
+                entries[i] = ResumeExtractionCache(
+                    content_hash=hashes[i],
+                    prompt_version=resume_prompt_version(),
+                    resume_text=extractions[i].text,
+                    extractor_version=extractor_version(extractions[i]),
+                    extracted_data=extracted_data
+                )
+            new_cache_entries = [
+                entries[i] for i in llm_futures if entries[i] and is_cacheable_extraction(entries[i].extracted_data)
+            ]
+
+            # Duplicate files within the batch reuse the result of their first copy
+            for i, entry in enumerate(entries):
+                source = first_index.get(hashes[i], i)
+                if entry is None and source != i:
+                    if "error" in results[source]:
+                        results[i].update(status="failed", error=results[source]["error"])
+                    else:
+                        entries[i] = entries[source]
+
+            s3_urls = []
+            for i, future in enumerate(upload_futures):
+                try:
+                    s3_urls.append(future.result())
+                except Exception as e:
+                    s3_urls.append(None)
+                    results[i].update(status="failed", error=str(e))
+
+        ResumeExtractionCache.objects.bulk_create(new_cache_entries, ignore_conflicts=True)
+
+        created_indexes = [i for i, result in enumerate(results) if "status" not in result]
+        new_candidates = []
+        for i in created_indexes:
+            candidate = build_candidate(position, request.data, resumes[i], entries[i].extracted_data)
+            candidate.set_extracted_text(entries[i].resume_text, entries[i].content_hash, entries[i].extractor_version)
+            new_candidates.append(candidate)
+        candidates = Candidate.objects.bulk_create(new_candidates)
+        index_candidates(candidates)  # bulk_create sends no post_save
+        candidates_changed()
+        for i, candidate in zip(created_indexes, candidates):
+            results[i].update(
+                status="created",
+                id=candidate.id,
+                name=candidate.name,
+                email=candidate.email,
+                contact=candidate.contact,
+                experience=candidate.experience,
+                resume_s3_url=s3_urls[i]
+            )
+
+        failed = len(results) - len(created_indexes)
+        return Response({
+            "position_id": position.id,
+            "created": len(created_indexes),
+            "failed": failed,
+            "results": results
+        }, status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED)
+
     # Generate JD
-# Configure your GenAI API key
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel("models/gemini-2.5-flash")
 
 
 # @method_decorator(csrf_exempt, name='dispatch')
@@ -328,82 +703,100 @@ model = genai.GenerativeModel("models/gemini-2.5-flash")
 #         except Exception as e:
 #             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# ------------ JD Generation ------------
+def jd_inputs(data):
+    """Validated (job_title, domain, experience) from request data; raises ValueError with a client message."""
+    job_title = str(data.get('job_title') or '').strip()
+    domain = str(data.get('domain') or '').strip()
+    experience = data.get('experience')
+    if not job_title or not domain or experience in (None, ''):
+        raise ValueError("job_title, domain and experience are required.")
+    try:
+        experience = int(experience)
+    except (TypeError, ValueError):
+        raise ValueError("experience must be a number.")
+    return job_title, domain, experience
+
+
+class JSONOnlyNegotiation(DefaultContentNegotiation):
+    # `?format=` selects the download type on this endpoint, not a DRF renderer; errors are always JSON
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
 class GenerateJDFileView(APIView):
     """
     Generate JD as PDF or DOCX file for download.
+
+    Accepts the inputs as POST data or GET query parameters. Files are rendered once per distinct
+    JD text and served with an ETag; a GET with a matching If-None-Match gets a 304.
     """
+    content_negotiation_class = JSONOnlyNegotiation
+
+    def get(self, request):
+        return self.download(request, request.query_params)
+
     def post(self, request):
+        return self.download(request, request.data)
+
+    def download(self, request, data):
         try:
-            job_title = request.data.get('job_title')
-            domain = request.data.get('domain')
-            experience = request.data.get('experience')
-            output_format = request.data.get('format', 'pdf')  # pdf or docx
+            try:
+                job_title, domain, experience = jd_inputs(data)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            output_format = 'pdf' if str(data.get('format', 'pdf')).lower() == 'pdf' else 'docx'
 
-            if not job_title or not domain or experience is None:
-                return Response(
-                    {"error": "job_title, domain and experience are required."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            jd_text = get_generated_jd(job_title, domain, experience)
+            if not jd_text:
+                return Response({"error": "Failed to generate JD from model."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            prompt = f"Write a professional job description for a {job_title} in {domain} with {experience} years of experience."
-            response = model.generate_content(prompt=prompt, max_output_tokens=600)
-            jd_text = response.output_text
-
-            buffer = BytesIO()
-
-            if output_format.lower() == 'pdf':
-                p = canvas.Canvas(buffer)
-                y = 800
-                for line in jd_text.split('\n'):
-                    p.drawString(50, y, line)
-                    y -= 15
-                p.showPage()
-                p.save()
-                buffer.seek(0)
-                response_file = HttpResponse(buffer, content_type='application/pdf')
-                response_file['Content-Disposition'] = f'attachment; filename="{job_title}_JD.pdf"'
-            else:  # DOCX
-                doc = Document()
-                doc.add_heading(f"{job_title} - Job Description", 0)
-                doc.add_paragraph(jd_text)
-                doc.save(buffer)
-                buffer.seek(0)
-                response_file = HttpResponse(
-                    buffer,
-                    content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            etag = quote_etag(artifact_digest(output_format, job_title, jd_text))
+            if request.method == 'GET' and etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                path, digest = get_jd_artifact(output_format, job_title, jd_text)
+                response = FileResponse(
+                    open(path, 'rb'),
+                    as_attachment=True,
+                    filename=f"{job_title}_JD.{output_format}",
+                    content_type=JD_FILE_TYPES[output_format]
                 )
-                response_file['Content-Disposition'] = f'attachment; filename="{job_title}_JD.docx"'
-
-            return response_file
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            return response
 
+        except LLMUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class GenerateJDPreviewView(APIView):
+    """JD preview as {"jd_lines": [...]}, or streamed as Server-Sent Events when the client sends
+    `Accept: text/event-stream` or ?stream=true: `chunk` events carry {"text": ...} as it is generated,
+    followed by a final `done` (or `error`) event.
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
     def post(self, request):
         try:
-            job_title = request.data.get('job_title', '').strip()
-            domain = request.data.get('domain', '').strip()
-            experience = request.data.get('experience', '')
-
-            if not job_title or not domain or not experience:
-                return Response(
-                    {"error": "job_title, domain and experience are required."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Ensure experience is integer
             try:
-                experience = int(experience)
-            except ValueError:
-                return Response({"error": "experience must be a number."}, status=status.HTTP_400_BAD_REQUEST)
-
-            prompt_text = f"Write a professional job description for a {job_title} in {domain} with {experience} years of experience."
-
-            # ✅ Correct usage for your SDK: only pass the prompt
-            response = model.generate_content(prompt_text)
+                job_title, domain, experience = jd_inputs(request.data)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            if request.accepted_renderer.format == 'sse' or str(request.query_params.get('stream', '')).lower() in ('1', 'true', 'yes'):
+                input_hash = generated_jd_hash(job_title, domain, experience)
+                jd_text = get_cached_generated_jd(input_hash)
+                if jd_text is not None:
+                    return self.stream([jd_text])
+                return self.stream(
+                    get_llm().stream(jd_prompt(job_title, domain, experience)),
+                    on_complete=lambda text: store_generated_jd(input_hash, job_title, domain, experience, text)
+                )
 
-            # Safely get output text
-            jd_text = getattr(response, 'output_text', None) or getattr(response, 'text', None)
+            jd_text = get_generated_jd(job_title, domain, experience)
             if not jd_text:
                 return Response({"error": "Failed to generate JD from model."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -411,11 +804,36 @@ class GenerateJDPreviewView(APIView):
             jd_lines = jd_text.strip().split('\n')
             return Response({"jd_lines": jd_lines})
 
+        except LLMUnavailable as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def stream(self, chunks, on_complete=None):
+        def events():
+            parts = []
+            try:
+                for text in chunks:
+                    parts.append(text)
+                    yield sse_event('chunk', {"text": text})
+            except Exception as e:
+                yield sse_event('error', {"error": str(e)})
+                return
+            yield sse_event('done', {})
+            if on_complete:
+                on_complete("".join(parts))
+
+        response = StreamingHttpResponse(EventStream(events(), chunks), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+        return response
+
 
 class InterviewListView(APIView):
+    """Interviews visible to the current user, newest first.
+
+    Paged by ?cursor= (the `next` value of the previous page) and ?page_size= (default 50, max 200).
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
@@ -431,5 +849,103 @@ class InterviewListView(APIView):
         else:
             return Response({"error": "Invalid user role"}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer = InterviewSerializer(interviews, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        # Only the columns InterviewSerializer reads, with the related rows joined in the same query
+        interviews = interviews.select_related('employer', 'position', 'candidate').only(
+            'id', 'created_at', 'preferred_timings', 'status',
+            'employer__username', 'position__job_title', 'candidate__name'
+        )
+        try:
+            page, next_cursor = keyset_page(interviews, request)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        next_url = None
+        if next_cursor:
+            params = request.query_params.copy()
+            params['cursor'] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+        serializer = InterviewSerializer(page, many=True)
+        return Response({"results": serializer.data, "next": next_url}, status=status.HTTP_200_OK)
+
+
+# ------------ API: Metrics ------------
+def scrape_time_metrics():
+    stats = prompt_stats()
+    extra = [
+        ('resume_app_cache_hit_ratio', "Share of cache lookups that hit, since the process started.", 'gauge',
+         ('cache',), cache_hit_ratios()),
+        ('resume_app_prompt_tokens_total', "Estimated prompt tokens before and after budget trimming.", 'counter',
+         ('kind', 'stage'),
+         [((kind, stage), totals[f'tokens_{stage}']) for kind, totals in stats.items() for stage in ('before', 'after')]),
+        ('resume_app_prompts_trimmed_total', "Prompts cut down to fit their token budget.", 'counter',
+         ('kind',), [((kind,), totals['trimmed']) for kind, totals in stats.items()]),
+    ]
+    # Only report the gateway once something has used it; get_llm() would build one just for the scrape
+    if llm._gateway is not None:
+        state = llm._gateway.state()
+        extra += [
+            ('resume_app_llm_in_flight', "LLM calls holding a concurrency slot.", 'gauge', (), [((), state['in_flight'])]),
+            ('resume_app_llm_breaker_open', "1 while the LLM circuit breaker is open.", 'gauge', (),
+             [((), int(state['breaker_open']))]),
+            ('resume_app_llm_consecutive_failures', "Consecutive retryable LLM failures.", 'gauge', (),
+             [((), state['consecutive_failures'])]),
+        ]
+    return extra
+
+
+class MetricsView(APIView):
+    """Prometheus scrape endpoint for this process: stage and request latency histograms, LLM token counts,
+    cache hit ratios and LLM gateway state. Needs `Authorization: Bearer <METRICS_TOKEN>`; without a token
+    it is only served to loopback clients, and only when DEBUG is on.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        if settings.METRICS_TOKEN:
+            expected = f"Bearer {settings.METRICS_TOKEN}"
+            allowed = hmac.compare_digest(request.headers.get('Authorization', ''), expected)
+        else:
+            allowed = settings.DEBUG and request.META.get('REMOTE_ADDR') in ('127.0.0.1', '::1')
+        if not allowed:
+            return Response({"error": "Forbidden."}, status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(
+            render_prometheus(scrape_time_metrics()), content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+# ------------ API: Admin Profiles ------------
+class IsAdminRole(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role == 'admin')
+
+
+class ProfileListView(APIView):
+    """Request profiles recorded by RequestProfilerMiddleware, newest first."""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        reports = list_reports()
+        for report in reports:
+            report["url"] = request.build_absolute_uri(reverse('profile-detail', args=[report["name"]]))
+        return Response(reports, status=status.HTTP_200_OK)
+
+
+class ProfileDetailView(APIView):
+    """The text summary of one profile (top functions by cumulative time); ?download=1 returns the raw
+    cProfile stats for snakeviz or pstats instead."""
+    permission_classes = [IsAdminRole]
+
+    def get(self, request, name):
+        if str(request.query_params.get('download', '')).lower() in ('1', 'true', 'yes'):
+            path = report_path(name, 'prof')
+            if path:
+                return FileResponse(open(path, 'rb'), as_attachment=True, filename=f"{name}.prof",
+                                    content_type='application/octet-stream')
+        else:
+            path = report_path(name, 'txt')
+            if path:
+                with open(path) as f:
+                    return HttpResponse(f.read(), content_type='text/plain; charset=utf-8')
+        return Response({"error": "Profile not found."}, status=status.HTTP_404_NOT_FOUND)